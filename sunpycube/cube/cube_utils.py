@@ -7,9 +7,15 @@ aid readability.
 """
 
 from __future__ import absolute_import
+import datetime
+import warnings
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 import numpy as np
+from numpy import ma
 from sunpycube import wcs_util
 from astropy import units as u
+from sunpy.time import parse_time
 from copy import deepcopy
 
 
@@ -226,29 +232,35 @@ def reduce_dim(cube, axis, keys):
     keys: slice object
         The slicing to apply
     """
-    start = keys.start if keys.start is not None else 0
-    stop = keys.stop if keys.stop is not None else cube.data.shape[axis]
-    if stop > cube.data.shape[axis]:
-        stop = cube.data.shape[axis]
-    if start < 0:
-        start = 0
-    step = keys.step if keys.step is not None else 1
-    indices = range(start, stop, step)
-    newdata = cube.data.take(indices, axis=axis)
+    start, stop, step = keys.indices(cube.data.shape[axis])
+    # A stop of -1 from a negative step means past the first element.
+    slices = tuple([slice(None)] * axis +
+                   [slice(start, stop if stop >= 0 else None, step)])
+    # Basic slicing returns views, so no data is copied.
+    newdata = cube.data[slices]
+    count = newdata.shape[axis]
     newwcs = cube.axes_wcs.deepcopy()
 
-    wcs_slice_data = [slice(start, stop)]
+    # The WCS is shifted to the first element kept, then scaled by the
+    # step, so pixel p is element start + p * step of the old axis.
+    wcs_slice_data = [slice(max(start, 0), max(start, 0) + count)]
     for i in range(axis-1, -1, -1):
         wcs_slice_data.insert(0, slice(0, cube.data.shape[i]))
     newwcs = newwcs.slice(wcs_slice_data)
+    if step != 1:
+        wcs_axis = newwcs.naxis - 1 - axis
+        crpix = newwcs.wcs.crpix[wcs_axis]
+        newwcs.wcs.crpix[wcs_axis] = (crpix - 1.) / step + 1
+        newwcs.wcs.cdelt[wcs_axis] *= step
+        wcs_util.set_pixel_length(newwcs, wcs_axis, count)
 
     kwargs = {'meta': cube.meta, 'unit': cube.unit}
     if cube.uncertainty is not None:
         errors = deepcopy(cube.uncertainty)
-        errors.array = errors.array.take(indices, axis=axis)
+        errors.array = errors.array[slices]
         kwargs.update({'errors': errors})
     if cube.mask is not None:
-        mask = cube.mask.take(indices, axis=axis)
+        mask = cube.mask[slices]
         kwargs.update({'mask': mask})
 
     newcube = cube._new_instance(data=newdata, wcs=newwcs, **kwargs)
@@ -535,7 +547,9 @@ def get_cube_from_sequence(cubesequence, item):
         # item represents (slice(start_cube_index, end_cube_index, None),
         # [slice_of_start_cube, slice_of_end_cube]) if end cube is not sliced then length is 1.
         if isinstance(item[0], slice):
-            data = cubesequence.data[item[0]]
+            # A new list, so the sliced cubes are not stored in the data
+            # list of the sequence or a lazy slice of it.
+            data = list(cubesequence.data[item[0]])
             # applying the slice in the start of cube.
             data[0] = data[0][item[1][0]]
             if len(item[1]) is 2:
@@ -584,64 +598,782 @@ def index_sequence_as_cube(cubesequence, item):
     >>> index_sequence_as_cube(cs, (slice(0, cubeB.shape[0]), 0, (slice(0, cubeB.shape[2]))
 
     """
-    # Determine starting slice of each cube along common axis.
-    cumul_cube_lengths = np.cumsum(np.array([c.shape[cubesequence.common_axis]
-                                             for c in cubesequence.data]))
-    # Case 1: Item is int and common axis is 0. Not yet supported.
-    if isinstance(item, int):
-        if cubesequence.common_axis != 0:
-            raise ValueError("Input can only be indexed with an int if "
-                             "CubeSequence's common axis is 0. common "
-                             "axis = {0}".format(cubesequence.common_axis))
-        else:
-            sequence_index, cube_index = _convert_cube_like_index_to_sequence_indices(
-                item, cumul_cube_lengths)
-            item_list = [item]
-    # Case 2: Item is slice and common axis is 0.
-    elif isinstance(item, slice):
-        if cubesequence.common_axis != 0:
-            raise ValueError("Input can only be sliced with a single slice if "
-                             "CubeSequence's common axis is 0. common "
-                             "axis = {0}".format(cubesequence.common_axis))
-        else:
-            sequence_index, cube_index = _convert_cube_like_slice_to_sequence_slices(
-                item, cumul_cube_lengths)
-            item_list = [item]
-    # Case 3: Item is tuple and common axis index is int.
-    elif isinstance(item[cubesequence.common_axis], int):
-        # Since item must be a tuple, convert to list to
-        # make ensure it's mutable for next cases.
-        item_list = list(item)
-        # Check item is long enough to include common axis.
-        if len(item_list) < cubesequence.common_axis:
-            raise ValueError("Input item not long enough to include common axis."
-                             "Must have length of of between "
-                             "{0} and {1} inclusive.".format(
-                                 cubesequence.common_axis, len(cubesequence[0].shape)))
-        sequence_index, cube_index = _convert_cube_like_index_to_sequence_indices(
-            item_list[cubesequence.common_axis], cumul_cube_lengths)
-    # Case 4: Item is tuple and common axis index is slice.
-    elif isinstance(item[cubesequence.common_axis], slice):
-        # Since item must be a tuple, convert to list to
-        # make ensure it's mutable for next cases.
+    common_axis = cubesequence.common_axis
+    if isinstance(item, (int, np.integer, slice)):
+        if common_axis != 0:
+            raise ValueError("Input can only be indexed with an int or a single "
+                             "slice if CubeSequence's common axis is 0. common "
+                             "axis = {0}".format(common_axis))
+        item_list = [item]
+    else:
+        # Convert to list to make sure it's mutable.
         item_list = list(item)
         # Check item is long enough to include common axis.
-        if len(item_list) < cubesequence.common_axis:
+        if len(item_list) <= common_axis:
             raise ValueError("Input item not long enough to include common axis."
                              "Must have length of of between "
                              "{0} and {1} inclusive.".format(
-                                 cubesequence.common_axis, len(cubesequence[0].shape)))
-        sequence_index, cube_index = _convert_cube_like_slice_to_sequence_slices(
-            item_list[cubesequence.common_axis], cumul_cube_lengths)
-    else:
-        raise ValueError("Invalid index/slice input.")
+                                 common_axis + 1, len(cubesequence[0].shape)))
+    key = item_list[common_axis]
+    offsets = cubesequence.offsets
     # Replace common axis index/slice with corresponding
-    # index/slice with cube.
-    item_list[cubesequence.common_axis] = cube_index
-    # Insert corresponding index/slice of required cube in sequence.
-    item_list.insert(0, sequence_index)
-    item_tuple = tuple(item_list)
-    return cubesequence[item_tuple]
+    # index/slice within the cubes.
+    if isinstance(key, (int, np.integer)):
+        sequence_index, item_list[common_axis] = offsets.locate(key)
+        return _index_cube(cubesequence.data[sequence_index], item_list)
+    if isinstance(key, slice):
+        data = []
+        for sequence_index, cube_slice in offsets.split(key):
+            item_list[common_axis] = cube_slice
+            data.append(_index_cube(cubesequence.data[sequence_index], item_list))
+        if not data:
+            raise IndexError("Slice does not select any cube.")
+        return cubesequence._new_instance(
+            data, meta=cubesequence.meta, common_axis=common_axis)
+    raise ValueError("Invalid index/slice input.")
+
+
+def _index_cube(cube, item_list):
+    """
+    Index cube with item_list, as a single item if it has length one.
+    """
+    if len(item_list) == 1:
+        return cube[item_list[0]]
+    return cube[tuple(item_list)]
+
+
+class SequenceOffsets(object):
+    """
+    Table of the positions of the cubes of a CubeSequence along its common
+    axis, as if they were concatenated. Indices and slices along the
+    concatenation are mapped to cubes by binary search, so locating an
+    index takes O(log n) time for n cubes.
+
+    Attributes
+    ----------
+    lengths : `numpy.ndarray`
+        Length of every cube along the common axis.
+    starts : `numpy.ndarray`
+        Position of the first element of every cube along the
+        concatenation, followed by the total length.
+    """
+
+    def __init__(self, lengths):
+        self.lengths = np.asarray(lengths, dtype=int)
+        self.starts = np.concatenate([[0], np.cumsum(self.lengths)])
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    @property
+    def cumul_cube_lengths(self):
+        """
+        Cumulative lengths of the cubes, as used by
+        _convert_cube_like_index_to_sequence_indices.
+        """
+        return self.starts[1:]
+
+    def _cube_of(self, index):
+        """
+        Return the position of the cube holding the non-negative in-range
+        index.
+        """
+        # Empty cubes start where the next one does; side='right' skips them.
+        return int(np.searchsorted(self.starts, index, side='right')) - 1
+
+    def locate(self, index):
+        """
+        Return (sequence_index, cube_index) of index along the
+        concatenation. Negative indices count from the end.
+        """
+        total = len(self)
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("Index {0} out of range for common axis of length "
+                             "{1}.".format(index, total))
+        sequence_index = self._cube_of(index)
+        return sequence_index, int(index - self.starts[sequence_index])
+
+    def split(self, item):
+        """
+        Return list of (sequence_index, cube_slice) tuples of the cubes
+        selected by slice item along the concatenation, in the order the
+        slice visits them. Steps and negative values are supported; cubes
+        from which no element is selected are left out.
+        """
+        start, stop, step = item.indices(len(self))
+        # Number of selected elements, ceil((stop - start) / step).
+        count = max(0, -((start - stop) // step))
+        if not count:
+            return []
+        last = start + (count - 1) * step
+        first_cube, last_cube = self._cube_of(start), self._cube_of(last)
+        result = []
+        if step > 0:
+            for n in range(first_cube, last_cube + 1):
+                begin, end = self.starts[n], self.starts[n + 1]
+                # First selected element within the cube.
+                first = start + -(-max(0, begin - start) // step) * step
+                if first >= min(stop, end):
+                    continue
+                result.append(
+                    (n, slice(int(first - begin), int(min(stop, end) - begin),
+                              step)))
+        else:
+            for n in range(first_cube, last_cube - 1, -1):
+                begin, end = self.starts[n], self.starts[n + 1]
+                first = start - -(-max(0, start - (end - 1)) // -step) * -step
+                lower = max(stop, begin - 1)
+                if first <= lower:
+                    continue
+                cube_stop = lower - begin
+                result.append(
+                    (n, slice(int(first - begin),
+                              int(cube_stop) if cube_stop >= 0 else None,
+                              step)))
+        return result
+
+
+class ConcatenatedArray(object):
+    """
+    Read-only view of arrays as if they were concatenated along their first
+    axis, without copying them. Indexing with an int along the first axis
+    returns a view of the array holding that element; slices only copy the
+    elements they select.
+
+    Attributes
+    ----------
+    arrays : `list` of `numpy.ndarray`
+        The arrays, which must agree in all but their first dimension.
+    offsets : `SequenceOffsets`
+        Positions of the arrays along the first axis.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = list(arrays)
+        self.offsets = SequenceOffsets([a.shape[0] for a in self.arrays])
+        self.shape = (len(self.offsets),) + tuple(self.arrays[0].shape[1:])
+        self.ndim = len(self.shape)
+        self.dtype = np.result_type(*self.arrays)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self[:], dtype)
+
+    def __getitem__(self, item):
+        if not isinstance(item, (tuple, list)):
+            item = (item,)
+        key, rest = item[0], tuple(item[1:])
+        if isinstance(key, (int, np.integer)):
+            sequence_index, index = self.offsets.locate(key)
+            return self.arrays[sequence_index][(index,) + rest]
+        if isinstance(key, slice):
+            parts = [self.arrays[sequence_index][(array_slice,) + rest]
+                     for sequence_index, array_slice in self.offsets.split(key)]
+            if not parts:
+                empty = np.empty((0,) + self.shape[1:], self.dtype)
+                return empty[(slice(None),) + rest]
+            if len(parts) == 1:
+                return parts[0]
+            return np.concatenate(parts)
+        raise IndexError("Only integers and slices are supported along the "
+                         "first axis.")
+
+
+class TimeIndex(object):
+    """
+    Interval index of the time ranges of the cubes of a CubeSequence.
+
+    The intervals are sorted by their start, together with the running
+    maximum of their ends, so the candidates overlapping a time range are
+    bounded by two binary searches. A query takes O(log n + k) time, where
+    k is the number of matches if no interval contains another, as for
+    cubes taken one after the other.
+
+    Attributes
+    ----------
+    starts, ends : `numpy.ndarray`
+        Start and end of every interval, in sequence order.
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype=float)
+        self.ends = np.asarray(ends, dtype=float)
+        if self.starts.shape != self.ends.shape:
+            raise ValueError("There must be one end per start.")
+        self._order = np.argsort(self.starts, kind='mergesort')
+        self._sorted_starts = self.starts[self._order]
+        self._sorted_ends = self.ends[self._order]
+        self._max_ends = np.maximum.accumulate(self._sorted_ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, start, end):
+        """
+        Return the positions of the intervals that overlap [start, end],
+        in sequence order.
+        """
+        if end < start:
+            raise ValueError("The end of the range is before its start.")
+        # Intervals starting after end do not overlap, nor do those before
+        # the first whose end, or that of an earlier one, reaches start.
+        stop = np.searchsorted(self._sorted_starts, end, side='right')
+        first = np.searchsorted(self._max_ends, start, side='left')
+        hits = first + np.nonzero(self._sorted_ends[first:stop] >= start)[0]
+        return np.sort(self._order[hits])
+
+    def at(self, time):
+        """
+        Return the positions of the intervals containing time, in sequence
+        order.
+        """
+        return self.overlapping(time, time)
+
+
+# Reference of times given as datetimes, see _to_seconds.
+_EPOCH = datetime.datetime(1, 1, 1)
+
+
+def _to_seconds(time):
+    """
+    Return time, a `datetime.datetime`, an `astropy.units.Quantity` or a
+    number of seconds, in seconds.
+    """
+    if isinstance(time, datetime.datetime):
+        delta = time - _EPOCH
+        return delta.days * 86400 + delta.seconds + delta.microseconds / 1e6
+    if isinstance(time, u.Quantity):
+        return time.to(u.s).value
+    return float(time)
+
+
+def _cube_times(cube, axis):
+    """
+    Return the time of the first element of cube along axis, the time
+    between elements and the number of elements, in seconds.
+
+    The times are taken from the WCS if axis is its time axis, in its units
+    converted to seconds, or otherwise from DATE_OBS and DATE_END in the
+    meta, as seconds since _EPOCH, with the elements evenly spaced between
+    them.
+    """
+    length = cube.data.shape[axis]
+    wcs = cube.axes_wcs.wcs
+    # WCS axes are in the reverse order of the data axes.
+    pixel_axis = cube.data.ndim - 1 - axis % cube.data.ndim
+    if wcs.ctype[pixel_axis] in ['TIME', 'UTC']:
+        unit = u.Unit(wcs.cunit[pixel_axis])
+        cdelt = wcs.cdelt[pixel_axis]
+        start = (wcs.crval[pixel_axis] - wcs.crpix[pixel_axis] * cdelt) * unit
+        return _to_seconds(start), _to_seconds(cdelt * unit), length
+    meta = cube.meta or {}
+    if 'DATE_OBS' in meta and 'DATE_END' in meta:
+        start = _to_seconds(parse_time(meta['DATE_OBS']))
+        end = _to_seconds(parse_time(meta['DATE_END']))
+        step = (end - start) / (length - 1) if length > 1 else 0.
+        return start, step, length
+    raise CubeError(1, 'No time axis or DATE_OBS and DATE_END present')
+
+
+def sequence_time_index(cubesequence):
+    """
+    Return the `TimeIndex` of the time ranges the cubes of a CubeSequence
+    span along common_axis, in seconds, see _cube_times. Reads every cube.
+    """
+    starts, ends = [], []
+    for cube in cubesequence.data:
+        start, step, length = _cube_times(cube, cubesequence.common_axis)
+        end = start + step * max(0, length - 1)
+        starts.append(min(start, end))
+        ends.append(max(start, end))
+    return TimeIndex(starts, ends)
+
+
+def slice_sequence_by_time(cubesequence, start, end):
+    """
+    Return the sub-sequence of a CubeSequence with the data between times
+    start and end along common_axis. The cubes at the boundaries are
+    trimmed to views; those in between are not copied.
+
+    Parameters
+    ----------
+    cubesequence: `sunpycube.cube.datacube.CubeSequence`
+    start, end: `datetime.datetime`, `astropy.units.Quantity` or `float`
+        Ends of the range, included. Datetimes are compared with the DATE_OBS
+        and DATE_END of the cubes, Quantities and numbers of seconds with
+        the time axis of their WCS.
+    """
+    axis = cubesequence.common_axis
+    if axis is None:
+        raise ValueError("Slicing by time requires common_axis.")
+    start, end = _to_seconds(start), _to_seconds(end)
+    cubes = []
+    for index in cubesequence.time_index.overlapping(start, end):
+        cube = cubesequence.data[index]
+        first, step, length = _cube_times(cube, axis)
+        if step == 0:
+            low, high = 0, length
+        else:
+            low, high = sorted([(start - first) / step, (end - first) / step])
+            # Tolerate rounding of times that fall on an element.
+            low = max(0, int(np.ceil(low - 1e-9)))
+            high = min(length, int(np.floor(high + 1e-9)) + 1)
+        if low >= high:
+            # The range falls between two elements.
+            continue
+        if (low, high) != (0, length):
+            cube = reduce_dim(cube, axis, slice(low, high))
+        cubes.append(cube)
+    if not cubes:
+        raise ValueError("No data in the time range.")
+    return cubesequence._new_instance(cubes, meta=cubesequence.meta,
+                                      common_axis=axis)
+
+
+def _cube_values(cube):
+    """
+    Return the data of cube and its mask, or None if nothing is masked.
+    """
+    data = np.asarray(cube.data)
+    mask = getattr(cube, 'mask', None)
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.any():
+            mask = None
+    return data, mask
+
+
+def _merge_extreme(fun, a, b):
+    """
+    Combine masked minima or maxima a and b with fun, ignoring masked
+    values.
+    """
+    a_mask, b_mask = ma.getmaskarray(a), ma.getmaskarray(b)
+    a, b = ma.getdata(a), ma.getdata(b)
+    value = np.where(a_mask, b, np.where(b_mask, a, fun(a, b)))
+    return ma.array(value, mask=a_mask & b_mask)
+
+
+class _RunningReduction(object):
+    """
+    Reduction of arrays along an axis that is updated one array at a time.
+    Sums and means are accumulated directly, standard deviations by merging
+    the mean and sum of squared deviations of every array (Chan et al.), so
+    they are as accurate as those of the concatenated arrays.
+    """
+
+    def __init__(self, method, ddof=0):
+        if method not in ('sum', 'mean', 'min', 'max', 'std'):
+            raise ValueError("Unknown reduction {0}.".format(method))
+        self.method = method
+        self.ddof = ddof
+        self.count = 0
+        self.total = None
+        self.mean = None
+        self.m2 = None
+        self.extreme = None
+
+    def add(self, data, mask, axis):
+        """
+        Add the values of data that are not masked, reduced along axis.
+        """
+        if mask is None:
+            count = data.size if axis is None else data.shape[axis]
+            filled = data
+        else:
+            count = np.sum(~mask, axis)
+            filled = np.where(mask, 0, data)
+        if self.method in ('min', 'max'):
+            values = data if mask is None else ma.array(data, mask=mask)
+            extreme = getattr(values, self.method)(axis)
+            if self.extreme is None:
+                self.extreme = extreme
+            else:
+                fun = np.minimum if self.method == 'min' else np.maximum
+                self.extreme = _merge_extreme(fun, self.extreme, extreme)
+        elif self.method == 'sum':
+            total = filled.sum(axis)
+            self.total = total if self.total is None else self.total + total
+        elif self.method == 'mean':
+            total = filled.sum(axis, dtype=np.result_type(data, np.float64))
+            self.total = total if self.total is None else self.total + total
+        else:
+            total = filled.sum(axis, dtype=np.result_type(data, np.float64))
+            mean = total / np.maximum(count, 1)
+            centered = data - (mean if axis is None else
+                               np.expand_dims(mean, axis))
+            if mask is not None:
+                centered[mask] = 0
+            m2 = (centered * centered).sum(axis)
+            if self.mean is None:
+                self.mean, self.m2 = mean, m2
+            else:
+                both = np.maximum(self.count + count, 1)
+                delta = mean - self.mean
+                self.mean = self.mean + delta * count / both
+                self.m2 = self.m2 + m2 + delta * delta * self.count * count / both
+        self.count = self.count + count
+
+    def result(self):
+        """
+        Return the reduction, masked where no values were added.
+        """
+        empty = np.asarray(self.count) == 0
+        if self.method in ('min', 'max'):
+            value = self.extreme
+        elif self.method == 'sum':
+            value = ma.array(self.total, mask=empty)
+        elif self.method == 'mean':
+            value = ma.array(self.total / np.maximum(self.count, 1),
+                             mask=empty)
+        else:
+            dof = np.asarray(self.count) - self.ddof
+            value = ma.array(np.sqrt(self.m2 / np.maximum(dof, 1)),
+                             mask=dof <= 0)
+        return _unmask(value)
+
+
+def _unmask(value):
+    """
+    Return value as a masked array if anything is masked, otherwise as an
+    array or scalar.
+    """
+    if ma.is_masked(value):
+        return value
+    value = ma.getdata(value)
+    return value[()] if value.ndim == 0 else value
+
+
+def _reduction_axis(cubesequence, axis):
+    """
+    Return axis of the cubes of cubesequence as a non-negative int, or None.
+    """
+    shapes = cubesequence._cube_shapes()
+    if not shapes:
+        raise ValueError("Cannot reduce an empty sequence.")
+    if axis is None:
+        return None
+    if cubesequence.common_axis is None:
+        raise ValueError("Reducing along an axis requires common_axis.")
+    ndim = len(shapes[0])
+    if not -ndim <= axis < ndim:
+        raise ValueError("axis {0} out of range for cubes of dimension "
+                         "{1}.".format(axis, ndim))
+    return axis % ndim
+
+
+def _check_shapes(shapes, axis):
+    """
+    Raise ValueError if shapes differ apart from axis.
+    """
+    others = set(tuple(s[:axis]) + tuple(s[axis + 1:]) for s in shapes)
+    if len(others) > 1:
+        raise ValueError("Cubes must have the same shape apart from "
+                         "axis {0}.".format(axis))
+
+
+def reduce_sequence(cubesequence, method, axis=None, ddof=0):
+    """
+    Reduce the data of the cubes of a CubeSequence with method, one cube at
+    a time, ignoring masked values.
+
+    Parameters
+    ----------
+    cubesequence: `sunpycube.cube.datacube.CubeSequence`
+    method: 'sum', 'mean', 'min', 'max' or 'std'
+    axis: `int` or None
+        Axis of the cubes to reduce along. The cubes are treated as
+        concatenated along common_axis, as by index_as_cube. None reduces
+        all values.
+    ddof: `int`
+        Delta degrees of freedom of 'std'.
+
+    Returns
+    -------
+    result: scalar, `numpy.ndarray` or `numpy.ma.MaskedArray`
+        Masked where there are no values that are not masked.
+    """
+    axis = _reduction_axis(cubesequence, axis)
+    common_axis = cubesequence.common_axis
+    if axis is None or axis == common_axis:
+        if axis is not None:
+            _check_shapes(cubesequence._cube_shapes(), axis)
+        reduction = _RunningReduction(method, ddof)
+        for cube in cubesequence.data:
+            reduction.add(*_cube_values(cube), axis=axis)
+        return reduction.result()
+    # Every cube gives its part of the result along the common axis.
+    parts = []
+    for cube in cubesequence.data:
+        reduction = _RunningReduction(method, ddof)
+        reduction.add(*_cube_values(cube), axis=axis)
+        parts.append(reduction.result())
+    return _unmask(ma.concatenate(parts, common_axis - (axis < common_axis)))
+
+
+def sequence_percentile(cubesequence, q, axis=None, sample=2 ** 24):
+    """
+    Approximate percentile q of the data of the cubes of a CubeSequence,
+    ignoring masked values, reading one cube at a time.
+
+    Along an axis other than common_axis the percentiles are exact. Along
+    common_axis, or of all values, they are computed from evenly spaced
+    samples of at most sample values in total, which are exact if the
+    data is not larger than that.
+
+    Parameters
+    ----------
+    cubesequence: `sunpycube.cube.datacube.CubeSequence`
+    q: `float` or sequence of `float`
+        Percentile(s) between 0 and 100.
+    axis: `int` or None
+        See `reduce_sequence`.
+    sample: `int`
+        Largest number of values kept.
+    """
+    axis = _reduction_axis(cubesequence, axis)
+    common_axis = cubesequence.common_axis
+    shapes = cubesequence._cube_shapes()
+    if axis is None:
+        sizes = [int(np.prod(shape)) for shape in shapes]
+        step = max(1, -(-sum(sizes) // sample))
+        start, values = 0, []
+        for cube, size in zip(cubesequence.data, sizes):
+            data, mask = _cube_values(cube)
+            # Same positions as sampling the concatenated values.
+            keep = slice((-start) % step, None, step)
+            part = data.ravel()[keep]
+            if mask is not None:
+                part = part[~mask.ravel()[keep]]
+            values.append(part)
+            start += size
+        values = np.concatenate(values) if values else np.empty(0)
+        if not values.size:
+            return ma.masked_all(np.shape(q))
+        return np.percentile(values, q)
+    if axis == common_axis:
+        _check_shapes(shapes, axis)
+        image = int(np.prod(shapes[0])) // max(1, shapes[0][axis])
+        offsets = cubesequence.offsets
+        step = max(1, -(-len(offsets) * image // sample))
+    parts = []
+    for n, cube in enumerate(cubesequence.data):
+        data, mask = _cube_values(cube)
+        if axis == common_axis:
+            indices = np.arange((-offsets.starts[n]) % step, data.shape[axis],
+                                step)
+            data = data.take(indices, axis)
+            mask = None if mask is None else mask.take(indices, axis)
+        data = data.astype(np.result_type(data, np.float64))
+        if mask is not None:
+            data[mask] = np.nan
+        if axis == common_axis:
+            parts.append(data)
+        else:
+            parts.append(np.nanpercentile(data, q, axis))
+    if axis == common_axis:
+        result = np.nanpercentile(np.concatenate(parts, axis), q, axis)
+    else:
+        # np.nanpercentile puts the percentiles of a sequence q first.
+        result = np.concatenate(parts, common_axis - (axis < common_axis) +
+                                np.ndim(q))
+    return _unmask(ma.masked_invalid(result))
+
+
+def _allocate(shape, dtype, filename=None):
+    """
+    Return a zeroed array, memory mapped to filename if it is given.
+    """
+    if filename is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode='w+', shape=tuple(shape))
+
+
+def _wcs_continues(wcs, other, axis, offset):
+    """
+    Return whether other is wcs shifted by offset pixels along pixel axis
+    axis, i.e. the WCS of a cube that starts offset pixels into the cube
+    of wcs along axis.
+    """
+    a, b = wcs.wcs, other.wcs
+    if wcs.naxis != other.naxis or list(a.ctype) != list(b.ctype):
+        return False
+    others = np.arange(wcs.naxis) != axis
+    if not (np.allclose(a.cdelt, b.cdelt) and
+            np.allclose(a.crval[others], b.crval[others]) and
+            np.allclose(a.crpix[others], b.crpix[others]) and
+            np.allclose(a.get_pc(), b.get_pc())):
+        return False
+    shift = (a.crpix[axis] - b.crpix[axis] +
+             (b.crval[axis] - a.crval[axis]) / a.cdelt[axis])
+    return abs(shift - offset) < 1e-6
+
+
+def stack_sequence(cubesequence, filename=None, dtype=None):
+    """
+    Join the cubes of a CubeSequence along common_axis into one Cube.
+
+    The output is allocated once, in memory or as a memory mapped file, and
+    the data, mask and uncertainty of every cube are copied into place one
+    cube at a time, so the peak memory use is the output plus one cube. The
+    WCS is that of the first cube extended along common_axis; a warning is
+    issued if the other cubes do not continue it.
+
+    Parameters
+    ----------
+    cubesequence: `sunpycube.cube.datacube.CubeSequence`
+    filename: `str` or None
+        File to memory map the data to. The mask and uncertainty are mapped
+        to the same name with '.mask' and '.err' appended.
+    dtype: `numpy.dtype` or None
+        Data type of the output; defaults to that of the first cube.
+
+    Returns
+    -------
+    cube: `sunpycube.cube.datacube.Cube`
+        Of the class of the first cube, with its meta. Uncertainties of
+        cubes that have none are NaN. The mask is only allocated, and
+        mapped to a file, once a cube has masked values; otherwise the
+        cube gets the default mask of its class.
+    """
+    axis = cubesequence.common_axis
+    if axis is None:
+        raise ValueError("Stacking requires common_axis.")
+    shapes = cubesequence._cube_shapes()
+    if not shapes:
+        raise ValueError("Cannot stack an empty sequence.")
+    _check_shapes(shapes, axis)
+    starts = cubesequence.offsets.starts
+    shape = list(shapes[0])
+    shape[axis] = int(starts[-1])
+    pixel_axis = len(shape) - 1 - axis
+
+    def extra(suffix):
+        return None if filename is None else filename + suffix
+
+    first = data = mask = errors = uncertainty = None
+    continues = True
+    for n, cube in enumerate(cubesequence.data):
+        if first is None:
+            first = cube
+            data = _allocate(shape, dtype or cube.data.dtype, filename)
+        else:
+            continues = continues and _wcs_continues(
+                first.axes_wcs, cube.axes_wcs, pixel_axis, starts[n])
+        index = [slice(None)] * len(shape)
+        index[axis] = slice(starts[n], starts[n + 1])
+        index = tuple(index)
+        data[index] = cube.data
+        if cube.mask is not None and np.any(cube.mask):
+            # Allocated zeroed, so the cubes before are not masked.
+            if mask is None:
+                mask = _allocate(shape, bool, extra('.mask'))
+            mask[index] = cube.mask
+        if cube.uncertainty is not None:
+            if errors is None:
+                uncertainty = type(cube.uncertainty)
+                # Cubes without errors get NaN, so they must be float.
+                errors = _allocate(
+                    shape, np.result_type(cube.uncertainty.array.dtype, float),
+                    extra('.err'))
+                errors[...] = np.nan
+            errors[index] = cube.uncertainty.array
+        elif errors is not None:
+            errors[index] = np.nan
+    if not continues:
+        warnings.warn("The cubes' WCS do not continue each other along the "
+                      "common axis; the WCS of the first cube is used.")
+    wcs = first.axes_wcs.deepcopy()
+    wcs_util.set_pixel_length(wcs, pixel_axis, shape[axis])
+    if errors is not None:
+        errors = uncertainty(errors)
+    kwargs = {'meta': first.meta, 'unit': first.unit}
+    if mask is not None:
+        kwargs.update({'mask': mask})
+    return first._new_instance(data, wcs, errors=errors, **kwargs)
+
+
+# Function and cubes of the worker processes of map_sequence.
+_map_state = {}
+
+
+def _init_map_worker(function, cubes):
+    """
+    Implementation detail.
+    """
+    _map_state.clear()
+    _map_state.update(function=function, cubes=cubes)
+
+
+def _map_cube(index):
+    """
+    Apply the function of a worker process to its cube index.
+    """
+    return _map_state['function'](_map_state['cubes'][index])
+
+
+def _run_pool(pool, function, indices, chunksize):
+    """
+    Map function over indices on pool and shut it down, waiting for the
+    workers to exit unless the map failed.
+    """
+    try:
+        results = pool.map(function, indices, chunksize)
+    except BaseException:
+        pool.terminate()
+        raise
+    pool.close()
+    pool.join()
+    return results
+
+
+def map_sequence(cubesequence, function, pool='thread', workers=None,
+                 chunksize=1):
+    """
+    Apply function to every cube of a CubeSequence in parallel and return
+    the sequence of the results.
+
+    Parameters
+    ----------
+    cubesequence: `sunpycube.cube.datacube.CubeSequence`
+    function: function
+        Called with every cube, returns the new cube.
+    pool: 'thread' or 'process'
+        Run function on a pool of threads, which share the cubes, or of
+        processes. The cubes are handed to the worker processes when they
+        start, which does not copy them on platforms that fork. The cubes
+        of a `sunpycube.cube.lazy.FileCubeSequence` are read by the workers
+        themselves. The results are pickled back.
+    workers: `int` or None
+        Number of threads or processes. None uses one per CPU, 1 runs
+        function in this thread.
+    chunksize: `int`
+        Number of cubes handed to a worker at a time.
+
+    Returns
+    -------
+    result: `sunpycube.cube.datacube.CubeSequence`
+        With the meta and common_axis of cubesequence.
+    """
+    if pool not in ('thread', 'process'):
+        raise ValueError("pool must be 'thread' or 'process'.")
+    cubes = cubesequence.data
+    indices = range(len(cubes))
+    if workers == 1:
+        results = [function(cubes[index]) for index in indices]
+    elif pool == 'thread':
+        results = _run_pool(ThreadPool(workers),
+                            lambda index: function(cubes[index]),
+                            indices, chunksize)
+    else:
+        results = _run_pool(Pool(workers, _init_map_worker, (function, cubes)),
+                            _map_cube, indices, chunksize)
+    return cubesequence._new_instance(results, meta=cubesequence.meta,
+                                      common_axis=cubesequence.common_axis)
 
 
 def _convert_cube_like_index_to_sequence_indices(cube_like_index, cumul_cube_lengths):
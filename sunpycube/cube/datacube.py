@@ -174,8 +174,20 @@ class Cube(astropy.nddata.NDDataArray):
             same length as the axis which will provide all values for that slider.
             If None is specified for an axis then the array indices will be used
             for that axis.
+
+        prefetch: `int`
+            Number of frames to load ahead in either direction on background
+            threads while the slider moves. 0 disables prefetching. The
+            threads are stopped when the figure is closed.
+
+        transform: function or None
+            Called with every frame as it is loaded, e.g. to normalize it;
+            its result is shown instead.
         """
-        i = ImageAnimatorWCS(self.data, wcs=self.axes_wcs, *args, **kwargs)
+        data = ani.prefetched(self.data, kwargs.pop('prefetch', 0),
+                              kwargs.pop('transform', None))
+        i = ImageAnimatorWCS(data, wcs=self.axes_wcs, *args, **kwargs)
+        ani.close_with_figure(i)
         return i
 
     def _choose_wavelength_slice(self, offset):
@@ -535,6 +547,73 @@ class Cube(astropy.nddata.NDDataArray):
             return cu.getitem_4d(self, pixels)
 
 
+class CubeList(list):
+    """
+    List of cubes that counts its changes, so values computed from the
+    cubes can tell whether they are still valid.
+
+    Attributes
+    ----------
+    version : `int`
+        Incremented on every change of the list.
+    """
+
+    version = 0
+
+    def __setitem__(self, index, value):
+        self.version += 1
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index):
+        self.version += 1
+        list.__delitem__(self, index)
+
+    # Python 2 lists use these for simple slices.
+    def __setslice__(self, start, stop, values):
+        self.version += 1
+        list.__setslice__(self, start, stop, values)
+
+    def __delslice__(self, start, stop):
+        self.version += 1
+        list.__delslice__(self, start, stop)
+
+    def __iadd__(self, values):
+        self.version += 1
+        return list.__iadd__(self, values)
+
+    def __imul__(self, count):
+        self.version += 1
+        return list.__imul__(self, count)
+
+    def append(self, value):
+        self.version += 1
+        list.append(self, value)
+
+    def extend(self, values):
+        self.version += 1
+        list.extend(self, values)
+
+    def insert(self, index, value):
+        self.version += 1
+        list.insert(self, index, value)
+
+    def pop(self, index=-1):
+        self.version += 1
+        return list.pop(self, index)
+
+    def remove(self, value):
+        self.version += 1
+        list.remove(self, value)
+
+    def reverse(self):
+        self.version += 1
+        list.reverse(self)
+
+    def sort(self, *args, **kwargs):
+        self.version += 1
+        list.sort(self, *args, **kwargs)
+
+
 class CubeSequence(object):
     """
     Class representing list of cubes.
@@ -561,7 +640,9 @@ class CubeSequence(object):
         self.common_axis = common_axis
         self.time = kwargs.get('time', None)
         try:
-            self.shape = tuple([len(data_list)] + list(data_list[0].shape))
+            shapes = self._cube_shapes()
+            self.shape = tuple([len(data_list)] +
+                               list(shapes[0] if shapes else []))
         except AttributeError as err:
             warnings.warn("AttributeError " + str(err))
             self.shape = tuple([len(data_list)])
@@ -571,7 +652,140 @@ class CubeSequence(object):
             raise IndexError("None indices not supported")
         return cu.get_cube_from_sequence(self, item)
 
+    @property
+    def offsets(self):
+        """
+        `sunpycube.cube.cube_utils.SequenceOffsets` of the cubes along
+        common_axis. It is computed once and kept until common_axis changes
+        or the data list is replaced or changed, e.g. a cube is assigned.
+        """
+        return self._cached('_offsets', lambda: cu.SequenceOffsets(
+            [shape[self.common_axis] for shape in self._cube_shapes()]))
+
+    def _cube_shapes(self):
+        """
+        Return the shapes of the cubes.
+        """
+        return [c.shape for c in self.data]
+
+    @property
+    def data(self):
+        """
+        The list of cubes. Lists assigned to it are copied into a
+        `CubeList`, so changes to them afterwards are not seen.
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data_list):
+        if not hasattr(data_list, 'version'):
+            data_list = CubeList(data_list)
+        self._data = data_list
+
+    def _cached(self, name, compute):
+        """
+        Return the value computed by compute kept in attribute name,
+        computing it again if common_axis or the data list have changed
+        since.
+        """
+        state = (self.common_axis, self.data, self.data.version)
+        cached = getattr(self, name, None)
+        if (cached is None or cached[0] != state[0] or
+                cached[1] is not state[1] or cached[2] != state[2]):
+            cached = state + (compute(),)
+            setattr(self, name, cached)
+        return cached[3]
+
+    @property
+    def time_index(self):
+        """
+        `sunpycube.cube.cube_utils.TimeIndex` of the time ranges of the
+        cubes along common_axis, from the time axis of their WCS or their
+        DATE_OBS and DATE_END. It is built once, reading every cube, and kept
+        until common_axis changes or the data list is replaced or changed.
+        """
+        return self._cached('_time_index',
+                            lambda: cu.sequence_time_index(self))
+
+    def time_slice(self, start, end):
+        """
+        Return the sub-sequence of the data between times start and end,
+        included, with the cubes at the boundaries trimmed to views. See
+        `sunpycube.cube.cube_utils.slice_sequence_by_time`.
+        """
+        return cu.slice_sequence_by_time(self, start, end)
+
+    def sum(self, axis=None):
+        """
+        Sum of the unmasked data along axis of the cubes, with the cubes
+        joined along common_axis, or of all data if axis is None. Cubes are
+        read one at a time. See `sunpycube.cube.cube_utils.reduce_sequence`.
+        """
+        return cu.reduce_sequence(self, 'sum', axis)
+
+    def mean(self, axis=None):
+        """
+        Mean of the unmasked data, see `sum`.
+        """
+        return cu.reduce_sequence(self, 'mean', axis)
+
+    def min(self, axis=None):
+        """
+        Minimum of the unmasked data, see `sum`.
+        """
+        return cu.reduce_sequence(self, 'min', axis)
+
+    def max(self, axis=None):
+        """
+        Maximum of the unmasked data, see `sum`.
+        """
+        return cu.reduce_sequence(self, 'max', axis)
+
+    def std(self, axis=None, ddof=0):
+        """
+        Standard deviation of the unmasked data, see `sum`.
+        """
+        return cu.reduce_sequence(self, 'std', axis, ddof)
+
+    def stack(self, filename=None, dtype=None):
+        """
+        Join the cubes along common_axis into one Cube, with the data, mask
+        and uncertainties copied into an output allocated once, memory
+        mapped to filename if it is given. See
+        `sunpycube.cube.cube_utils.stack_sequence`.
+        """
+        return cu.stack_sequence(self, filename, dtype)
+
+    def map(self, function, pool='thread', workers=None, chunksize=1):
+        """
+        Apply function to every cube on a pool of threads or processes and
+        return a new sequence of the results, with the same meta and
+        common_axis. See `sunpycube.cube.cube_utils.map_sequence`.
+
+        Example
+        -------
+        >>> calibrated = seq.map(calibrate, pool='process', workers=4)
+        """
+        return cu.map_sequence(self, function, pool, workers, chunksize)
+
+    def percentile(self, q, axis=None, sample=2 ** 24):
+        """
+        Approximate percentile q of the unmasked data, see `sum`. Along
+        common_axis and of all data it is estimated from at most sample
+        evenly spaced values, see
+        `sunpycube.cube.cube_utils.sequence_percentile`.
+        """
+        return cu.sequence_percentile(self, q, axis, sample)
+
     def animate(self, *args, **kwargs):
+        """
+        Plots an interactive visualization of the sequence with the cubes
+        joined along their first axis. Frames are read from the cubes as they
+        are shown; pass prefetch=n to load the next n frames in either
+        direction on background threads, and transform to process every
+        frame as it is loaded. See
+        `sunpycube.visualization.animation.ImageAnimatorCubeSequence`.
+        """
         i = ani.ImageAnimatorCubeSequence(self, *args, **kwargs)
         return i
 
@@ -618,10 +832,8 @@ class CubeSequence(object):
         style: 'imshow' or 'pcolormesh'
             The style of plot to be used. Default is 'imshow'
         """
-        cumul_cube_lengths = np.cumsum(np.array([c.shape[self.common_axis]
-                                                 for c in self.data]))
         sequence_index, cube_index = cu._convert_cube_like_index_to_sequence_indices(
-            offset, cumul_cube_lengths)
+            offset, self.offsets.cumul_cube_lengths)
         plot = self[sequence_index].plot_x_slice(cube_index, **kwargs)
         return plot
 
@@ -644,10 +856,8 @@ class CubeSequence(object):
         style: 'imshow' or 'pcolormesh'
             The style of plot to be used. Default is 'imshow'
         """
-        cumul_cube_lengths = np.cumsum(np.array([c.shape[self.common_axis]
-                                                 for c in self.data]))
         sequence_index, cube_index = cu._convert_cube_like_index_to_sequence_indices(
-            offset, cumul_cube_lengths)
+            offset, self.offsets.cumul_cube_lengths)
         plot = self[sequence_index].plot_wavelength_slice(cube_index, **kwargs)
         return plot
 
@@ -670,5 +880,17 @@ class _IndexAsCubeSlicer(object):
     def __init__(self, seq):
         self.seq = seq
 
+    @property
+    def shape(self):
+        """
+        Shape of the cubes as if they were concatenated along common_axis.
+        """
+        shape = list(self.seq._cube_shapes()[0])
+        shape[self.seq.common_axis] = len(self.seq.offsets)
+        return tuple(shape)
+
+    def __len__(self):
+        return self.shape[0]
+
     def __getitem__(self, item):
         return cu.index_sequence_as_cube(self.seq, item)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Sequences of cubes read from files when they are first used.
+"""
+
+from __future__ import absolute_import
+
+import threading
+from collections import OrderedDict
+
+from astropy.io import fits
+
+from sunpycube.cube.datacube import CubeSequence
+
+__all__ = ['LazyCubeList', 'FileCubeSequence', 'fits_shape']
+
+
+def fits_shape(filename, ext=0):
+    """
+    Return the shape of the data of a FITS file, in numpy order, only
+    reading its header.
+    """
+    header = fits.getheader(filename, ext)
+    return tuple(header['NAXIS{0}'.format(n)]
+                 for n in range(header['NAXIS'], 0, -1))
+
+
+class _CubeCache(object):
+    """
+    The most recently used cubes, by file name.
+    """
+
+    def __init__(self, loader, max_open):
+        self.loader = loader
+        self.max_open = max(1, max_open)
+        self._cubes = OrderedDict()
+        self._lock = threading.Lock()
+        # Events of the files being read, set once they are kept.
+        self._loading = {}
+
+    def __getstate__(self):
+        # Other processes read the cubes again rather than receive copies.
+        return {'loader': self.loader, 'max_open': self.max_open}
+
+    def __setstate__(self, state):
+        self.__init__(state['loader'], state['max_open'])
+
+    def __len__(self):
+        return len(self._cubes)
+
+    def __contains__(self, filename):
+        return filename in self._cubes
+
+    def _keep(self, filename, cube):
+        """
+        Store cube as the most recently used. Must hold the lock.
+        """
+        self._cubes[filename] = cube
+        while len(self._cubes) > self.max_open:
+            self._cubes.popitem(last=False)
+
+    def get(self, filename):
+        """
+        Return the cube of filename, reading it if it is not kept. A file
+        is only read by one thread at a time, the others wait for it.
+        """
+        while True:
+            with self._lock:
+                cube = self._cubes.pop(filename, None)
+                if cube is not None:
+                    self._keep(filename, cube)
+                    return cube
+                loading = self._loading.get(filename)
+                if loading is None:
+                    loading = self._loading[filename] = threading.Event()
+                    break
+            # If the other thread fails or the cube is dropped right
+            # away, it is read here instead.
+            loading.wait()
+        # Files are read outside the lock, so threads can read in parallel.
+        try:
+            cube = self.loader(filename)
+            with self._lock:
+                self._keep(filename, cube)
+        finally:
+            with self._lock:
+                del self._loading[filename]
+            loading.set()
+        return cube
+
+
+class LazyCubeList(object):
+    """
+    List of cubes that are read from their files when they are accessed.
+
+    At most max_open cubes read are kept in memory, the least recently used
+    are dropped and read again when needed. Slices share those cubes.
+    Cubes that are assigned to an item, e.g. by slicing a
+    `sunpycube.cube.datacube.CubeSequence`, replace the file for that list.
+
+    Attributes
+    ----------
+    filenames : `list` of `str`
+    shapes : `list` of `tuple`
+        Shapes of the cubes, known without reading them.
+    version : `int`
+        Incremented on every assignment, like `sunpycube.cube.datacube.CubeList`.
+    """
+
+    def __init__(self, filenames, shapes, cache):
+        if len(filenames) != len(shapes):
+            raise ValueError("There must be one shape per file.")
+        self.filenames = list(filenames)
+        self.shapes = [tuple(shape) for shape in shapes]
+        self._cache = cache
+        self._replaced = {}
+        self.version = 0
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _index(self, index):
+        """
+        Implementation detail.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return index
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            indices = range(len(self))[item]
+            result = LazyCubeList([self.filenames[i] for i in indices],
+                                  [self.shapes[i] for i in indices],
+                                  self._cache)
+            result._replaced = dict((n, self._replaced[i])
+                                    for n, i in enumerate(indices)
+                                    if i in self._replaced)
+            return result
+        index = self._index(item)
+        if index in self._replaced:
+            return self._replaced[index]
+        return self._cache.get(self.filenames[index])
+
+    def __setitem__(self, index, cube):
+        index = self._index(index)
+        self.version += 1
+        self._replaced[index] = cube
+        self.shapes[index] = tuple(cube.shape)
+
+
+class FileCubeSequence(CubeSequence):
+    """
+    CubeSequence whose cubes are read from files on demand.
+
+    Only the shapes of the cubes are read up front, so indexing, including
+    index_as_cube and the plot_*_slice methods, only reads the files of
+    the cubes it uses. Slicing the sequence gives a FileCubeSequence of the
+    same files.
+
+    Parameters
+    ----------
+    filenames: `list` of `str`
+        The files, one per cube, in sequence order.
+
+    loader: function
+        Called with a file name, returns its `sunpycube.cube.datacube.Cube`.
+        For example, to read one window of EIS files:
+        ``lambda f: EISSpectralCube.read(f)['FE XII 195.120']``.
+
+    shape_loader: function
+        Called with a file name, returns the shape of its cube. Defaults to
+        `fits_shape`, which reads the primary header.
+
+    max_open: `int`
+        Largest number of cubes kept in memory.
+
+    meta: `dict` or None
+        The header of the CubeSequence.
+
+    common_axis: `int` or None
+        See `sunpycube.cube.datacube.CubeSequence`.
+    """
+
+    def __init__(self, filenames, loader=None, shape_loader=fits_shape,
+                 max_open=4, meta=None, common_axis=0, **kwargs):
+        if isinstance(filenames, LazyCubeList):
+            data = filenames
+        else:
+            if loader is None:
+                raise ValueError("A loader is needed to read the cubes.")
+            data = LazyCubeList(filenames,
+                                [shape_loader(f) for f in filenames],
+                                _CubeCache(loader, max_open))
+        super(FileCubeSequence, self).__init__(data, meta, common_axis,
+                                               **kwargs)
+
+    @property
+    def max_open(self):
+        return self.data._cache.max_open
+
+    def _cube_shapes(self):
+        return self.data.shapes
+
+    @classmethod
+    def _new_instance(cls, data_list, meta=None, common_axis=None):
+        """
+        Instantiate a new instance of this class using given data.
+        """
+        if isinstance(data_list, LazyCubeList):
+            return cls(data_list, meta=meta, common_axis=common_axis)
+        return CubeSequence(data_list, meta=meta, common_axis=common_axis)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import datetime
 import pytest
 from sunpycube.cube import cube_utils as cu
 import numpy as np
@@ -150,4 +151,102 @@ def test_convert_cube_like_index_to_sequence_indices(test_input, expected):
                                                     np.array([8, 16, 24, 32])), (slice(0, 4), [slice(5, 8)])),
 ])
 def test_convert_cube_like_slice_to_sequence_slices(test_input, expected):
-    assert test_input == expected
\ No newline at end of file
+    assert test_input == expected
+
+offsets = cu.SequenceOffsets([8, 0, 8, 5])
+
+
+@pytest.mark.parametrize("test_input,expected", [
+    (offsets.locate(0), (0, 0)),
+    (offsets.locate(7), (0, 7)),
+    (offsets.locate(8), (2, 0)),
+    (offsets.locate(20), (3, 4)),
+    (offsets.locate(-1), (3, 4)),
+    (offsets.locate(-21), (0, 0)),
+])
+def test_sequence_offsets_locate(test_input, expected):
+    assert test_input == expected
+
+
+@pytest.mark.parametrize("index", [21, -22])
+def test_sequence_offsets_locate_out_of_range(index):
+    with pytest.raises(IndexError):
+        offsets.locate(index)
+
+
+@pytest.mark.parametrize("test_input,expected", [
+    (offsets.split(slice(2, 5)), [(0, slice(2, 5, 1))]),
+    (offsets.split(slice(5, 18)),
+     [(0, slice(5, 8, 1)), (2, slice(0, 8, 1)), (3, slice(0, 2, 1))]),
+    (offsets.split(slice(None, None, 3)),
+     [(0, slice(0, 8, 3)), (2, slice(1, 8, 3)), (3, slice(2, 5, 3))]),
+    (offsets.split(slice(-3, None)), [(3, slice(2, 5, 1))]),
+    (offsets.split(slice(10, 3, -4)), [(2, slice(2, None, -4)),
+                                       (0, slice(6, 3, -4))]),
+    (offsets.split(slice(5, 5)), []),
+])
+def test_sequence_offsets_split(test_input, expected):
+    assert test_input == expected
+
+
+arrays = [np.arange(24).reshape(2, 3, 4), np.arange(24, 36).reshape(1, 3, 4),
+          np.arange(36, 84).reshape(4, 3, 4)]
+concatenated = cu.ConcatenatedArray(arrays)
+full = np.concatenate(arrays)
+
+
+def test_concatenated_array_shape():
+    assert concatenated.shape == (7, 3, 4)
+    assert concatenated.ndim == 3
+    assert len(concatenated) == 7
+    assert np.array_equal(np.asarray(concatenated), full)
+
+
+@pytest.mark.parametrize("item", [
+    2, -1, (3, 1), [5, slice(None), slice(None)], (0, slice(1, 3), 2),
+    slice(1, 6), slice(None, None, -2), (slice(3, 7), 0), slice(2, 3),
+    slice(4, 4),
+])
+def test_concatenated_array_getitem(item):
+    key = tuple(item) if isinstance(item, list) else item
+    assert np.array_equal(concatenated[item], full[key])
+
+
+def test_concatenated_array_views():
+    # Frames within one array are not copied.
+    frame = concatenated[[4, slice(None), slice(None)]]
+    assert np.may_share_memory(frame, arrays[2])
+
+
+# Cubes taken one after the other, the third overlapping the second, the
+# fourth containing the fifth.
+time_index = cu.TimeIndex([0, 10, 15, 30, 32], [9, 20, 25, 40, 35])
+
+
+@pytest.mark.parametrize("start,end,expected", [
+    (0, 5, [0]),
+    (9, 10, [0, 1]),
+    (16, 18, [1, 2]),
+    (26, 29, []),
+    (33, 33, [3, 4]),
+    (36, 100, [3]),
+    (-10, 100, [0, 1, 2, 3, 4]),
+])
+def test_time_index_overlapping(start, end, expected):
+    assert list(time_index.overlapping(start, end)) == expected
+
+
+def test_time_index_at():
+    assert list(time_index.at(20)) == [1, 2]
+    assert list(time_index.at(41)) == []
+    with pytest.raises(ValueError):
+        time_index.overlapping(5, 0)
+
+
+@pytest.mark.parametrize("time,expected", [
+    (3.5, 3.5),
+    (2 * u.min, 120),
+    (datetime.datetime(1, 1, 2, 0, 0, 1, 500000), 86401.5),
+])
+def test_to_seconds(time, expected):
+    assert cu._to_seconds(time) == expected
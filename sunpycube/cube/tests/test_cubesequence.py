@@ -1,4 +1,5 @@
 from __future__ import absolute_import
+import datetime
 from sunpycube.cube.datacube import Cube, CubeSequence
 from sunpycube.cube import cube_utils as cu
 from sunpy.map.mapbase import GenericMap
@@ -9,6 +10,7 @@ import numpy as np
 from sunpycube.wcs_util import WCS
 import pytest
 import astropy.units as u
+from astropy.nddata import StdDevUncertainty
 
 
 # sample data for tests
@@ -65,3 +67,199 @@ def test_slice_first_index_sequence(test_input, expected):
 ])
 def test_slice_first_index_sequence(test_input, expected):
     assert test_input == expected
+
+
+mask = np.zeros(data.shape, dtype=bool)
+mask[0, 1] = True
+mask[1, 1, 1:] = True
+cube_masked = Cube(data2, wm, mask=mask)
+seq_reduce = CubeSequence([cube2, cube_masked, cube4], common_axis=0)
+data_reduce = np.ma.concatenate(
+    [np.ma.array(c.data, mask=c.mask) for c in seq_reduce.data])
+
+
+@pytest.mark.parametrize("method", ['sum', 'mean', 'min', 'max', 'std'])
+@pytest.mark.parametrize("axis", [None, 0, 1, -1])
+def test_reductions(method, axis):
+    result = getattr(seq_reduce, method)(axis=axis)
+    expected = getattr(data_reduce, method)(axis=axis)
+    assert np.allclose(result, expected)
+    assert np.all(np.ma.getmaskarray(result) == np.ma.getmaskarray(expected))
+
+
+@pytest.mark.parametrize("axis", [None, 0, 2])
+def test_percentile(axis):
+    values = np.ma.filled(data_reduce.astype(float), np.nan)
+    assert np.allclose(seq_reduce.percentile([25, 50], axis=axis),
+                       np.nanpercentile(values, [25, 50], axis=axis))
+
+
+def test_percentile_sampled():
+    # Every other value of the concatenation.
+    assert seq_reduce.percentile(50, sample=36) == np.percentile(
+        data_reduce.ravel()[::2].compressed(), 50)
+
+
+def test_reduction_shapes_differ():
+    with pytest.raises(ValueError):
+        CubeSequence([cube2, Cube(data[:, :2], wm)]).mean(axis=0)
+
+
+def test_reduction_empty():
+    with pytest.raises(ValueError):
+        CubeSequence([]).mean(axis=0)
+    with pytest.raises(ValueError):
+        CubeSequence([]).sum()
+    with pytest.raises(ValueError):
+        CubeSequence([]).percentile(50)
+    masked = Cube(data, wm, mask=np.ones(data.shape, dtype=bool))
+    result = CubeSequence([masked]).percentile([25, 75])
+    assert result.shape == (2,)
+    assert result.mask.all()
+
+
+def _wcs_world(cube, axis, pixels):
+    """
+    World coordinates of pixels along data axis of cube.
+    """
+    coords = np.zeros((len(pixels), 3))
+    coords[:, 2 - axis] = pixels
+    return cube.axes_wcs.wcs_pix2world(coords, 0)
+
+
+@pytest.mark.parametrize("item", [slice(None, None, 2), slice(None, None, -1)])
+def test_index_as_cube_step(item):
+    seq = CubeSequence([cube2, cube4], common_axis=2)
+    result = seq.index_as_cube[:, :, item]
+    expected = np.concatenate([data, data2], axis=2)[:, :, item]
+    assert np.all(np.concatenate([c.data for c in result.data], axis=2) ==
+                  expected)
+    # Both cubes share wm and are 4 long along the common axis.
+    expected = _wcs_world(cube2, 2, (np.arange(8) % 4)[item])
+    world = np.concatenate([_wcs_world(c, 2, np.arange(c.data.shape[2]))
+                            for c in result.data])
+    # Wavelengths are in metres, too small for the default tolerance.
+    assert np.allclose(world, expected, rtol=1e-10, atol=0)
+
+
+def double_cube(cube):
+    return Cube(cube.data * 2, cube.axes_wcs, mask=cube.mask)
+
+
+@pytest.mark.parametrize("pool,workers", [
+    ('thread', None), ('thread', 1), ('process', 2),
+])
+def test_map(pool, workers):
+    result = seq_reduce.map(double_cube, pool=pool, workers=workers)
+    assert isinstance(result, CubeSequence)
+    assert result.common_axis == seq_reduce.common_axis
+    assert result.meta is seq_reduce.meta
+    for cube, doubled in zip(seq_reduce.data, result.data):
+        assert np.all(doubled.data == cube.data * 2)
+        assert np.all(doubled.mask == cube.mask)
+    with pytest.raises(ValueError):
+        seq_reduce.map(double_cube, pool='cluster')
+
+
+def test_stack():
+    # Second cube follows the first along the common axis.
+    wm_next = WCS(header=dict(hm, CRPIX3=0), naxis=3)
+    errors = StdDevUncertainty(np.ones(data.shape, dtype=int))
+    seq_stack = CubeSequence([cube_masked, Cube(data, wm_next, errors=errors)],
+                             meta=None, common_axis=0)
+    stacked = seq_stack.stack()
+    assert isinstance(stacked, Cube)
+    assert np.all(stacked.data == np.concatenate([data2, data]))
+    assert np.all(stacked.mask == np.concatenate([mask, np.zeros_like(mask)]))
+    assert np.all(np.isnan(stacked.uncertainty.array[:2]))
+    assert np.all(stacked.uncertainty.array[2:] == 1)
+    assert np.allclose(stacked.axes_wcs.wcs.crpix, wm.wcs.crpix)
+    assert stacked.axes_wcs.pixel_shape[2] == 4
+
+
+def test_stack_memmap(tmpdir):
+    filename = str(tmpdir.join('stack.dat'))
+    with pytest.warns(UserWarning):
+        stacked = seq_reduce.stack(filename=filename, dtype=np.float32)
+    assert isinstance(stacked.data, np.memmap)
+    assert stacked.data.dtype == np.float32
+    assert np.all(stacked.data == data_reduce.data)
+    assert np.all(stacked.mask == data_reduce.mask)
+
+
+def test_stack_unmasked(tmpdir):
+    filename = str(tmpdir.join('stack.dat'))
+    stacked = CubeSequence([cube2, cube4]).stack(filename=filename)
+    assert not stacked.mask.any()
+    assert not tmpdir.join('stack.dat.mask').check()
+
+
+def timed_cube(start, stop):
+    tformat = '%Y-%m-%dT%H:%M:%S.%f'
+    meta = {'DATE_OBS': start.strftime(tformat),
+            'DATE_END': stop.strftime(tformat)}
+    return Cube(np.arange(24).reshape(2, 3, 4), wm, meta=meta)
+
+
+# Two elements per cube along the common axis, 10 s apart, every minute.
+minute = datetime.timedelta(minutes=1)
+second = datetime.timedelta(seconds=1)
+day = datetime.datetime(2015, 7, 1)
+seq_timed = CubeSequence(
+    [timed_cube(day + n * minute, day + n * minute + 10 * second)
+     for n in range(5)], common_axis=0)
+
+
+def test_offsets_follow_changes():
+    seq = CubeSequence([cube2, cube4], common_axis=0)
+    offsets = seq.offsets
+    assert seq.offsets is offsets
+    seq.data.append(cube2)
+    assert len(seq.offsets) == 6
+    del seq.data[0]
+    assert len(seq.offsets) == 4
+    seq.data = [cube2]
+    assert len(seq.offsets) == 2
+
+
+def test_time_index():
+    assert list(seq_timed.time_index.at(cu._to_seconds(day + minute))) == [1]
+    assert seq_timed.time_index is seq_timed.time_index
+    # Replacing a cube in place is noticed.
+    seq = CubeSequence(list(seq_timed.data), common_axis=0)
+    assert list(seq.time_index.at(cu._to_seconds(day + 9 * minute))) == []
+    seq.data[1] = timed_cube(day + 9 * minute, day + 9 * minute + second)
+    assert list(seq.time_index.at(cu._to_seconds(day + 9 * minute))) == [1]
+
+
+def test_cube_times():
+    # Without fractional seconds.
+    cube = Cube(data, wm, meta={'DATE_OBS': '2015-07-01T00:01:00',
+                                'DATE_END': '2015-07-01T00:01:10.5'})
+    assert cu._cube_times(cube, 0) == (cu._to_seconds(day + minute), 10.5, 2)
+    # The time axis of the WCS is the last data axis.
+    htime = dict(hm, CTYPE1='TIME', CUNIT1='min', CDELT1=0.5, CRVAL1=1)
+    cube = Cube(data, WCS(header=htime, naxis=3), meta=cube.meta)
+    assert cu._cube_times(cube, 2) == (60, 30, 4)
+    assert cu._cube_times(cube, 0) == (cu._to_seconds(day + minute), 10.5, 2)
+
+
+@pytest.mark.parametrize("start,end,shapes", [
+    (day, day + 2 * minute, [(2, 3, 4), (2, 3, 4), (1, 3, 4)]),
+    (day + 5 * second, day + minute + 10 * second, [(1, 3, 4), (2, 3, 4)]),
+    (day + 3 * minute + 10 * second, day + 10 * minute,
+     [(1, 3, 4), (2, 3, 4)]),
+])
+def test_time_slice(start, end, shapes):
+    result = seq_timed.time_slice(start, end)
+    assert isinstance(result, CubeSequence)
+    assert [c.data.shape for c in result.data] == shapes
+    # Cubes are not copied, trimmed ones are views.
+    for cube in result.data:
+        assert any(np.may_share_memory(cube.data, other.data)
+                   for other in seq_timed.data)
+
+
+def test_time_slice_empty():
+    with pytest.raises(ValueError):
+        seq_timed.time_slice(day + 20 * second, day + 30 * second)
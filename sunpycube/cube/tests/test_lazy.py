@@ -0,0 +1,136 @@
+from __future__ import absolute_import
+from sunpycube.cube.datacube import Cube, CubeSequence
+from sunpycube.cube.lazy import FileCubeSequence, fits_shape
+from sunpycube.wcs_util import WCS
+from astropy.io import fits
+import numpy as np
+import pytest
+import os
+import threading
+import time
+
+
+hm = {
+    'CTYPE1': 'WAVE    ', 'CUNIT1': 'Angstrom', 'CDELT1': 0.2, 'CRPIX1': 0, 'CRVAL1': 10, 'NAXIS1': 4,
+    'CTYPE2': 'HPLT-TAN', 'CUNIT2': 'deg', 'CDELT2': 0.5, 'CRPIX2': 2, 'CRVAL2': 0.5, 'NAXIS2': 3,
+    'CTYPE3': 'HPLN-TAN', 'CUNIT3': 'deg', 'CDELT3': 0.4, 'CRPIX3': 2, 'CRVAL3': 1, 'NAXIS3': 2,
+}
+
+wm = WCS(header=hm, naxis=3)
+
+# Cubes of 1, 2, 3 and 4 slices along the common axis, by file name.
+cubes = dict(('cube{0}'.format(n),
+              Cube(np.arange((n + 1) * 12).reshape(n + 1, 3, 4) + 100 * n, wm))
+             for n in range(4))
+filenames = sorted(cubes)
+
+
+def make_sequence(max_open=2):
+    reads = []
+
+    def loader(filename):
+        reads.append(filename)
+        return cubes[filename]
+
+    seq = FileCubeSequence(filenames, loader,
+                           shape_loader=lambda f: cubes[f].shape,
+                           max_open=max_open)
+    return seq, reads
+
+
+def test_shape_without_reading():
+    seq, reads = make_sequence()
+    assert seq.shape == (4, 1, 3, 4)
+    assert len(seq.offsets) == 10
+    assert seq.index_as_cube.shape == (10, 3, 4)
+    assert reads == []
+
+
+def test_offsets_follow_changes():
+    seq, reads = make_sequence()
+    assert len(seq.offsets) == 10
+    seq.data[0] = cubes['cube3']
+    assert len(seq.offsets) == 13
+    seq.common_axis = 1
+    assert len(seq.offsets) == 12
+    assert reads == []
+
+
+def test_getitem_reads_on_demand():
+    seq, reads = make_sequence()
+    assert seq[2] is cubes['cube2']
+    assert np.all(seq[1, 0:1].data == cubes['cube1'].data[0:1])
+    assert reads == ['cube2', 'cube1']
+    # Kept cubes are not read again.
+    seq[2]
+    assert reads == ['cube2', 'cube1']
+    # Only max_open cubes are kept, the least recently used is dropped.
+    seq[3]
+    seq[2]
+    assert reads == ['cube2', 'cube1', 'cube3']
+    seq[1]
+    assert reads == ['cube2', 'cube1', 'cube3', 'cube1']
+
+
+def test_slice_sequence():
+    seq, reads = make_sequence()
+    part = seq[1:3]
+    assert isinstance(part, FileCubeSequence)
+    assert part.shape == (2, 2, 3, 4)
+    assert len(part.offsets) == 5
+    assert reads == []
+    assert part[1] is cubes['cube2']
+
+
+def test_index_as_cube():
+    seq, reads = make_sequence()
+    result = seq.index_as_cube[1:4]
+    assert isinstance(result, CubeSequence)
+    assert [c.data.shape for c in result.data] == [(2, 3, 4), (1, 3, 4)]
+    assert reads == ['cube1', 'cube2']
+    assert np.all(seq.index_as_cube[5:6].data == cubes['cube2'].data[2:3])
+
+
+def test_slice_cubes():
+    seq, reads = make_sequence(max_open=1)
+    result = seq[1:3, [slice(1, 2), slice(0, 1)], slice(None)]
+    # The sliced cubes are held by a plain list, outside of the file cache.
+    assert type(result) is CubeSequence
+    assert isinstance(result.data, list)
+    assert [c.data.shape for c in result.data] == [(1, 3, 4), (1, 3, 4)]
+    assert np.all(result.data[0].data == cubes['cube1'].data[1:2])
+    assert reads == ['cube1', 'cube2']
+
+
+@pytest.mark.parametrize("naxes", [(4, 3, 2), (5,)])
+def test_fits_shape(tmpdir, naxes):
+    filename = os.path.join(str(tmpdir), 'cube.fits')
+    fits.writeto(filename, np.zeros(naxes[::-1]))
+    assert fits_shape(filename) == naxes[::-1]
+
+
+def test_map_threads():
+    seq, reads = make_sequence(max_open=1)
+    result = seq.map(lambda cube: cube, workers=3)
+    assert isinstance(result, CubeSequence)
+    assert [c is cubes[f] for c, f in zip(result.data, filenames)] == [True] * 4
+    assert sorted(reads) == filenames
+
+
+def test_concurrent_reads():
+    reads = []
+
+    def loader(filename):
+        reads.append(filename)
+        time.sleep(0.05)
+        return cubes[filename]
+
+    seq = FileCubeSequence(filenames, loader,
+                           shape_loader=lambda f: cubes[f].shape)
+    threads = [threading.Thread(target=seq.data.__getitem__, args=(0,))
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert reads == filenames[:1]
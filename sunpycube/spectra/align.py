@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Estimation of clock offsets between spectrograms by cross-correlation.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import numpy as np
+from numpy import ma
+
+__all__ = ['estimate_time_offset']
+
+
+def _seconds(delta):
+    """ Return timedelta delta in seconds. """
+    return delta.days * 86400 + delta.seconds + delta.microseconds / 1e6
+
+
+def _sample(data, rows, pos):
+    """ Return rows of data linearly interpolated at the fractional column
+    positions pos, reading only the columns spanned by pos. """
+    ncols = data.shape[1]
+    lo = np.clip(np.floor(pos).astype(int), 0, max(0, ncols - 2))
+    hi = np.minimum(lo + 1, ncols - 1)
+    weight = pos - lo
+    first = lo.min()
+    block = ma.asarray(data[:, first:hi.max() + 1])[rows].astype(float)
+    return (block[:, lo - first] * (1 - weight) +
+            block[:, hi - first] * weight)
+
+
+def _standardize(values):
+    """ Return every row of values with zero mean and unit variance and
+    masked values set to zero, so they do not contribute to correlations.
+    """
+    values = values - values.mean(1).reshape(-1, 1)
+    std = ma.filled(values.std(1), 0).reshape(-1, 1)
+    std[std == 0] = 1
+    return ma.filled(values, 0) / std
+
+
+def estimate_time_offset(spec, other, max_lag=None):
+    """
+    Return seconds to add to the times of other so that it lines up with
+    spec, estimated from the cross-correlation of both over the time and
+    frequency range they share.
+
+    Every channel of spec within freq_overlap is paired with the nearest
+    channel of other. Both are sampled at the smaller time-delta of the two
+    over their common time range, and the correlations of all pairs are
+    computed with one FFT per channel and summed before the peak is
+    located with sub-sample precision.
+
+    Parameters
+    ----------
+    spec, other : LinearTimeSpectrogram
+        Spectrograms to compare.
+    max_lag : float or None
+        Largest offset in seconds to consider. Defaults to half of the
+        common time range.
+    """
+    lower, upper = spec.freq_overlap(other)
+    rows = np.nonzero(
+        (spec.freq_axis >= lower) & (spec.freq_axis <= upper))[0]
+    other_rows = np.abs(
+        other.freq_axis[np.newaxis, :] - spec.freq_axis[rows, np.newaxis]
+    ).argmin(1)
+
+    delt = min(spec.t_delt, other.t_delt)
+    # Times relative to the first column of spec.
+    shift = (_seconds(other.start - spec.start) +
+             other.time_axis[0] - spec.time_axis[0])
+    first = max(0, shift)
+    last = min((spec.shape[1] - 1) * spec.t_delt,
+               shift + (other.shape[1] - 1) * other.t_delt)
+    size = int(np.floor((last - first) / delt + 1e-9)) + 1 if (
+        last > first) else 0
+    if size < 2:
+        raise ValueError("No time overlap.")
+    grid = first + np.arange(size) * delt
+
+    values = _standardize(_sample(spec.data, rows, grid / spec.t_delt))
+    other_values = _standardize(
+        _sample(other.data, other_rows, (grid - shift) / other.t_delt)
+    )
+
+    # Zero-padded to twice the size so the correlation is not circular.
+    corr = np.fft.irfft(
+        (np.conj(np.fft.rfft(values, 2 * size, 1)) *
+         np.fft.rfft(other_values, 2 * size, 1)).sum(0),
+        2 * size
+    )
+    lags = np.arange(2 * size)
+    lags[lags > size] -= 2 * size
+    # Normalize by the number of overlapping samples at every lag.
+    corr /= np.maximum(1, size - np.abs(lags))
+
+    if max_lag is None:
+        limit = size // 2
+    else:
+        limit = min(size - 1, int(max_lag / delt))
+    allowed = np.abs(lags) <= limit
+    corr[~allowed] = -np.inf
+    peak = corr.argmax()
+
+    lag = float(lags[peak])
+    before, after = corr[peak - 1], corr[(peak + 1) % (2 * size)]
+    if np.isfinite(before) and np.isfinite(after):
+        denom = before - 2 * corr[peak] + after
+        if denom != 0:
+            lag += 0.5 * (before - after) / denom
+    # Features of spec at t are found at t + lag in other.
+    return -lag * delt
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Time-varying background estimation for spectrograms.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import warnings
+
+import numpy as np
+from numpy import ma
+
+__all__ = ['running_percentile', 'expand_background']
+
+
+def _window_percentile(window, percentile):
+    """ Percentile of every row of window, ignoring masked values. Rows
+    that are entirely masked are NaN. """
+    if not ma.is_masked(window):
+        return np.percentile(np.asarray(window), percentile, axis=1)
+    filled = window.astype(np.float64).filled(np.nan)
+    with warnings.catch_warnings():
+        # Entirely masked rows.
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanpercentile(filled, percentile, axis=1)
+
+
+def running_percentile(data, window, percentile=50, step=None):
+    """
+    Return the percentile of every channel within a window sliding over
+    the time axis, evaluated every step columns.
+
+    Only a window of columns is read at a time, so this works on memory
+    mapped data. Evaluating every step columns instead of every column
+    reduces the cost from O(n * window) to O(n * window / step).
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Array of shape (frequency channels, time columns).
+    window : int
+        Number of columns the percentile is taken over. The window is
+        centered on the column and shrinks at the edges.
+    percentile : float
+        Percentile to compute, 50 being the median.
+    step : int or None
+        Distance of the columns the percentile is evaluated at. Defaults
+        to a quarter of the window.
+
+    Returns
+    -------
+    centers : np.ndarray
+        Columns the percentile was evaluated at, always including the first
+        and the last one.
+    values : np.ndarray
+        Array of shape (frequency channels, len(centers)). NaN where the
+        window is entirely masked.
+    """
+    window = int(window)
+    if window < 1:
+        raise ValueError("Window must contain at least one column.")
+    if step is None:
+        step = max(1, window // 4)
+    ncols = data.shape[1]
+    if not ncols:
+        raise ValueError("Data has no columns.")
+    centers = np.arange(0, ncols, step)
+    if centers[-1] != ncols - 1:
+        centers = np.append(centers, ncols - 1)
+
+    half = window // 2
+    values = np.empty((data.shape[0], len(centers)))
+    for n, x in enumerate(centers):
+        lo = max(0, x - half)
+        hi = min(ncols, x - half + window)
+        values[:, n] = _window_percentile(data[:, lo:hi], percentile)
+    return centers, values
+
+
+def expand_background(centers, values, start, stop):
+    """
+    Return background for the columns start to stop, linearly interpolated
+    between the values at centers as returned by running_percentile.
+
+    NaN values, of entirely masked windows, are skipped: channels are
+    interpolated between their finite values only, and take the nearest
+    finite value beyond them, so gaps do not spread into valid columns.
+    """
+    cols = np.arange(start, stop)
+    if len(centers) == 1:
+        return np.repeat(values, len(cols), 1)
+    idx = np.clip(np.searchsorted(centers, cols, 'right') - 1,
+                  0, len(centers) - 2)
+    frac = (cols - centers[idx]) / (centers[idx + 1] - centers[idx])
+    result = values[:, idx] * (1 - frac) + values[:, idx + 1] * frac
+    finite = np.isfinite(values)
+    for y in np.nonzero(~finite.all(1) & finite.any(1))[0]:
+        result[y] = np.interp(cols, centers[finite[y]], values[y, finite[y]])
+    return result
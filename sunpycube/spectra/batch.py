@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Run a sequence of spectrogram operations over many files in parallel.
+"""
+
+from __future__ import absolute_import
+
+import os
+import time
+import traceback
+import multiprocessing
+
+import numpy as np
+
+from matplotlib import pyplot as plt
+
+from sunpy.extern.six import string_types
+from sunpycube.spectra.sources.generic import FITSSpectrogram
+
+__all__ = ['BatchResult', 'PlotWriter', 'ArrayWriter', 'process_many']
+
+
+class BatchResult(object):
+    """
+    Outcome of processing one source.
+
+    Attributes
+    ----------
+    source : str or Spectrogram
+        The source as passed to process_many.
+    value : object
+        What the output function returned, None if processing failed.
+    error : str or None
+        Formatted traceback if processing failed.
+    timings : list
+        (stage, seconds) tuples of the stages that were run, in order.
+    """
+    def __init__(self, source, value=None, error=None, timings=None):
+        self.source = source
+        self.value = value
+        self.error = error
+        self.timings = [] if timings is None else timings
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "<BatchResult {0} {1}>".format(
+            self.source, "ok" if self.ok else "failed"
+        )
+
+
+class PlotWriter(object):
+    """
+    Output function that saves the plot of every spectrogram to directory,
+    named after its source, and returns the filename.
+
+    Attributes
+    ----------
+    directory : str
+        Directory to save the images to.
+    suffix : str
+        Appended to the name of the source; determines the format.
+    plot_kwargs : dict
+        Passed to Spectrogram.plot.
+    """
+    def __init__(self, directory, suffix='.png', **plot_kwargs):
+        self.directory = directory
+        self.suffix = suffix
+        self.plot_kwargs = plot_kwargs
+
+    def __call__(self, spec, source):
+        filename = _output_name(self.directory, source, self.suffix)
+        figure = plt.figure()
+        try:
+            spec.plot(**self.plot_kwargs)
+            figure.savefig(filename)
+        finally:
+            plt.close(figure)
+        return filename
+
+
+class ArrayWriter(object):
+    """
+    Output function that saves the data of every spectrogram to directory
+    as .npy file, named after its source, and returns the filename.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self, spec, source):
+        filename = _output_name(self.directory, source, '.npy')
+        np.save(filename, np.asarray(spec.data))
+        return filename
+
+
+def _output_name(directory, source, suffix):
+    """ Implementation detail. """
+    if not isinstance(source, string_types):
+        raise ValueError("Can only name outputs of files.")
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(directory, name + suffix)
+
+
+def _normalize(operation):
+    """ Return (label, function or method name, args, kwargs) of an
+    operation. """
+    if isinstance(operation, string_types) or callable(operation):
+        operation = (operation,)
+    fun, args, kwargs = operation[0], (), {}
+    for elem in operation[1:]:
+        if isinstance(elem, dict):
+            kwargs = elem
+        else:
+            args = tuple(elem)
+    label = fun if isinstance(fun, string_types) else getattr(
+        fun, '__name__', type(fun).__name__)
+    return label, fun, args, kwargs
+
+
+def _process(task):
+    """ Process one source. Runs in the worker processes. """
+    source, operations, output, reader = task
+    result = BatchResult(source)
+    stage = 'read'
+    try:
+        begin = time.time()
+        spec = reader(source) if isinstance(source, string_types) else source
+        result.timings.append((stage, time.time() - begin))
+
+        for label, fun, args, kwargs in operations:
+            stage = label
+            begin = time.time()
+            if isinstance(fun, string_types):
+                spec = getattr(spec, fun)(*args, **kwargs)
+            else:
+                spec = fun(spec, *args, **kwargs)
+            result.timings.append((stage, time.time() - begin))
+
+        stage = 'output'
+        begin = time.time()
+        result.value = spec if output is None else output(spec, source)
+        result.timings.append((stage, time.time() - begin))
+    except Exception:
+        result.error = "{0} failed:\n{1}".format(
+            stage, traceback.format_exc())
+    return result
+
+
+def _read_fits(filename):
+    """ Default reader of process_many. Module level so it can be sent to
+    the worker processes. """
+    return FITSSpectrogram.read(filename)
+
+
+def _init_worker():
+    """ Implementation detail. """
+    plt.switch_backend('agg')
+
+
+def process_many(sources, operations, output=None, reader=_read_fits,
+                 processes=None, maxtasksperchild=1):
+    """
+    Apply operations to every source in a pool of processes and yield a
+    BatchResult per source, in the order of sources.
+
+    A failure only affects the result of its source. Every worker process is
+    replaced after maxtasksperchild sources, so memory held on to by one
+    file is released before the next ones are processed.
+
+    Parameters
+    ----------
+    sources : list
+        Filenames or spectrograms.
+    operations : list
+        Operations applied in order. Every operation is a method name, a
+        function taking the spectrogram, or a tuple of either followed by a
+        tuple of positional and/or a dict of keyword arguments, e.g.
+        ``['subtract_bg', ('clip_values', (0, 100)), 'linearize_freqs']``.
+        Functions need to be defined at module level so they can be sent
+        to the worker processes.
+    output : function or None
+        Function called with the processed spectrogram and its source whose
+        result becomes BatchResult.value, e.g. a PlotWriter. If None, the
+        value is the spectrogram itself, which is sent back from the worker.
+    reader : function
+        Function that is called with a filename and returns a spectrogram.
+        Defaults to reading FITSSpectrograms.
+    processes : int or None
+        Number of worker processes. Defaults to the number of CPUs. If 1,
+        everything runs in the calling process.
+    maxtasksperchild : int or None
+        Sources processed by a worker before it is replaced.
+    """
+    operations = [_normalize(operation) for operation in operations]
+    tasks = ((source, operations, output, reader) for source in sources)
+    if processes == 1:
+        for task in tasks:
+            yield _process(task)
+        return
+
+    pool = multiprocessing.Pool(processes, _init_worker,
+                                maxtasksperchild=maxtasksperchild)
+    try:
+        for result in pool.imap(_process, tasks, chunksize=1):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Arrays that grow along their last axis, in memory or memory mapped.
+"""
+
+from __future__ import absolute_import
+
+import os
+import weakref
+
+import numpy as np
+from numpy import ma
+
+__all__ = ['ColumnBuffer', 'SpectrogramBuffer']
+
+# Smallest number of columns allocated.
+MIN_CAPACITY = 64
+
+# Every live memory map of a ColumnBuffer by id, including those only kept
+# alive by views.
+_MAPPED = weakref.WeakValueDictionary()
+
+
+class ColumnBuffer(object):
+    """
+    Array that can be extended along its last axis in amortized time
+    proportional to the number of new columns.
+
+    The storage is allocated in Fortran order with spare columns, and its
+    capacity is doubled whenever it runs out. If a filename is given, the
+    storage is a memory mapped file, which is grown in place: because of
+    the Fortran order the existing columns stay where they are in the
+    file, so nothing needs to be copied. The file is created anew, so it
+    may not be in use by another ColumnBuffer whose data is still alive.
+
+    Attributes
+    ----------
+    size : int
+        Number of columns in use.
+    dtype : np.dtype
+    filename : str or None
+        File backing the storage.
+    """
+    def __init__(self, shape, dtype, capacity=None, filename=None):
+        self.prefix = tuple(shape[:-1])
+        self.size = shape[-1]
+        self.dtype = np.dtype(dtype)
+        self.filename = filename
+        self._arr = None
+        if capacity is None:
+            capacity = self.size
+        self._arr = self._allocate(max(MIN_CAPACITY, capacity, self.size))
+
+    @classmethod
+    def from_array(cls, arr, dtype=None, capacity=None, filename=None):
+        """ Return buffer holding a copy of arr. """
+        if dtype is None:
+            dtype = arr.dtype
+        buf = cls(arr.shape, dtype, capacity, filename)
+        buf.data[...] = arr
+        return buf
+
+    @property
+    def capacity(self):
+        return self._arr.shape[-1]
+
+    @property
+    def data(self):
+        """ View of the columns in use. """
+        return self._arr[..., :self.size]
+
+    def _allocate(self, capacity):
+        """ Implementation detail. """
+        shape = self.prefix + (capacity,)
+        if self.filename is None:
+            return np.zeros(shape, dtype=self.dtype, order='F')
+        if self._arr is None:
+            mode = 'w+'
+            path = os.path.abspath(self.filename)
+            if any(os.path.abspath(arr.filename) == path
+                   for arr in list(_MAPPED.values())):
+                # Truncating it would pull the file from under the data.
+                raise ValueError(
+                    "{0} is in use by another buffer.".format(self.filename)
+                )
+        else:
+            # numpy extends files opened with r+ to the size needed.
+            mode = 'r+'
+        arr = np.memmap(self.filename, dtype=self.dtype, mode=mode,
+                        shape=shape, order='F')
+        _MAPPED[id(arr)] = arr
+        return arr
+
+    def reserve(self, size):
+        """ Make room for size columns. """
+        if size <= self.capacity:
+            return
+        capacity = max(size, 2 * self.capacity)
+        if self.filename is None:
+            arr = self._allocate(capacity)
+            arr[..., :self.size] = self.data
+        else:
+            self._arr.flush()
+            arr = self._allocate(capacity)
+        self._arr = arr
+
+    def resize(self, size):
+        """ Set the number of columns in use to size. """
+        self.reserve(size)
+        self.size = size
+
+    def extend(self, values):
+        """ Append values, an array whose last axis holds the columns. """
+        start = self.size
+        self.resize(start + values.shape[-1])
+        self._arr[..., start:self.size] = values
+
+
+class SpectrogramBuffer(object):
+    """
+    Data, mask and time axis of a spectrogram that is appended to.
+
+    The mask is only allocated once a masked column is appended. Only the
+    most recent result of view may be extended in place, see is_tip.
+
+    Attributes
+    ----------
+    data : ColumnBuffer
+    mask : ColumnBuffer or None
+    time : ColumnBuffer
+    """
+    def __init__(self, data, time_axis, dtype, filename=None):
+        self.filename = filename
+        self.data = ColumnBuffer.from_array(
+            ma.getdata(data), dtype, filename=filename
+        )
+        self.time = ColumnBuffer.from_array(np.asarray(time_axis, float))
+        self.mask = None
+        if isinstance(data, ma.MaskedArray):
+            self._mask_buffer()
+            self.mask.data[...] = ma.getmaskarray(data)
+        self._view = None
+
+    def _mask_buffer(self):
+        """ Implementation detail. """
+        filename = None if self.filename is None else self.filename + '.mask'
+        self.mask = ColumnBuffer(
+            self.data.prefix + (self.data.size,), np.bool_,
+            self.data.capacity, filename
+        )
+
+    def extend(self, values, times, mask=None):
+        """ Append columns values at times. mask defaults to the mask of
+        values. """
+        if mask is None and isinstance(values, ma.MaskedArray):
+            mask = ma.getmaskarray(values)
+        if mask is not None and self.mask is None and np.any(mask):
+            self._mask_buffer()
+        self.data.extend(ma.getdata(values))
+        self.time.extend(np.asarray(times, float))
+        if self.mask is not None:
+            if mask is None:
+                mask = np.zeros(values.shape, dtype=np.bool_)
+            self.mask.extend(mask)
+
+    def view(self):
+        """ Return the data in use, masked if there is a mask. """
+        data = self.data.data
+        if self.mask is not None:
+            data = ma.array(data, mask=self.mask.data, copy=False)
+        self._view = data
+        return data
+
+    def is_tip(self, data):
+        """ Whether data is the most recent result of view, so the buffer
+        can be extended without affecting other spectrograms. """
+        return self._view is not None and data is self._view
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Detection of solar radio bursts in background subtracted spectrograms.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import datetime
+
+import numpy as np
+from numpy import ma
+from scipy import ndimage
+
+__all__ = ['Burst', 'burst_threshold', 'find_bursts']
+
+# Scale factor of the median absolute deviation to the standard deviation
+# of normally distributed data.
+MAD_TO_SIGMA = 1.4826
+
+
+class Burst(object):
+    """
+    Connected region of high intensity in a spectrogram.
+
+    Attributes
+    ----------
+    start, end : datetime
+        Times of the first and last column of the region.
+    fmin, fmax : float
+        Lowest and highest frequency of the region.
+    drift : float
+        Frequency drift rate in frequency units per second, from a fit of the
+        intensity weighted mean frequency of every column. NaN if the region
+        only covers one column.
+    peak : float
+        Highest intensity of the region.
+    size : int
+        Number of values of the region.
+    x_range, y_range : slice
+        Columns and channels of the spectrogram covered by the region.
+    """
+    def __init__(self, start, end, fmin, fmax, drift, peak, size, x_range,
+                 y_range):
+        self.start = start
+        self.end = end
+        self.fmin = fmin
+        self.fmax = fmax
+        self.drift = drift
+        self.peak = peak
+        self.size = size
+        self.x_range = x_range
+        self.y_range = y_range
+
+    def __repr__(self):
+        return "<Burst {0} - {1}, {2} - {3}, drift {4}>".format(
+            self.start, self.end, self.fmin, self.fmax, self.drift
+        )
+
+
+def burst_threshold(data, sigma=5, sample=2 ** 16):
+    """
+    Return intensity sigma robust standard deviations above the median of
+    data, estimated from about sample values of evenly spaced columns.
+    """
+    stride = max(1, data.size // sample)
+    values = ma.compressed(ma.asarray(data[:, ::stride]))
+    med = np.median(values)
+    return med + sigma * MAD_TO_SIGMA * np.median(np.abs(values - med))
+
+
+def _drift(values, freqs, time_axis):
+    """ Slope of the intensity weighted mean frequency over time. """
+    weights = values.sum(0)
+    valid = weights > 0
+    if valid.sum() < 2:
+        return np.nan
+    centroid = (values * freqs[:, np.newaxis]).sum(0)[valid] / weights[valid]
+    return np.polyfit(time_axis[valid], centroid, 1, w=weights[valid])[0]
+
+
+def _follow_region(data, threshold, lo, hi, seed, step):
+    """ Return the values and mask of the columns lo:hi of data, and the
+    columns and channels they cover, of the region above threshold that
+    contains seed, a (channel, column) of data. The columns are extended by
+    step until the region ends before the last or the data does. """
+    ncols = data.shape[1]
+    while True:
+        values = data[:, lo:hi]
+        above = ma.filled(values > threshold, False)
+        labels, _ = ndimage.label(above, structure=np.ones((3, 3)))
+        region = labels == labels[seed[0], seed[1] - lo]
+        y_range, x_range = ndimage.find_objects(region.astype(int))[0]
+        if lo + x_range.stop < hi or hi == ncols:
+            return values, region, x_range, y_range
+        hi = min(ncols, hi + step)
+
+
+def find_bursts(spec, threshold=None, sigma=5, min_size=10, chunk=2 ** 22,
+                overlap=None):
+    """
+    Return list of Bursts found in spec, ordered by start time.
+
+    Values above threshold are labeled as connected regions. The data is
+    processed in blocks of columns, each extended by overlap columns on both
+    sides, and every region is reported by the block it starts in. Regions
+    that reach past the extended block are followed into the next columns
+    until they end, so they are reported in full.
+
+    Parameters
+    ----------
+    spec : Spectrogram
+        Background subtracted spectrogram.
+    threshold : float or None
+        Intensity above which values belong to a burst. If None, it is
+        estimated with burst_threshold.
+    sigma : float
+        Passed to burst_threshold if threshold is None.
+    min_size : int
+        Regions with fewer values are discarded.
+    chunk : int
+        Number of values per block.
+    overlap : int or None
+        Number of columns by which blocks are extended. Defaults to a
+        quarter of the block.
+    """
+    data = spec.data
+    if threshold is None:
+        threshold = burst_threshold(data, sigma)
+    nrows, ncols = data.shape
+    step = max(1, chunk // max(1, nrows))
+    if overlap is None:
+        overlap = step // 4
+    freqs = np.asarray(spec.freq_axis, dtype=float)
+    time_axis = np.asarray(spec.time_axis, dtype=float)
+
+    bursts = []
+    for x in range(0, ncols, step):
+        lo = max(0, x - overlap)
+        hi = min(ncols, x + step + overlap)
+        values = data[:, lo:hi]
+        above = ma.filled(values > threshold, False)
+        labels, _ = ndimage.label(above, structure=np.ones((3, 3)))
+        for n, (y_range, x_range) in enumerate(ndimage.find_objects(labels)):
+            first = lo + x_range.start
+            # Regions starting in the overlap belong to the neighbouring
+            # block, which sees them in full.
+            if not x <= first < x + step:
+                continue
+            if lo + x_range.stop == hi < ncols:
+                seed = np.argwhere(labels[:, x_range.start] == n + 1)[0]
+                region_data, region, x_range, y_range = _follow_region(
+                    data, threshold, lo, min(ncols, hi + step),
+                    (seed[0], first), step
+                )
+                first = lo + x_range.start
+                region = region[y_range, x_range]
+                region_data = region_data[y_range, x_range]
+            else:
+                region = labels[y_range, x_range] == n + 1
+                region_data = values[y_range, x_range]
+            size = int(region.sum())
+            if size < min_size:
+                continue
+            region_values = np.where(
+                region, ma.filled(region_data, 0), 0
+            ).astype(float)
+            x_range = slice(first, lo + x_range.stop)
+            times = time_axis[x_range]
+            bursts.append(Burst(
+                spec.start + datetime.timedelta(seconds=times[0]),
+                spec.start + datetime.timedelta(seconds=times[-1]),
+                freqs[y_range].min(), freqs[y_range].max(),
+                _drift(region_values, freqs[y_range], times),
+                region_values.max(), size, x_range, y_range
+            ))
+    bursts.sort(key=lambda burst: burst.start)
+    return bursts
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Index of spectrogram files by time and frequency range.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import os
+import glob
+import datetime
+
+import numpy as np
+
+from sunpy.time import parse_time
+from sunpy.extern.six import text_type
+from sunpycube.spectra.spectrogram import (
+    LinearTimeSpectrogram, SECONDS_PER_DAY
+)
+from sunpycube.spectra.sources.generic import FITSSpectrogram
+
+__all__ = ['SpectrogramCatalog']
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _to_seconds(time):
+    """ Return seconds since EPOCH of datetime time. """
+    delta = time - EPOCH
+    return (SECONDS_PER_DAY * delta.days + delta.seconds +
+            delta.microseconds / 1e6)
+
+
+def _from_seconds(seconds):
+    """ Return datetime of seconds since EPOCH. """
+    return EPOCH + datetime.timedelta(seconds=float(seconds))
+
+
+def _read_header(filename):
+    """ Default reader of SpectrogramCatalog.scan. """
+    return FITSSpectrogram.read(filename, lazy=True)
+
+
+class SpectrogramCatalog(object):
+    """
+    Catalog of the start and end time, frequency range, instruments and
+    shape of spectrogram files.
+
+    The catalog is kept as columns sorted by start time, with the running
+    maximum of the end times, so files covering an interval are found by
+    binary search even if some files are much longer than others. It can
+    be saved to and loaded from a compressed numpy file.
+
+    Attributes
+    ----------
+    columns : dict
+        Arrays of equal length, see FIELDS.
+    opener : function
+        Function that is called with a filename and returns a spectrogram.
+        Used to open query results. Defaults to lazily reading
+        FITSSpectrograms, so only the headers are read until data is
+        accessed.
+    """
+    FIELDS = [
+        'filename', 'start', 'end', 'fmin', 'fmax', 'instruments',
+        'nfreq', 'ncols', 't_delt',
+    ]
+
+    def __init__(self, columns, opener=_read_header):
+        order = np.argsort(columns['start'], kind='mergesort')
+        self.columns = dict(
+            (name, np.asarray(columns[name])[order]) for name in self.FIELDS
+        )
+        self.opener = opener
+        self._max_ends = np.maximum.accumulate(self.columns['end'])
+        # Position of every file, the first if it is listed more than once.
+        self._positions = dict(
+            (filename, n) for n, filename in
+            reversed(list(enumerate(self.columns['filename'])))
+        )
+
+    def __len__(self):
+        return len(self.columns['filename'])
+
+    @classmethod
+    def from_spectrograms(cls, filenames, specs, **kwargs):
+        """ Return catalog of specs read from filenames. """
+        columns = dict((name, []) for name in cls.FIELDS)
+        for filename, spec in zip(filenames, specs):
+            columns['filename'].append(filename)
+            columns['start'].append(_to_seconds(spec.start))
+            columns['end'].append(_to_seconds(spec.end))
+            columns['fmin'].append(np.min(spec.freq_axis))
+            columns['fmax'].append(np.max(spec.freq_axis))
+            columns['instruments'].append(','.join(sorted(spec.instruments)))
+            columns['nfreq'].append(spec.shape[0])
+            columns['ncols'].append(spec.shape[1])
+            columns['t_delt'].append(getattr(spec, 't_delt', np.nan))
+        for name in ['filename', 'instruments']:
+            columns[name] = np.array(columns[name], dtype=text_type)
+        for name in ['start', 'end', 'fmin', 'fmax', 't_delt']:
+            columns[name] = np.array(columns[name], dtype=float)
+        for name in ['nfreq', 'ncols']:
+            columns[name] = np.array(columns[name], dtype=int)
+        return cls(columns, **kwargs)
+
+    @classmethod
+    def scan(cls, directory, pattern='*.fits', reader=_read_header,
+             **kwargs):
+        """ Return catalog of all files in directory matching pattern.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to scan.
+        pattern : str
+            Shell-style pattern of the filenames to include.
+        reader : function
+            Function that is called with a filename and returns a
+            spectrogram. Should only read the header if possible. Defaults
+            to lazily reading FITSSpectrograms.
+        """
+        filenames = sorted(glob.glob(os.path.join(directory, pattern)))
+        return cls.from_spectrograms(
+            filenames, (reader(filename) for filename in filenames), **kwargs
+        )
+
+    @classmethod
+    def load(cls, filename, **kwargs):
+        """ Load catalog saved with save. """
+        fl = np.load(filename)
+        try:
+            columns = dict((name, fl[name]) for name in cls.FIELDS)
+        finally:
+            fl.close()
+        return cls(columns, **kwargs)
+
+    def save(self, filename):
+        """ Save catalog to compressed numpy file filename. The extension
+        .npz is appended if it is missing. """
+        np.savez_compressed(filename, **self.columns)
+
+    def _select(self, start=None, end=None, fmin=None, fmax=None,
+                instrument=None):
+        """ Return indices of the files matching a query, ordered by start
+        time. """
+        start = (-np.inf if start is None
+                 else _to_seconds(parse_time(start)))
+        end = np.inf if end is None else _to_seconds(parse_time(end))
+        if end < start:
+            return np.array([], dtype=int)
+        # Files starting at or after end do not overlap, the interval is
+        # open there, nor do those before the first whose end, or that of
+        # an earlier file, reaches start.
+        stop = np.searchsorted(self.columns['start'], end, side='left')
+        first = np.searchsorted(self._max_ends, start, side='left')
+        idx = first + np.nonzero(self.columns['end'][first:stop] >= start)[0]
+        if fmin is not None:
+            idx = idx[self.columns['fmax'][idx] >= fmin]
+        if fmax is not None:
+            idx = idx[self.columns['fmin'][idx] <= fmax]
+        if instrument is not None:
+            idx = np.array([
+                n for n in idx
+                if instrument in self.columns['instruments'][n].split(',')
+            ], dtype=int)
+        return idx
+
+    def query(self, start=None, end=None, fmin=None, fmax=None,
+              instrument=None):
+        """ Return filenames of the spectrograms overlapping the time
+        interval [start, end) and the frequency interval [fmin, fmax],
+        ordered by start time. Omitted bounds are not checked.
+
+        Parameters
+        ----------
+        start, end : None or datetime or parse_time compatible string
+            Time interval.
+        fmin, fmax : None or float
+            Frequency interval.
+        instrument : None or str
+            Only include files of this instrument.
+        """
+        idx = self._select(start, end, fmin, fmax, instrument)
+        return [self.columns['filename'][n] for n in idx]
+
+    def entry(self, filename):
+        """ Return dict of the catalog fields of filename, with times as
+        datetimes. """
+        try:
+            n = self._positions[filename]
+        except KeyError:
+            raise ValueError("{0} is not in the catalog.".format(filename))
+        entry = dict((name, self.columns[name][n]) for name in self.FIELDS)
+        entry['start'] = _from_seconds(entry['start'])
+        entry['end'] = _from_seconds(entry['end'])
+        entry['instruments'] = set(
+            inst for inst in entry['instruments'].split(',') if inst
+        )
+        return entry
+
+    def open(self, filenames):
+        """ Return spectrograms of filenames, e.g. query results. """
+        return [self.opener(filename) for filename in filenames]
+
+    def join_many(self, start=None, end=None, fmin=None, fmax=None,
+                  instrument=None, **kwargs):
+        """ Return the spectrograms matching a query joined with
+        LinearTimeSpectrogram.join_many, which is passed kwargs. Only the
+        matching files are opened. See query for the parameters. """
+        filenames = self.query(start, end, fmin, fmax, instrument)
+        if not filenames:
+            raise ValueError("No spectrograms match.")
+        return LinearTimeSpectrogram.join_many(self.open(filenames), **kwargs)
+
+    def in_interval(self, start, end, fmin=None, fmax=None,
+                    instrument=None, **kwargs):
+        """ Return the part of the joined spectrograms in [start, end),
+        restricted to [fmin, fmax] if given. See join_many. """
+        spec = self.join_many(start, end, fmin, fmax, instrument, **kwargs)
+        # The interval may reach beyond the files found.
+        stop = spec.start + datetime.timedelta(
+            seconds=spec.shape[1] * spec.t_delt)
+        spec = spec.in_interval(max(parse_time(start), spec.start),
+                                min(parse_time(end), stop))
+        if fmin is not None or fmax is not None:
+            spec = spec.clip_freq(fmin, fmax)
+        return spec
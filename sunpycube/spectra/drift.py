@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Shift-and-add transform of spectrograms over a grid of drift rates.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import datetime
+
+import numpy as np
+from numpy import ma
+
+__all__ = ['DriftMap', 'drift_transform']
+
+
+class DriftMap(object):
+    """
+    Intensities summed along linearly drifting paths through a spectrogram.
+
+    Attributes
+    ----------
+    data : np.ndarray
+        Array of shape (drift rates, time columns). Every value is the mean
+        intensity along the path with that drift rate that passes the
+        reference frequency at that time.
+    rates : np.ndarray
+        Drift rates in frequency units per second.
+    time_axis : np.ndarray
+        Time of every column in seconds since start.
+    start : datetime
+        Time of the first column.
+    f_ref : float
+        Reference frequency the time of a path refers to.
+    """
+    def __init__(self, data, rates, time_axis, start, f_ref):
+        self.data = data
+        self.rates = rates
+        self.time_axis = time_axis
+        self.start = start
+        self.f_ref = f_ref
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    def best(self):
+        """ Return drift rate and time of the path with the highest mean
+        intensity. """
+        rate, x = np.unravel_index(np.argmax(self.data), self.data.shape)
+        return self.rates[rate], self.start + datetime.timedelta(
+            seconds=float(self.time_axis[x]))
+
+
+def drift_transform(data, freq_axis, t_delt, rates, f_ref=None,
+                    chunk=2 ** 20):
+    """
+    Return array of shape (len(rates), time columns) of the mean intensity
+    along paths of constant drift rate.
+
+    Channels are shifted by the delay of their frequency relative to f_ref
+    using the Fourier shift theorem, so fractional delays are interpolated,
+    and averaged. Rates are processed in groups so the phase factors of a
+    group take about chunk elements; there is no loop over single rates.
+    The data is zero-padded by the largest delay so paths do not wrap
+    around, but by no more than the time extent of the data: delays beyond
+    it, of rates close to zero, are limited to it, as those channels are
+    outside the data either way.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Array of shape (frequency channels, time columns) with a linear time
+        axis.
+    freq_axis : np.ndarray
+        Frequency of every channel.
+    t_delt : float
+        Time between columns in seconds.
+    rates : array_like
+        Non-zero drift rates in frequency units per second.
+    f_ref : float or None
+        Reference frequency. Defaults to the first channel's.
+    """
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    if (rates == 0).any() or not np.isfinite(rates).all():
+        raise ValueError("Drift rates must be finite and non-zero.")
+    if not t_delt > 0:
+        raise ValueError("t_delt must be positive.")
+    freq_axis = np.asarray(freq_axis, dtype=float)
+    if f_ref is None:
+        f_ref = freq_axis[0]
+    nrows, ncols = data.shape
+
+    # Delay in columns of every channel for every rate.
+    shifts = (freq_axis - f_ref)[np.newaxis, :] / rates[:, np.newaxis] / t_delt
+    np.clip(shifts, -ncols, ncols, out=shifts)
+    pad = int(np.ceil(np.abs(shifts).max()))
+    size = ncols + 2 * pad
+    padded = np.zeros((nrows, size))
+    padded[:, pad:pad + ncols] = ma.filled(data, 0)
+    spectrum = np.fft.rfft(padded, axis=1)
+    freqs = np.arange(spectrum.shape[1]) / size
+
+    out = np.empty((len(rates), ncols))
+    group = max(1, chunk // max(1, nrows * spectrum.shape[1]))
+    for r in range(0, len(rates), group):
+        # Value at t of a channel shifted by s is its value at t + s.
+        phase = np.exp(
+            2j * np.pi * shifts[r:r + group, :, np.newaxis] * freqs
+        )
+        summed = np.einsum('yk,ryk->rk', spectrum, phase)
+        out[r:r + group] = np.fft.irfft(
+            summed, size, axis=1)[:, pad:pad + ncols] / nrows
+    return out
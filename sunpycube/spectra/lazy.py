@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=E1101
+"""
+Deferred evaluation of value transforms on spectrograms.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import numpy as np
+from numpy import ma
+
+from sunpy.util import to_signed
+
+__all__ = ['LazySpectrogram']
+
+# Number of elements processed at once. Columns are processed in chunks of
+# at most this many elements so temporaries stay small and in cache.
+DEFAULT_CHUNK_SIZE = 2 ** 20
+
+
+class LazySpectrogram(object):
+    """
+    Spectrogram whose value transforms are recorded instead of executed.
+
+    `clip_values`, `rescale`, `subtract_bg` and slicing return new
+    LazySpectrograms. The recorded operations are evaluated in one pass over
+    the data, a chunk of columns at a time, when `data` is first accessed, so
+    no intermediate results of full size are allocated. Operations that
+    depend on the data (e.g. the minimum and maximum for `rescale`) are
+    resolved with chunked reduction passes. Everything else, e.g. `plot`, is
+    forwarded to the evaluated spectrogram.
+
+    Attributes
+    ----------
+    chunk : int or None
+        Number of elements to process at once. Defaults to
+        DEFAULT_CHUNK_SIZE.
+    """
+    def __init__(self, spec, ops=(), chunk=None):
+        self._spec = spec
+        self._ops = list(ops)
+        self._data = None
+        self.chunk = chunk
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in dict(self._spec.COPY_PROPERTIES):
+            return getattr(self._spec, name)
+        return getattr(self.compute(), name)
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.data, dtype)
+
+    @property
+    def shape(self):
+        return self._spec.shape
+
+    @property
+    def dtype(self):
+        if self._data is not None:
+            return self._data.dtype
+        # Evaluating one column is enough to know the result type.
+        return self._apply(
+            self._resolved_ops(), self._spec.data[:, :1]).dtype
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self._evaluate()
+        return self._data
+
+    def compute(self):
+        """ Return spectrogram with all recorded operations applied. """
+        return self._spec._with_data(self.data)
+
+    def _with_op(self, *op):
+        """ Implementation detail. """
+        return self.__class__(self._spec, self._ops + [op], self.chunk)
+
+    def clip_values(self, vmin=None, vmax=None):
+        """ Record clipping of intensities to the interval [vmin, vmax].
+        Compare Spectrogram.clip_values. """
+        return self._with_op('clip_values', vmin, vmax)
+
+    def rescale(self, vmin=0, vmax=1, dtype=np.dtype('float32')):
+        """ Record rescaling of intensities to [vmin, vmax]. Compare
+        Spectrogram.rescale. """
+        if vmax == vmin:
+            raise ValueError("Maximum and minimum must be different.")
+        return self._with_op('rescale', vmin, vmax, dtype)
+
+    def subtract_bg(self, dtype=None):
+        """ Record constant background subtraction. Compare
+        Spectrogram.subtract_bg. """
+        return self._with_op('subtract_bg', dtype)
+
+    def clip_freq(self, vmin=None, vmax=None):
+        """ Return lazy spectrogram only consisting of frequencies in the
+        interval [vmin, vmax]. Compare Spectrogram.clip_freq. """
+        return self[self._spec._freq_slice(vmin, vmax), :]
+
+    def __getitem__(self, key):
+        if (not isinstance(key, tuple) or
+                not all(isinstance(k, slice) for k in key)):
+            return self.compute()[key]
+        # Resolve everything that depends on the data in the current
+        # window before the window changes.
+        ops = [self._sliced(op, key[0]) for op in self._resolved_ops()]
+        return self.__class__(self._spec[key], ops, self.chunk)
+
+    @staticmethod
+    def _sliced(op, y_range):
+        """ Implementation detail. """
+        if op[0] == 'subtract':
+            return ('subtract', op[1][y_range], op[2])
+        return op
+
+    def _chunk_slices(self):
+        """ Yield column slices that cover the data in chunks. """
+        nrows, ncols = self._spec.shape
+        step = max(1, (self.chunk or DEFAULT_CHUNK_SIZE) // max(1, nrows))
+        for x in range(0, ncols, step):
+            yield slice(x, min(x + step, ncols))
+
+    def _chunks(self, ops):
+        """ Yield (slice, values) with ops applied to every chunk. """
+        for sl in self._chunk_slices():
+            yield sl, self._apply(ops, self._spec.data[:, sl])
+
+    @staticmethod
+    def _apply(ops, chunk):
+        """ Apply resolved ops to chunk. """
+        for op in ops:
+            if op[0] == 'clip':
+                chunk = chunk.clip(op[1], op[2])
+            elif op[0] == 'scale':
+                vmin, vmax, dmin, dmax, dtype = op[1:]
+                chunk = chunk.astype(dtype)
+                chunk -= dmin
+                chunk *= vmax - vmin
+                chunk /= dmax - dmin
+                chunk += vmin
+            elif op[0] == 'subtract':
+                chunk = chunk.astype(op[2])
+                chunk -= op[1]
+        return chunk
+
+    def _resolved_ops(self):
+        """ Return ops with all data dependent parameters computed. Recorded
+        ops are named after the methods, resolved ones are 'clip', 'scale'
+        and 'subtract'. """
+        resolved = []
+        for op in self._ops:
+            if op[0] == 'clip_values':
+                vmin, vmax = op[1:]
+                if vmin is None or vmax is None:
+                    dmin, dmax = self._min_max(resolved)
+                    vmin = int(dmin) if vmin is None else vmin
+                    vmax = int(dmax) if vmax is None else vmax
+                op = ('clip', vmin, vmax)
+            elif op[0] == 'rescale':
+                vmin, vmax, dtype = op[1:]
+                dmin, dmax = self._min_max(resolved, dtype)
+                if dmax == dmin:
+                    raise ValueError(
+                        "Spectrogram needs to contain distinct values.")
+                op = ('scale', vmin, vmax, dmin, dmax, dtype)
+            elif op[0] == 'subtract_bg':
+                dtype = op[1]
+                if dtype is None:
+                    # Same policy as Spectrogram.subtract_bg: keep floating
+                    # point types, never upcast to float64.
+                    dtype = self._apply(resolved, self._spec.data[:, :1]).dtype
+                    if dtype.kind != 'f':
+                        dtype = np.dtype('float32')
+                op = ('subtract', self._const_bg(resolved), dtype)
+            resolved.append(op)
+        self._ops = resolved
+        return resolved
+
+    def _min_max(self, ops, dtype=None):
+        """ Minimum and maximum of the data with ops applied, optionally
+        after conversion to dtype. """
+        if not ops:
+            # Nothing applied yet, the cached statistics of the source are
+            # exact.
+            stats = self._spec.stats()
+            extremes = np.array([stats.global_min(), stats.global_max()])
+            if dtype is not None:
+                extremes = extremes.astype(dtype)
+            return extremes[0], extremes[1]
+        dmin = dmax = None
+        for _, values in self._chunks(ops):
+            if dtype is not None:
+                values = values.astype(dtype)
+            cmin, cmax = values.min(), values.max()
+            dmin = cmin if dmin is None else min(dmin, cmin)
+            dmax = cmax if dmax is None else max(dmax, cmax)
+        return dmin, dmax
+
+    def _const_bg(self, ops, amount=0.05):
+        """ Background of the data with ops applied, as determined by
+        Spectrogram.auto_const_bg. """
+        nrows, ncols = self._spec.shape
+        if ops:
+            total = np.zeros(nrows)
+            for _, values in self._chunks(ops):
+                total += values.sum(1)
+            avg = (total / ncols).reshape(nrows, 1)
+        else:
+            avg = self._spec.stats().mean.reshape(nrows, 1)
+
+        sdevs = np.zeros(ncols)
+        for sl, values in self._chunks(ops):
+            tmp = values.astype(to_signed(values.dtype)) - avg
+            sdevs[sl] = np.std(tmp, 0)
+
+        cand = np.argsort(sdevs, kind='mergesort')
+        realcand = cand[:max(1, int(amount * len(cand)))]
+        bg = np.average(self._apply(ops, self._spec.data[:, realcand]), 1)
+        return bg.reshape(nrows, 1)
+
+    def _evaluate(self):
+        """ Implementation detail. """
+        ops = self._resolved_ops()
+        source = self._spec.data
+        if not ops:
+            return source
+        dtype = self._apply(ops, source[:, :1]).dtype
+        if isinstance(source, ma.MaskedArray):
+            out = ma.empty(source.shape, dtype=dtype)
+        else:
+            out = np.empty(source.shape, dtype=dtype)
+        for sl, values in self._chunks(ops):
+            out[:, sl] = values
+        return out
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Detection of radio frequency interference (RFI) in spectrograms.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import numpy as np
+
+__all__ = ['RFIMask', 'channel_mad', 'flag_channels', 'spectral_kurtosis',
+           'find_rfi']
+
+# Scale factor of the median absolute deviation to the standard deviation
+# of normally distributed data.
+MAD_TO_SIGMA = 1.4826
+
+
+def _robust_z(values):
+    """ Deviation of values from their median in robust standard
+    deviations. """
+    med = np.median(values)
+    mad = MAD_TO_SIGMA * np.median(np.abs(values - med))
+    if mad == 0:
+        mad = np.finfo(float).tiny
+    return (values - med) / mad
+
+
+def channel_mad(data, chunk=2 ** 20):
+    """
+    Return median and median absolute deviation of every frequency channel.
+    Blocks of channels are processed at a time, each of which is a
+    contiguous read of memory mapped data.
+    """
+    nrows = max(1, chunk // max(1, data.shape[1]))
+    med = np.empty(data.shape[0])
+    mad = np.empty(data.shape[0])
+    for y in range(0, data.shape[0], nrows):
+        rows = np.asarray(data[y:y + nrows], dtype=float)
+        med[y:y + nrows] = np.median(rows, 1)
+        mad[y:y + nrows] = np.median(
+            np.abs(rows - med[y:y + nrows, np.newaxis]), 1
+        )
+    return med, mad
+
+
+def flag_channels(data, threshold=5, chunk=2 ** 20):
+    """
+    Return boolean array that is True for channels whose median absolute
+    deviation is more than threshold robust standard deviations above
+    that of the other channels.
+    """
+    _, mad = channel_mad(data, chunk)
+    return _robust_z(mad) > threshold
+
+
+def _sk_estimator(s1, s2, m, accumulations):
+    """ Spectral kurtosis estimator of blocks of m values with sums s1 and
+    sums of squares s2. """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (m * accumulations + 1) / (m - 1) * (m * s2 / (s1 * s1) - 1)
+
+
+def spectral_kurtosis(data, block=64, accumulations=1, chunk=2 ** 20):
+    """
+    Return the spectral kurtosis estimator of every channel in blocks of
+    block time columns, as an array of shape (channels, blocks).
+
+    For power measurements of Gaussian noise the estimator is one;
+    continuous wave interference lowers, impulsive interference raises it.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Power measurements of shape (frequency channels, time columns).
+    block : int
+        Number of columns per block. The last block may be shorter.
+    accumulations : int
+        Number of spectra that were averaged into every column.
+    """
+    if block < 2:
+        raise ValueError("Blocks need to contain at least two columns.")
+    ncols = data.shape[1]
+    nblocks = -(-ncols // block)
+    sk = np.empty((data.shape[0], nblocks))
+    # Whole blocks per chunk, so every chunk can be reshaped.
+    step = block * max(1, chunk // max(1, data.shape[0] * block))
+    for x in range(0, ncols, step):
+        cols = np.asarray(data[:, x:x + step], dtype=float)
+        first = x // block
+        nwhole = cols.shape[1] // block
+        if nwhole:
+            values = cols[:, :nwhole * block].reshape(
+                cols.shape[0], nwhole, block
+            )
+            sk[:, first:first + nwhole] = _sk_estimator(
+                values.sum(2), (values * values).sum(2), block, accumulations
+            )
+        if cols.shape[1] > nwhole * block:
+            # Shorter last block.
+            values = cols[:, nwhole * block:]
+            sk[:, first + nwhole] = _sk_estimator(
+                values.sum(1), (values * values).sum(1), values.shape[1],
+                accumulations
+            )
+    return sk
+
+
+def find_rfi(data, threshold=5, block=64, sk_threshold=3, accumulations=1,
+             chunk=2 ** 20):
+    """
+    Return RFIMask of data, flagging channels by their median absolute
+    deviation and blocks of time columns by their spectral kurtosis. See
+    flag_channels and spectral_kurtosis.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Array of shape (frequency channels, time columns).
+    threshold : float
+        Robust standard deviations above which a channel is flagged.
+    block : int
+        Number of time columns per block for spectral kurtosis.
+    sk_threshold : float
+        Standard deviations of the spectral kurtosis estimator by which a
+        block has to deviate from one to be flagged.
+    accumulations : int
+        Number of spectra that were averaged into every column.
+    """
+    channels = flag_channels(data, threshold, chunk)
+    sk = spectral_kurtosis(data, block, accumulations, chunk)
+    # Variance of the estimator of blocks of m columns is about
+    # 2 (N + 1) / (m N), with N accumulations.
+    sizes = np.minimum(block, data.shape[1] - block * np.arange(sk.shape[1]))
+    sigma = np.sqrt(2 * (accumulations + 1) / (sizes * accumulations))
+    with np.errstate(invalid='ignore'):
+        blocks = np.abs(sk - 1) > sk_threshold * sigma
+    return RFIMask(channels, blocks, block, data.shape[1])
+
+
+class RFIMask(object):
+    """
+    Compact representation of RFI flags of a spectrogram.
+
+    Attributes
+    ----------
+    channels : np.ndarray
+        Boolean array, True for channels that are flagged entirely.
+    blocks : np.ndarray
+        Boolean array of shape (channels, blocks), True for blocks of time
+        columns that are flagged within a channel.
+    block : int
+        Number of time columns per block.
+    ncols : int
+        Number of time columns of the spectrogram.
+    """
+    def __init__(self, channels, blocks, block, ncols):
+        self.channels = np.asarray(channels, dtype=bool)
+        self.blocks = np.asarray(blocks, dtype=bool)
+        self.block = block
+        self.ncols = ncols
+
+    @property
+    def shape(self):
+        return (len(self.channels), self.ncols)
+
+    def __getitem__(self, key):
+        """ Return mask of the channels selected by key. """
+        return self.__class__(
+            self.channels[key], self.blocks[key], self.block, self.ncols
+        )
+
+    def __or__(self, other):
+        if self.block != other.block or self.shape != other.shape:
+            raise ValueError("Masks do not match.")
+        return self.__class__(
+            self.channels | other.channels, self.blocks | other.blocks,
+            self.block, self.ncols
+        )
+
+    def to_array(self):
+        """ Return boolean array of the shape of the spectrogram, True
+        for flagged values. """
+        full = np.repeat(self.blocks, self.block, 1)[:, :self.ncols]
+        full |= self.channels[:, np.newaxis]
+        return full
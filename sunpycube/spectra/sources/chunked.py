@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Spectrograms stored in blocks of time columns, each compressed on its own.
+
+The container is a ZIP file holding the blocks of columns as separately
+deflated .npy members, the time and frequency axes and a JSON description
+of the remaining properties, so a time window is read by decompressing
+only the blocks it overlaps.
+"""
+
+from __future__ import absolute_import
+
+import io
+import json
+import zipfile
+import datetime
+
+import numpy as np
+from numpy import ma
+
+from sunpy.extern.six import string_types
+from sunpycube.spectra.spectrogram import Spectrogram, LinearTimeSpectrogram
+
+__all__ = ['ChunkedArray', 'write', 'read']
+
+FORMAT_VERSION = 1
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+# Uncompressed size of a block if no number of columns is given.
+DEFAULT_CHUNK_BYTES = 2 ** 20
+
+
+def _encode(value):
+    """ Return JSON representation of a property value. """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, datetime.datetime):
+        return {'datetime': value.strftime(TIME_FORMAT)}
+    if isinstance(value, (set, frozenset)):
+        return {'set': sorted(_encode(elem) for elem in value)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(elem) for elem in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, string_types):
+        return value
+    raise TypeError("Cannot store property of type {0}.".format(
+        type(value).__name__))
+
+
+def _decode(value):
+    """ Return property value of its JSON representation. """
+    if isinstance(value, dict):
+        if 'datetime' in value:
+            return datetime.datetime.strptime(value['datetime'], TIME_FORMAT)
+        return set(_decode(elem) for elem in value['set'])
+    if isinstance(value, list):
+        return [_decode(elem) for elem in value]
+    return value
+
+
+def _to_bytes(arr):
+    """ Implementation detail. """
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(arr))
+    return buf.getvalue()
+
+
+def _from_bytes(data):
+    """ Implementation detail. """
+    return np.load(io.BytesIO(data))
+
+
+def write(spec, filename, chunk=None,
+          compression=zipfile.ZIP_DEFLATED):
+    """
+    Write spectrogram to filename in blocks of chunk time columns.
+
+    Parameters
+    ----------
+    spec : Spectrogram
+        Spectrogram to write. All of its COPY_PROPERTIES need to be
+        numpy arrays, datetimes, sets, numbers, strings or None.
+    filename : str
+        Path of the file to write.
+    chunk : int or None
+        Number of columns per block. Defaults to blocks of about
+        DEFAULT_CHUNK_BYTES uncompressed.
+    compression : int
+        zipfile compression constant used for every member.
+    """
+    data = spec.data
+    nrows, ncols = data.shape
+    if chunk is None:
+        chunk = max(1, DEFAULT_CHUNK_BYTES // max(
+            1, nrows * data.dtype.itemsize))
+    masked = isinstance(data, ma.MaskedArray)
+
+    properties = {}
+    arrays = {}
+    for name, value in spec._get_params().items():
+        if isinstance(value, np.ndarray):
+            arrays[name] = value
+        else:
+            properties[name] = _encode(value)
+    meta = {
+        'version': FORMAT_VERSION,
+        'linear': isinstance(spec, LinearTimeSpectrogram),
+        'shape': [nrows, ncols],
+        'dtype': data.dtype.str,
+        'chunk': chunk,
+        'masked': masked,
+        'properties': properties,
+        'arrays': sorted(arrays),
+    }
+
+    fl = zipfile.ZipFile(filename, 'w', compression, allowZip64=True)
+    try:
+        fl.writestr('meta.json', json.dumps(meta, indent=1))
+        for name, value in arrays.items():
+            fl.writestr('{0}.npy'.format(name), _to_bytes(value))
+        for n, x in enumerate(range(0, ncols, chunk)):
+            block = data[:, x:x + chunk]
+            fl.writestr('data/{0:08d}.npy'.format(n),
+                        _to_bytes(ma.getdata(block)))
+            if masked:
+                fl.writestr('mask/{0:08d}.npy'.format(n),
+                            _to_bytes(ma.getmaskarray(block)))
+    finally:
+        fl.close()
+
+
+class ChunkedArray(object):
+    """
+    Read-only array of a file written by write, decompressing only the
+    blocks of columns that are indexed.
+
+    Only indexing with a tuple of a row key and a slice or integer of
+    columns, as done by Spectrogram slicing and in_interval, reads part of
+    the file. Everything else, including numpy functions, arithmetic and
+    Spectrogram methods that work on the whole data, goes through
+    __array__ and decompresses every block at once.
+
+    The file is kept open until close is called, or the ChunkedArray is
+    used as a context manager::
+
+        spec = read(filename, lazy=True)
+        with spec.data:
+            window = spec.in_interval(start, end)
+
+    Attributes
+    ----------
+    shape : tuple
+    dtype : np.dtype
+    chunk : int
+        Number of columns per block.
+    """
+    ndim = 2
+
+    def __init__(self, zfile, shape, dtype, chunk, masked):
+        self._zfile = zfile
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.chunk = chunk
+        self.masked = masked
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._zfile is None
+
+    def close(self):
+        """ Close the file. Indexing afterwards raises ValueError. """
+        if self._zfile is not None:
+            self._zfile.close()
+            self._zfile = None
+
+    def __array__(self, dtype=None):
+        """ Return all of the data, decompressing every block. """
+        return np.asarray(self[:, :], dtype)
+
+    def _block(self, n):
+        """ Return block n. """
+        if self._zfile is None:
+            raise ValueError("ChunkedArray is closed.")
+        data = _from_bytes(self._zfile.read('data/{0:08d}.npy'.format(n)))
+        if not self.masked:
+            return data
+        mask = _from_bytes(self._zfile.read('mask/{0:08d}.npy'.format(n)))
+        return ma.array(data, mask=mask)
+
+    def _columns(self, start, stop):
+        """ Return columns start to stop, decompressing the blocks
+        covering them. """
+        if stop <= start:
+            shape = (self.shape[0], 0)
+            if self.masked:
+                return ma.zeros(shape, dtype=self.dtype)
+            return np.zeros(shape, dtype=self.dtype)
+        first, last = start // self.chunk, (stop - 1) // self.chunk
+        blocks = [self._block(n) for n in range(first, last + 1)]
+        concat = ma.concatenate if self.masked else np.concatenate
+        data = blocks[0] if len(blocks) == 1 else concat(blocks, 1)
+        offset = first * self.chunk
+        return data[:, start - offset:stop - offset]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        y_key, x_key = key
+        if isinstance(x_key, slice):
+            start, stop, step = x_key.indices(self.shape[1])
+            if step > 0:
+                data = self._columns(start, stop)[:, ::step]
+            else:
+                data = self._columns(stop + 1, start + 1)[:, ::step]
+        elif isinstance(x_key, (int, np.integer)):
+            x = x_key % self.shape[1]
+            data = self._columns(x, x + 1)[:, 0]
+        else:
+            data = self._columns(0, self.shape[1])[:, x_key]
+        return data[y_key]
+
+
+def read(filename, lazy=False, cls=None):
+    """
+    Read spectrogram written by write.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the file to read.
+    lazy : bool
+        If True, the data of the result is a ChunkedArray and only the
+        blocks needed by slicing or in_interval are decompressed, e.g.
+        ``read(filename, lazy=True).in_interval(start, end)``. The file
+        stays open until the ChunkedArray is closed.
+    cls : type or None
+        Class of the result. Defaults to LinearTimeSpectrogram or
+        Spectrogram, whichever was written.
+    """
+    zfile = zipfile.ZipFile(filename, 'r')
+    try:
+        meta = json.loads(zfile.read('meta.json').decode('utf-8'))
+        if meta['version'] > FORMAT_VERSION:
+            raise ValueError("Unsupported format version.")
+        params = dict(
+            (str(name), _decode(value))
+            for name, value in meta['properties'].items()
+        )
+        for name in meta['arrays']:
+            params[str(name)] = _from_bytes(
+                zfile.read('{0}.npy'.format(name)))
+
+        data = ChunkedArray(
+            zfile, meta['shape'], meta['dtype'], meta['chunk'],
+            meta['masked']
+        )
+        if not lazy:
+            data = data[:, :]
+    except Exception:
+        zfile.close()
+        raise
+    if not lazy:
+        zfile.close()
+    if cls is None:
+        cls = LinearTimeSpectrogram if meta['linear'] else Spectrogram
+    return cls(data, **params)
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=E1101
+"""
+Spectrograms stored as FITS image with a binary table of their axes.
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+
+from astropy.io import fits
+
+from sunpy.time import parse_time
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram, REFERENCE
+
+__all__ = ['FITSSpectrogram']
+
+# Data-type of FITS images without scaling, by BITPIX.
+BITPIX_DTYPES = {
+    8: np.dtype('uint8'),
+    16: np.dtype('>i2'),
+    32: np.dtype('>i4'),
+    64: np.dtype('>i8'),
+    -32: np.dtype('>f4'),
+    -64: np.dtype('>f8'),
+}
+
+# Header keywords describing the image layout, which are rewritten by
+# FITSSpectrogram.write rather than copied from the original header.
+STRUCTURE_KEYS = set([
+    'SIMPLE', 'BITPIX', 'NAXIS', 'NAXIS1', 'NAXIS2', 'EXTEND', 'BZERO',
+    'BSCALE', 'CTYPE1', 'CTYPE2', 'CRVAL1', 'CRVAL2', 'CDELT1', 'CDELT2',
+    'CRPIX1', 'CRPIX2', 'DATE-OBS', 'TIME-OBS', 'DATE-END', 'TIME-END',
+    'CONTENT', 'INSTRUME',
+])
+
+
+def _parse_header_time(date, time):
+    """ Returns datetime object from date and time fields of header. """
+    if time is not None:
+        date = date + 'T' + time
+    return parse_time(date)
+
+
+def _header_dtype(header):
+    """ Return the data-type astropy uses for the image described by
+    header. """
+    dtype = BITPIX_DTYPES[header['BITPIX']]
+    bzero = header.get('BZERO', 0)
+    bscale = header.get('BSCALE', 1)
+    if bscale == 1 and dtype.kind == 'i' and bzero == 2 ** (
+            8 * dtype.itemsize - 1):
+        return np.dtype('>u{0}'.format(dtype.itemsize))
+    if bscale == 1 and dtype.kind == 'u' and bzero == -128:
+        return np.dtype('int8')
+    if bzero != 0 or bscale != 1:
+        return np.dtype('float32' if dtype.itemsize <= 2 else 'float64')
+    return dtype
+
+
+class FITSSpectrogram(LinearTimeSpectrogram):
+    """
+    LinearTimeSpectrogram read from or written to a FITS file.
+
+    The file contains the image in its primary HDU, with time along the
+    first FITS axis, and a binary table with columns TIME and FREQUENCY
+    holding the axes, as used by the CALLISTO network. Files with the axes
+    of the image swapped are transposed when read.
+
+    Spectrograms opened with lazy=True only read the headers and the axes
+    table; shape, dtype, times and axes are known, and the image is only
+    read when data is first accessed. Joining them with join_many reads
+    one image at a time.
+
+    Attributes
+    ----------
+    filename : str or None
+        File the image is read from on first access.
+    header : astropy.io.fits.Header or None
+        Primary header of the file.
+    axes_header : astropy.io.fits.Header or None
+        Header of the axes table.
+    swapped : bool
+        Whether the x-axis of the image in the file was frequency.
+    use_memmap : bool
+        Whether the image is memory mapped when read.
+    """
+    COPY_PROPERTIES = LinearTimeSpectrogram.COPY_PROPERTIES + [
+        ('filename', REFERENCE),
+        ('header', REFERENCE),
+        ('axes_header', REFERENCE),
+        ('swapped', REFERENCE),
+        ('use_memmap', REFERENCE),
+    ]
+
+    def __init__(self, data, time_axis, freq_axis, start, end, t_init=None,
+                 t_delt=None, t_label="Time", f_label="Frequency",
+                 content="", instruments=None, filename=None, header=None,
+                 axes_header=None, swapped=False, use_memmap=True):
+        # Needed by data and shape before the image is read.
+        self._data = None
+        self.filename = filename
+        self.header = header
+        self.axes_header = axes_header
+        self.swapped = swapped
+        self.use_memmap = use_memmap
+
+        super(FITSSpectrogram, self).__init__(
+            data, time_axis, freq_axis, start, end, t_init, t_delt,
+            t_label, f_label, content, instruments
+        )
+
+    @property
+    def data(self):
+        if self._data is None:
+            if self.filename is None:
+                return None
+            data = fits.getdata(self.filename, 0, memmap=self.use_memmap,
+                                uint=True)
+            self._data = data.transpose() if self.swapped else data
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def loaded(self):
+        """ Whether the image has been read. """
+        return self._data is not None
+
+    @property
+    def shape(self):
+        if self._data is None and self.header is not None:
+            shape = (self.header['NAXIS2'], self.header['NAXIS1'])
+            return shape[::-1] if self.swapped else shape
+        return self.data.shape
+
+    @property
+    def dtype(self):
+        if self._data is None and self.header is not None:
+            return _header_dtype(self.header)
+        return self.data.dtype
+
+    @classmethod
+    def read(cls, filename, lazy=False, memmap=True):
+        """ Read spectrogram from FITS file.
+
+        Parameters
+        ----------
+        filename : str
+            path of the file to read
+        lazy : bool
+            If True, only read the headers and axes; the image is read when
+            data is first accessed.
+        memmap : bool
+            Whether to memory map the image.
+        """
+        with fits.open(filename, memmap=memmap, uint=True) as fl:
+            header = fl[0].header.copy()
+            axes_header = fl[1].header.copy()
+            columns = dict(
+                (name.upper(), np.array(np.squeeze(fl[1].data[name])))
+                for name in fl[1].columns.names
+            )
+            # A memory mapped image stays valid after the file is closed.
+            data = None if lazy else fl[0].data
+
+        start = _parse_header_time(
+            header['DATE-OBS'], header.get('TIME-OBS')
+        )
+        end = _parse_header_time(
+            header['DATE-END'], header.get('TIME-END')
+        )
+
+        swapped = (
+            'time' not in header['CTYPE1'].lower() and
+            'time' in header['CTYPE2'].lower()
+        )
+        t_axis, f_axis = ('2', '1') if swapped else ('1', '2')
+        t_delt = header['CDELT' + t_axis]
+        t_init = header['CRVAL' + t_axis] - t_delt * header['CRPIX' + t_axis]
+        if data is not None and swapped:
+            data = data.transpose()
+
+        time_axis = columns.get('TIME')
+        if time_axis is None:
+            time_axis = np.arange(header['NAXIS' + t_axis]) * t_delt
+        freq_axis = columns.get('FREQUENCY')
+        if freq_axis is None:
+            f_delt = header['CDELT' + f_axis]
+            freq_axis = (
+                header['CRVAL' + f_axis] +
+                (np.arange(header['NAXIS' + f_axis]) -
+                 header['CRPIX' + f_axis]) * f_delt
+            )
+
+        instruments = header.get('INSTRUME', '').strip()
+        instruments = set(instruments.split(',')) if instruments else set()
+
+        return cls(
+            data, time_axis, freq_axis, start, end, t_init, t_delt,
+            header['CTYPE' + t_axis], header['CTYPE' + f_axis],
+            header.get('CONTENT', ''), instruments, filename, header,
+            axes_header, swapped, memmap
+        )
+
+    def get_header(self):
+        """ Return primary header describing the spectrogram, keeping all
+        other keywords of the original header. """
+        header = fits.Header()
+        if self.header is not None:
+            for card in self.header.cards:
+                if card.keyword not in STRUCTURE_KEYS:
+                    header.append(card)
+
+        header['DATE-OBS'] = self.start.strftime('%Y-%m-%d')
+        header['TIME-OBS'] = self.start.strftime('%H:%M:%S.%f')
+        header['DATE-END'] = self.end.strftime('%Y-%m-%d')
+        header['TIME-END'] = self.end.strftime('%H:%M:%S.%f')
+        header['CONTENT'] = self.content
+        header['INSTRUME'] = ','.join(sorted(self.instruments))
+        header['CTYPE1'] = self.t_label
+        header['CRVAL1'] = self.t_init
+        header['CDELT1'] = self.t_delt
+        header['CRPIX1'] = 0
+        header['CTYPE2'] = self.f_label
+        header['CRVAL2'] = self.freq_axis[0]
+        header['CDELT2'] = (
+            self.freq_axis[1] - self.freq_axis[0]
+            if len(self.freq_axis) > 1 else 0
+        )
+        header['CRPIX2'] = 0
+        return header
+
+    def write(self, filename):
+        """ Write spectrogram to FITS file, with time along the first
+        axis of the image.
+
+        Parameters
+        ----------
+        filename : str
+            path to write the file to
+        """
+        primary = fits.PrimaryHDU(np.asarray(self.data),
+                                  header=self.get_header())
+        cols = fits.ColDefs([
+            fits.Column(name='TIME', format='{0}D'.format(self.shape[1]),
+                        array=self.time_axis[np.newaxis, :]),
+            fits.Column(name='FREQUENCY',
+                        format='{0}D'.format(self.shape[0]),
+                        array=self.freq_axis[np.newaxis, :]),
+        ])
+        table = fits.BinTableHDU.from_columns(cols)
+        fits.HDUList([primary, table]).writeto(filename)
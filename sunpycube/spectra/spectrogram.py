@@ -35,6 +35,15 @@ from sunpy.util import to_signed, common_base, merge
 from sunpy.util.cond_dispatch import ConditionalDispatch
 from sunpy.util.create import Parent
 from sunpycube.spectra.spectrum import Spectrum
+from sunpycube.spectra.lazy import LazySpectrogram
+from sunpycube.spectra import rfi, bursts
+from sunpycube.spectra.drift import DriftMap, drift_transform
+from sunpycube.spectra.background import (
+    running_percentile, expand_background
+)
+from sunpycube.spectra.stats import compute_stats
+from sunpycube.spectra.align import estimate_time_offset
+from sunpycube.spectra.buffer import SpectrogramBuffer
 
 __all__ = ['Spectrogram', 'LinearTimeSpectrogram']
 
@@ -70,6 +79,30 @@ def _min_delt(arr):
     return deltas[deltas != 0].min()
 
 
+def _float_dtype(dtype):
+    """ Return dtype if it is a floating point type, else float32. Keeps
+    transforms from silently upcasting to float64. """
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'f':
+        return dtype
+    return np.dtype('float32')
+
+
+def _into(data, out, dtype):
+    """ Return data converted to dtype, written to out if it is given. out
+    has to be of floating point type, as the results of the transforms
+    using it are. """
+    if out is None:
+        return data.astype(dtype)
+    if _float_dtype(out.dtype) != out.dtype:
+        raise TypeError(
+            "out must be of floating point type, not {0}.".format(out.dtype)
+        )
+    if out is not data:
+        out[...] = data
+    return out
+
+
 def _list_formatter(lst, fun=None):
     """ Return function that takes x, pos and returns fun(lst[x]) if
     fun is not None, else lst[x] or "" if x is out of range. """
@@ -85,6 +118,26 @@ def _list_formatter(lst, fun=None):
     return _fun
 
 
+def _block_reduce(data, freq_factor, time_factor, method, dtype):
+    """ Return data reduced over blocks of freq_factor channels and
+    time_factor columns with method. The shape of data needs to be a
+    multiple of the factors. Masked values are ignored. """
+    nrows, ncols = data.shape
+    blocks = data.reshape(
+        nrows // freq_factor, freq_factor, ncols // time_factor, time_factor
+    )
+    if method == 'max':
+        return blocks.max(3).max(1)
+    if method == 'sum':
+        return blocks.sum(3).sum(1)
+    total = blocks.astype(np.float64).sum(3).sum(1)
+    if isinstance(data, ma.MaskedArray):
+        count = ma.count(blocks, 3).sum(1)
+    else:
+        count = freq_factor * time_factor
+    return (total / count).astype(dtype)
+
+
 def _union(sets):
     """ Return union of sets. """
     union = set()
@@ -288,6 +341,8 @@ class Spectrogram(Parent):
         ('t_init', REFERENCE),
     ]
     _create = ConditionalDispatch.from_existing(Parent._create)
+    # (data, SpectrogramStats) of the last call to stats.
+    _stats = None
 
     @property
     def shape(self):
@@ -332,8 +387,16 @@ class Spectrogram(Parent):
         return self.__class__(data, **params)
 
     def _with_data(self, data):
+        # Only arrays already in memory are compared, so lazily read data
+        # is not loaded.
+        if (self._stats is not None and
+                isinstance(self._stats[0], np.ndarray) and
+                np.may_share_memory(data, self._stats[0])):
+            # Data was changed in place.
+            self._stats = None
         new = copy(self)
         new.data = data
+        new._stats = None
         return new
 
     def __init__(self, data, time_axis, freq_axis, start, end, t_init=None,
@@ -580,6 +643,11 @@ class Spectrogram(Parent):
         max\_ : float
             All frequencies in the result are smaller or equal to this.
         """
+        return self[self._freq_slice(vmin, vmax), :]
+
+    def _freq_slice(self, vmin=None, vmax=None):
+        """ Return slice of the frequency channels in the interval
+        [min\_, max\_]. """
         left = 0
         if vmax is not None:
             while self.freq_axis[left] > vmax:
@@ -591,17 +659,39 @@ class Spectrogram(Parent):
             while self.freq_axis[right] < vmin:
                 right -= 1
 
-        return self[left:right + 1, :]
+        return slice(left, right + 1)
+
+    def stats(self):
+        """ Return SpectrogramStats of the data, holding per-channel and
+        per-column mean, variance, minimum and maximum and approximate
+        percentiles. They are computed in a single pass over the data and
+        kept until the data is replaced or changed in place by one of the
+        methods of the spectrogram. Call invalidate after changing the data
+        in place in any other way. """
+        if self._stats is None or self._stats[0] is not self.data:
+            self._stats = (self.data, compute_stats(self.data))
+        return self._stats[1]
+
+    def invalidate(self):
+        """ Discard the statistics kept by stats, so they are computed
+        again. Needed after changing the data in place other than through
+        the methods of the spectrogram, e.g. ``spec.data[0] = 0``. """
+        self._stats = None
 
     def auto_find_background(self, amount=0.05):
         # pylint: disable=E1101,E1103
-        data = self.data.astype(to_signed(self.dtype))
-        # Subtract average value from every frequency channel.
-        tmp = (data - np.average(self.data, 1).reshape(self.shape[0], 1))
-        # Get standard deviation at every point of time.
+        avg = self.stats().mean.reshape(self.shape[0], 1)
+        signed = to_signed(self.dtype)
+        # Get standard deviation at every point of time after subtracting
+        # the average value from every frequency channel. Done in blocks
+        # of columns so no data-sized temporaries are needed.
         # Need to convert because otherwise this class's __getitem__
         # is used which assumes two-dimensionality.
-        sdevs = np.asarray(np.std(tmp, 0))
+        sdevs = np.empty(self.shape[1])
+        step = max(1, 2 ** 16 // max(1, self.shape[0]))
+        for x in range(0, self.shape[1], step):
+            tmp = self.data[:, x:x + step].astype(signed) - avg
+            sdevs[x:x + step] = np.asarray(np.std(tmp, 0))
 
         # Get indices of values with lowest standard deviation.
         cand = sorted(xrange(self.shape[1]), key=lambda y: sdevs[y])
@@ -614,9 +704,85 @@ class Spectrogram(Parent):
         bg = np.average(self.data[:, realcand], 1)
         return bg.reshape(self.shape[0], 1)
 
-    def subtract_bg(self):
-        """ Perform constant background subtraction. """
-        return self._with_data(self.data - self.auto_const_bg())
+    def subtract_bg(self, out=None, dtype=None):
+        """ Perform constant background subtraction.
+
+        Parameters
+        ----------
+        out : np.ndarray or None
+            Array to write the result to, of floating point type. Pass the
+            spectrogram's data to subtract in place if it is floating point;
+            TypeError is raised for integer arrays.
+        dtype : np.dtype or None
+            Data-type of the result if out is None. Defaults to the data-type
+            of the spectrogram if it is floating point, else float32.
+        """
+        bg = self.auto_const_bg()
+        if dtype is None:
+            dtype = _float_dtype(self.dtype)
+        out = _into(self.data, out, dtype)
+        out -= bg
+        return self._with_data(out)
+
+    def auto_running_bg(self, window, percentile=50, step=None):
+        """ Automatically determine time-varying background as a running
+        percentile of every frequency channel.
+
+        Parameters
+        ----------
+        window : int
+            Number of time columns the percentile is taken over.
+        percentile : float
+            Percentile of the window to use, 50 being the median.
+        step : int or None
+            The percentile is evaluated every step columns and linearly
+            interpolated in between. Defaults to a quarter of the window.
+        """
+        centers, values = running_percentile(
+            self.data, window, percentile, step
+        )
+        return expand_background(centers, values, 0, self.shape[1])
+
+    def subtract_running_bg(self, window, percentile=50, step=None,
+                            out=None, dtype=None):
+        """ Perform time-varying background subtraction, see
+        auto_running_bg. Works on blocks of columns, so no data-sized
+        background is allocated.
+
+        Parameters
+        ----------
+        window : int
+            Number of time columns the percentile is taken over.
+        percentile : float
+            Percentile of the window to use, 50 being the median.
+        step : int or None
+            The percentile is evaluated every step columns and linearly
+            interpolated in between. Defaults to a quarter of the window.
+        out : np.ndarray or None
+            Array to write the result to. Pass the spectrogram's data to
+            subtract in place.
+        dtype : np.dtype or None
+            Data-type of the result if out is None. Defaults to the data-type
+            of the spectrogram if it is floating point, else float32.
+        """
+        centers, values = running_percentile(
+            self.data, window, percentile, step
+        )
+        if out is None:
+            if dtype is None:
+                dtype = _float_dtype(self.dtype)
+            if isinstance(self.data, ma.MaskedArray):
+                out = ma.empty(self.shape, dtype=dtype)
+            else:
+                out = np.empty(self.shape, dtype=dtype)
+        chunk = max(1, 2 ** 16 // max(1, self.shape[0]))
+        for x in range(0, self.shape[1], chunk):
+            stop = min(x + chunk, self.shape[1])
+            out[:, x:stop] = (
+                self.data[:, x:stop] -
+                expand_background(centers, values, x, stop)
+            )
+        return self._with_data(out)
 
     def randomized_auto_const_bg(self, amount):
         """ Automatically determine background. Only consider a randomly
@@ -662,6 +828,74 @@ class Spectrogram(Parent):
         """
         return self._with_data(self.data - self.randomized_auto_const_bg(amount))
 
+    def find_rfi(self, threshold=5, block=64, sk_threshold=3,
+                 accumulations=1):
+        """ Return RFIMask flagging frequency channels with outlying median
+        absolute deviation and blocks of time columns with outlying spectral
+        kurtosis. Run it before converting intensities, e.g. with
+        subtract_bg, as spectral kurtosis expects power measurements.
+
+        Parameters
+        ----------
+        threshold : float
+            Robust standard deviations above which a channel is flagged.
+        block : int
+            Number of time columns per block for spectral kurtosis.
+        sk_threshold : float
+            Standard deviations of the spectral kurtosis estimator by which
+            a block has to deviate from one to be flagged.
+        accumulations : int
+            Number of spectra that were averaged into every column.
+        """
+        return rfi.find_rfi(
+            self.data, threshold, block, sk_threshold, accumulations
+        )
+
+    def find_bursts(self, threshold=None, sigma=5, min_size=10,
+                    chunk=2 ** 22, overlap=None):
+        """ Return list of connected regions of high intensity, ordered by
+        start time, with their time and frequency extents and drift rates.
+        The spectrogram should be background subtracted. Blocks of columns
+        are processed at a time.
+
+        Parameters
+        ----------
+        threshold : float or None
+            Intensity above which values belong to a burst. Defaults to sigma
+            robust standard deviations above the median.
+        sigma : float
+            Used to determine the threshold if it is None.
+        min_size : int
+            Regions with fewer values are discarded.
+        chunk : int
+            Number of values per block.
+        overlap : int or None
+            Number of columns by which blocks are extended on both sides.
+            Bursts longer than that may be split. Defaults to a quarter of
+            the block.
+        """
+        return bursts.find_bursts(
+            self, threshold, sigma, min_size, chunk, overlap
+        )
+
+    def mask_rfi(self, mask=None, **kwargs):
+        """ Return spectrogram with values flagged as RFI masked. The result
+        can be clipped with clip_freq and is handled by the background
+        subtraction methods.
+
+        Parameters
+        ----------
+        mask : RFIMask or None
+            Flags to apply. If None, they are determined by find_rfi, which
+            is passed kwargs.
+        """
+        if mask is None:
+            mask = self.find_rfi(**kwargs)
+        if mask.shape != self.shape:
+            raise ValueError("Mask does not match spectrogram.")
+        flags = mask.to_array() | ma.getmaskarray(self.data)
+        return self._with_data(ma.array(self.data, mask=flags))
+
     def clip_values(self, vmin=None, vmax=None, out=None):
         """
         Clip intensities to be in the interval [min\_, max\_].
@@ -676,17 +910,21 @@ class Spectrogram(Parent):
             New minimum value for intensities.
         max\_ : int or float
             New maximum value for intensities
+        out : np.ndarray or None
+            Array to write the result to. Pass the spectrogram's data to
+            clip in place.
         """
         # pylint: disable=E1101
-        if vmin is None:
-            vmin = int(self.data.min())
-
-        if vmax is None:
-            vmax = int(self.data.max())
+        if vmin is None or vmax is None:
+            stats = self.stats()
+            if vmin is None:
+                vmin = int(stats.global_min())
+            if vmax is None:
+                vmax = int(stats.global_max())
 
         return self._with_data(self.data.clip(vmin, vmax, out))
 
-    def rescale(self, vmin=0, vmax=1, dtype=np.dtype('float32')):
+    def rescale(self, vmin=0, vmax=1, dtype=np.dtype('float32'), out=None):
         u"""
         Rescale intensities to [min\_, max\_].
         Note that min\_ ≠ max\_ and spectrogram.min() ≠ spectrogram.max().
@@ -698,17 +936,108 @@ class Spectrogram(Parent):
         max\_ : float or int
             New maximum value in the resulting spectrogram.
         dtype : np.dtype
-            Data-type of the resulting spectrogram.
+            Data-type of the resulting spectrogram if out is None. Types
+            that are not floating point give float32.
+        out : np.ndarray or None
+            Array to write the result to, of floating point type. Pass the
+            spectrogram's data to rescale in place.
         """
         if vmax == vmin:
             raise ValueError("Maximum and minimum must be different.")
-        if self.data.max() == self.data.min():
+        stats = self.stats()
+        out = _into(self.data, out, _float_dtype(dtype))
+        # Conversion is monotonic, so the converted extremes are those of
+        # the data and map exactly to the new ones.
+        dmin, dmax = np.array(
+            [stats.global_min(), stats.global_max()]
+        ).astype(out.dtype)
+        if dmax == dmin:
             raise ValueError("Spectrogram needs to contain distinct values.")
-        data = self.data.astype(dtype)
-        return self._with_data(
-            vmin + (vmax - vmin) * (data - self.data.min()) /
-            (self.data.max() - self.data.min())
-        )
+        out -= dmin
+        out *= vmax - vmin
+        out /= dmax - dmin
+        out += vmin
+        return self._with_data(out)
+
+    def bin(self, freq_factor=1, time_factor=1, method='mean',
+            chunk=2 ** 20):
+        """
+        Return spectrogram reduced over blocks of freq_factor channels and
+        time_factor columns. Channels and columns that do not fill a whole
+        block at the end are dropped. Masked values, e.g. gaps filled by
+        join_many, are left out of the reduction, and blocks without any
+        unmasked value are masked.
+
+        The frequency of every channel and the time of every column become
+        the mean of the block; t_delt, if present, is multiplied by
+        time_factor.
+
+        Parameters
+        ----------
+        freq_factor : int
+            Number of channels per block.
+        time_factor : int
+            Number of columns per block.
+        method : {'mean', 'sum', 'max'}
+            Reduction of the values in a block. The mean is of floating
+            point type, see subtract_bg.
+        chunk : int
+            Number of values to read at once.
+        """
+        if method not in ('mean', 'sum', 'max'):
+            raise ValueError("Unknown method {0!r}.".format(method))
+        if freq_factor < 1 or time_factor < 1:
+            raise ValueError("Factors need to be positive.")
+        nfreq = self.shape[0] // freq_factor
+        ncols = self.shape[1] // time_factor
+        if not nfreq or not ncols:
+            raise ValueError("Spectrogram is smaller than one block.")
+        nrows = nfreq * freq_factor
+
+        dtype = _float_dtype(self.dtype)
+        masked = isinstance(self.data, ma.MaskedArray)
+        step = time_factor * max(1, chunk // (nrows * time_factor))
+        data = None
+        for x in range(0, ncols * time_factor, step):
+            block = self.data[:nrows, x:min(x + step, ncols * time_factor)]
+            values = _block_reduce(
+                block, freq_factor, time_factor, method, dtype)
+            if data is None:
+                data = (ma.zeros if masked else np.zeros)(
+                    (nfreq, ncols), dtype=values.dtype)
+            data[:, x // time_factor:x // time_factor + values.shape[1]] = (
+                values
+            )
+
+        freq_axis = self.freq_axis[:nrows].reshape(
+            nfreq, freq_factor).mean(1)
+        times = self.time_axis[:ncols * time_factor].reshape(
+            ncols, time_factor).mean(1)
+        params = self._get_params()
+        params.update({
+            'time_axis': times - times[0],
+            'freq_axis': freq_axis,
+            'start': self.start + datetime.timedelta(seconds=times[0]),
+            'end': self.start + datetime.timedelta(seconds=times[-1]),
+            't_init': self.t_init + times[0],
+        })
+        if 't_delt' in params:
+            params['t_delt'] = self.t_delt * time_factor
+        return self.__class__(data, **params)
+
+    def lazy(self, chunk=None):
+        """
+        Return LazySpectrogram of this spectrogram. Transforms applied to
+        it are only recorded and are evaluated in a single pass over the data
+        once the result is needed, without intermediate full-size arrays.
+
+        Parameters
+        ----------
+        chunk : int or None
+            Number of elements to process at once. If None, use
+            DEFAULT_CHUNK_SIZE of sunpycube.spectra.lazy.
+        """
+        return LazySpectrogram(self, chunk=chunk)
 
     def interpolate(self, frequency):
         """
@@ -791,6 +1120,22 @@ class Spectrogram(Parent):
             raise ValueError("No overlap.")
         return lower, upper
 
+    def shift_time(self, seconds):
+        """ Return spectrogram sharing the data of this one with start,
+        end and t_init moved by seconds, e.g. to correct a clock offset.
+
+        Parameters
+        ----------
+        seconds : float
+            Amount of seconds to move the spectrogram by.
+        """
+        new = copy(self)
+        delta = datetime.timedelta(seconds=seconds)
+        new.start = self.start + delta
+        new.end = self.end + delta
+        new.t_init = self.t_init + seconds
+        return new
+
     def time_to_x(self, time):
         """ Return x-coordinate in spectrogram that corresponds to the
         passed datetime value.
@@ -911,11 +1256,50 @@ class LinearTimeSpectrogram(Spectrogram):
         })
         return self.__class__(data, **params)
 
+    def drift_transform(self, rates, f_ref=None, chunk=2 ** 20):
+        """ Return DriftMap of the mean intensity along paths of constant
+        frequency drift for every rate and every time a path passes f_ref.
+        A burst shows up as a peak at its drift rate and time.
+
+        Parameters
+        ----------
+        rates : array_like
+            Non-zero drift rates in frequency units per second.
+        f_ref : float or None
+            Reference frequency. Defaults to the first channel's.
+        chunk : int
+            Approximate number of phase factors computed at once.
+        """
+        if f_ref is None:
+            f_ref = self.freq_axis[0]
+        data = drift_transform(
+            self.data, self.freq_axis, self.t_delt, rates, f_ref, chunk
+        )
+        return DriftMap(
+            data, np.atleast_1d(rates), self.time_axis, self.start, f_ref
+        )
+
+    def time_offset(self, other, max_lag=None):
+        """ Return seconds to add to the times of other so it lines up with
+        this spectrogram, estimated by cross-correlating them over the time
+        and frequency range they share. The result can be applied with
+        other.shift_time.
+
+        Parameters
+        ----------
+        other : LinearTimeSpectrogram
+            Spectrogram to compare with.
+        max_lag : float or None
+            Largest offset in seconds to consider. Defaults to half of the
+            common time range.
+        """
+        return estimate_time_offset(self, other, max_lag)
+
     JOIN_REPEAT = object()
 
     @classmethod
     def join_many(cls, specs, mk_arr=None, nonlinear=False,
-                  maxgap=0, fill=JOIN_REPEAT):
+                  maxgap=0, fill=JOIN_REPEAT, align=False, max_lag=None):
         """ Produce new Spectrogram that contains spectrograms
         joined together in time.
 
@@ -937,6 +1321,13 @@ class LinearTimeSpectrogram(Spectrogram):
             Function that is called to create the resulting array. Can be set
             to LinearTimeSpectrogram.memap(filename) to create a memory mapped
             result array.
+        align : bool
+            If True, correct clock offsets by shifting every spectrogram
+            that overlaps the previous one in time by the offset estimated
+            with time_offset. The data is not copied for this. Offsets are
+            applied in whole columns when joining.
+        max_lag : float or None
+            Largest offset in seconds to correct if align is True.
         """
         # XXX: Only load header and load contents of files
         # on demand.
@@ -946,6 +1337,16 @@ class LinearTimeSpectrogram(Spectrogram):
             mk_arr = cls.make_array
 
         specs = sorted(specs, key=lambda x: x.start)
+        if align:
+            aligned = specs[:1]
+            for elem in specs[1:]:
+                try:
+                    offset = aligned[-1].time_offset(elem, max_lag)
+                except ValueError:
+                    # No overlap to estimate the offset from.
+                    offset = 0
+                aligned.append(elem.shift_time(offset))
+            specs = aligned
 
         freqs = specs[0].freq_axis
         if not all(np.array_equal(freqs, sp.freq_axis) for sp in specs):
@@ -1053,6 +1454,91 @@ class LinearTimeSpectrogram(Spectrogram):
             return Spectrogram(arr, **params)
         return common_base(specs)(arr, **params)
 
+    def append(self, other, maxgap=0, fill=JOIN_REPEAT, filename=None):
+        """ Return new spectrogram of this one followed by other in time.
+
+        The result is backed by a buffer with room for more columns, so
+        appending to the result again only costs time proportional to the
+        number of new columns. Only the most recent result of a chain of
+        appends is extended in place; appending to any other spectrogram
+        copies it into a new buffer first.
+
+        Unlike join_many, which keeps the columns of the later spectrogram
+        where they overlap and uses the smallest time-delta of all, append
+        keeps the columns of this one and its time-delta, so earlier
+        results never change. Filled values are masked.
+
+        Parameters
+        ----------
+        other : LinearTimeSpectrogram
+            Spectrogram to append. Is resampled to the time-delta of this
+            one if necessary.
+        maxgap : float, int or None
+            Largest gap to allow in seconds. If None, allow gap of arbitrary
+            size.
+        fill : float or int
+            Value to fill missing values with. Can be
+            LinearTimeSpectrogram.JOIN_REPEAT to repeat the values for the
+            time just before the gap. Filled values are masked.
+        filename : str or None
+            If given and a new buffer is needed, memory map it to this file.
+            The mask, if any, is stored in filename + '.mask'. The file is
+            overwritten, so it may not be used by the buffer of another
+            spectrogram that is still alive.
+        """
+        if not np.array_equal(self.freq_axis, other.freq_axis):
+            raise ValueError("Frequency channels do not match.")
+        delt = self.t_delt
+        other = other.resample_time(delt)
+        o_init = (
+            SECONDS_PER_DAY * (
+                get_day(other.start) - get_day(self.start)
+            ).days + other.t_init
+        )
+        x = int((o_init - self.t_init) / delt)
+        if x < 0:
+            raise ValueError("Can only append spectrograms starting later.")
+        gap = x - self.shape[1]
+        if maxgap is not None and gap > maxgap / delt:
+            raise ValueError("Too large gap.")
+
+        dtype_ = max(self.dtype, other.dtype)
+        buf = getattr(self, '_buffer', None)
+        if (buf is None or not buf.is_tip(self.data) or
+                buf.data.dtype != dtype_):
+            buf = SpectrogramBuffer(self.data, self.time_axis, dtype_,
+                                    filename)
+
+        if gap > 0:
+            if fill is self.JOIN_REPEAT:
+                filler = np.repeat(
+                    ma.getdata(buf.data.data[:, -1:]), gap, 1
+                )
+            else:
+                filler = np.zeros((self.shape[0], gap), dtype=dtype_)
+                filler[:] = fill
+            last = buf.time.data[-1]
+            buf.extend(filler, last + delt * np.arange(1, gap + 1),
+                       np.ones(filler.shape, dtype=np.bool_))
+        skip = max(0, -gap)
+        buf.extend(other.data[:, skip:], other.time_axis[skip:] + delt * x)
+
+        params = {
+            'time_axis': buf.time.data,
+            'freq_axis': self.freq_axis,
+            'start': self.start,
+            'end': other.end,
+            't_delt': delt,
+            't_init': self.t_init,
+            't_label': self.t_label,
+            'f_label': self.f_label,
+            'content': self.content,
+            'instruments': _union([self.instruments, other.instruments]),
+        }
+        new = common_base([self, other])(buf.view(), **params)
+        new._buffer = buf
+        return new
+
     def time_to_x(self, time):
         """ Return x-coordinate in spectrogram that corresponds to the
         passed datetime value.
@@ -1067,7 +1553,7 @@ class LinearTimeSpectrogram(Spectrogram):
         time = parse_time(time)
         diff = time - self.start
         diff_s = SECONDS_PER_DAY * diff.days + diff.seconds
-        result = diff_s // self.t_delt
+        result = int(diff_s // self.t_delt)
         if 0 <= result <= self.shape[1]:
             return result
         raise ValueError("Out of range.")
@@ -1088,13 +1574,13 @@ class LinearTimeSpectrogram(Spectrogram):
         # XXX: Could do without resampling by using
         # sp.t_init below, not sure if good idea.
         specs = [sp.resample_time(delt) for sp in specs]
-        cut = [sp[:, (start - sp.t_init) / delt:] for sp in specs]
+        cut = [sp[:, int((start - sp.t_init) / delt):] for sp in specs]
 
         length = min(sp.shape[1] for sp in cut)
         return [sp[:, :length] for sp in cut]
 
     @classmethod
-    def combine_frequencies(cls, specs):
+    def combine_frequencies(cls, specs, align=False, max_lag=None):
         """ Return new spectrogram that contains frequencies from all the
         spectrograms in spec. Only returns time intersection of all of them.
 
@@ -1102,10 +1588,22 @@ class LinearTimeSpectrogram(Spectrogram):
         ----------
         spec : list
             List of spectrograms of which to combine the frequencies into one.
+        align : bool
+            If True, shift the times of all spectrograms after the first one
+            by their offset to it, as estimated with time_offset over their
+            frequency overlap, without copying data.
+        max_lag : float or None
+            Largest offset in seconds to correct if align is True.
         """
         if not specs:
             raise ValueError("Need at least one spectrogram.")
 
+        if align:
+            specs = [specs[0]] + [
+                sp.shift_time(specs[0].time_offset(sp, max_lag))
+                for sp in specs[1:]
+            ]
+
         specs = cls.intersect_time(specs)
 
         one = specs[0]
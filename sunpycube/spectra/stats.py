@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Per-channel and per-column statistics of spectrograms in one pass.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import numpy as np
+from numpy import ma
+
+__all__ = ['SpectrogramStats', 'compute_stats']
+
+
+class SpectrogramStats(object):
+    """
+    Summary statistics of a spectrogram's data.
+
+    Attributes
+    ----------
+    count, mean, var, min, max : np.ndarray
+        Number of (unmasked) values, mean, variance, minimum and maximum of
+        every frequency channel.
+    col_mean, col_var, col_min, col_max : np.ndarray
+        Mean, variance, minimum and maximum of every time column.
+    sample : np.ndarray
+        Evenly spaced columns of the data, used for percentiles.
+    """
+    def __init__(self, count, mean, var, vmin, vmax, col_mean, col_var,
+                 col_min, col_max, sample):
+        self.count = count
+        self.mean = mean
+        self.var = var
+        self.min = vmin
+        self.max = vmax
+        self.col_mean = col_mean
+        self.col_var = col_var
+        self.col_min = col_min
+        self.col_max = col_max
+        self.sample = sample
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def col_std(self):
+        return np.sqrt(self.col_var)
+
+    def global_min(self):
+        """ Minimum of all values. """
+        return self.min.min()
+
+    def global_max(self):
+        """ Maximum of all values. """
+        return self.max.max()
+
+    def percentile(self, q, axis=None):
+        """ Approximate percentile q of all values, or of every channel if
+        axis is 1, estimated from the sampled columns. """
+        if axis is None:
+            return np.percentile(ma.compressed(self.sample), q)
+        if axis != 1:
+            raise ValueError("Percentiles are only sampled per channel.")
+        if not ma.is_masked(self.sample):
+            return np.percentile(np.asarray(self.sample), q, axis=1)
+        return np.array([
+            np.percentile(row.compressed(), q) if row.count() else np.nan
+            for row in self.sample
+        ])
+
+
+def _combine(fun, a, b):
+    """ Return fun of a and b elementwise, ignoring masked elements of
+    either. """
+    if not (ma.is_masked(a) or ma.is_masked(b)):
+        return fun(ma.getdata(a), ma.getdata(b))
+    values = fun(ma.filled(a, ma.filled(b, 0)), ma.filled(b, ma.filled(a, 0)))
+    return ma.array(values, mask=ma.getmaskarray(a) & ma.getmaskarray(b))
+
+
+def compute_stats(data, chunk=2 ** 20, sample=2 ** 16):
+    """
+    Return SpectrogramStats of data, reading it once in blocks of columns
+    of about chunk values.
+
+    Channel means and variances of the blocks are combined with the
+    parallel form of Welford's algorithm, so they are numerically stable.
+    Every block holds whole columns, so column statistics are exact.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Array of shape (frequency channels, time columns), possibly memory
+        mapped or masked.
+    chunk : int
+        Number of values per block.
+    sample : int
+        Approximate number of values kept for percentiles.
+    """
+    nrows, ncols = data.shape
+    step = max(1, chunk // max(1, nrows))
+    stride = max(1, (nrows * ncols) // sample)
+    masked = isinstance(data, ma.MaskedArray)
+
+    count = np.zeros(nrows)
+    mean = np.zeros(nrows)
+    m2 = np.zeros(nrows)
+    vmin = vmax = None
+    col_mean = np.empty(ncols)
+    col_var = np.empty(ncols)
+    col_min = np.empty(ncols)
+    col_max = np.empty(ncols)
+    samples = []
+
+    for x in range(0, ncols, step):
+        block = data[:, x:x + step]
+        values = block.astype(np.float64)
+        if masked:
+            b_count = values.count(1).astype(float)
+        else:
+            b_count = np.zeros(nrows) + values.shape[1]
+        b_mean = ma.filled(values.mean(1), 0)
+        b_m2 = ma.filled(values.var(1), 0) * b_count
+
+        total = count + b_count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = b_mean - mean
+            frac = np.where(total > 0, b_count / total, 0)
+            mean = mean + delta * frac
+            m2 = m2 + b_m2 + delta * delta * count * frac
+        count = total
+
+        b_min, b_max = block.min(1), block.max(1)
+        vmin = b_min if vmin is None else _combine(np.minimum, vmin, b_min)
+        vmax = b_max if vmax is None else _combine(np.maximum, vmax, b_max)
+
+        col_mean[x:x + step] = ma.filled(values.mean(0), np.nan)
+        col_var[x:x + step] = ma.filled(values.var(0), np.nan)
+        col_min[x:x + step] = ma.filled(block.min(0), np.nan)
+        col_max[x:x + step] = ma.filled(block.max(0), np.nan)
+        # First sampled column of the block.
+        first = -x % stride
+        samples.append(block[:, first::stride])
+
+    concat = ma.concatenate if masked else np.concatenate
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = m2 / count
+    return SpectrogramStats(
+        count, mean, var, vmin, vmax, col_mean, col_var, col_min, col_max,
+        concat(samples, 1)
+    )
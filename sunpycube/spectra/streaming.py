@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=E1101,R0902
+"""
+Spectrograms of live data streams, kept in a fixed-size circular buffer.
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import datetime
+
+import numpy as np
+
+from sunpy.time import parse_time, get_day
+from sunpycube.spectra.spectrogram import (
+    LinearTimeSpectrogram, SECONDS_PER_DAY, _float_dtype
+)
+
+try:
+    from sunpy.spectra.sources.callisto import CallistoSpectrogram
+except ImportError:
+    CallistoSpectrogram = None
+
+__all__ = ['RingBufferSpectrogram', 'FileReplay']
+
+
+def _total_seconds(delta):
+    """ Return the timedelta delta in (fractional) seconds. """
+    return (SECONDS_PER_DAY * delta.days + delta.seconds +
+            delta.microseconds / 1e6)
+
+
+class RingBufferSpectrogram(object):
+    """
+    Spectrogram of the most recent columns of a stream of measurements.
+
+    The data is kept in a circular buffer of fixed size, so appending new
+    time columns only costs time proportional to the number of new columns.
+    Once the buffer is full the oldest columns are dropped and `start`,
+    `t_init` and `end` move forward accordingly. The time axis is linear,
+    so gaps in the stream are filled by repeating the last column (compare
+    LinearTimeSpectrogram.JOIN_REPEAT).
+
+    Attributes
+    ----------
+    freq_axis : np.ndarray
+        one-dimensional array containing the frequencies of the channels.
+    length : int
+        maximum number of time columns kept.
+    t_delt : float
+        difference between the items on the time axis in seconds.
+    maxgap : float or None
+        Largest gap in seconds that is filled. If None, allow gaps of
+        arbitrary size.
+    start : datetime
+        time of the oldest column in the buffer.
+    end : datetime
+        time of the newest column in the buffer.
+    t_init : float
+        offset of start from the start of its day.
+    """
+    def __init__(self, freq_axis, length, t_delt, dtype=np.dtype('float32'),
+                 maxgap=None, t_label="Time", f_label="Frequency", content="",
+                 instruments=None):
+        if length < 1:
+            raise ValueError("Buffer needs to hold at least one column.")
+        if instruments is None:
+            instruments = set()
+
+        self.freq_axis = np.asarray(freq_axis)
+        self.length = length
+        self.t_delt = t_delt
+        self.maxgap = maxgap
+
+        self.t_label = t_label
+        self.f_label = f_label
+        self.content = content
+        self.instruments = instruments
+
+        nfreq = len(self.freq_axis)
+        self._buffer = np.zeros((nfreq, length), dtype=dtype)
+        self._time_axis = np.arange(length) * t_delt
+        # Position the next column is written to and number of columns
+        # currently held.
+        self._head = 0
+        self._count = 0
+        # Columns appended since the first one, including those that
+        # have already been dropped.
+        self._total = 0
+        self._origin = None
+        self._origin_init = None
+
+        # Running sums used for the background. The per-channel sum is
+        # updated with every column entering and leaving the buffer, the
+        # per-column moments are computed once, when the column is written.
+        # The sum is recomputed every length columns, so rounding errors do
+        # not accumulate over long streams.
+        self._chan_sum = np.zeros(nfreq)
+        self._since_sum = 0
+        self._col_mean = np.zeros(length)
+        self._col_sqmean = np.zeros(length)
+        self._version = 0
+        self._bg_cache = None
+
+    @classmethod
+    def from_spectrogram(cls, spec, length, **kwargs):
+        """ Return empty buffer for continuing the passed spectrogram,
+        i.e. with its frequency channels, time resolution and labels.
+
+        Parameters
+        ----------
+        spec : LinearTimeSpectrogram
+            Spectrogram to take the axes and labels from.
+        length : int
+            maximum number of time columns kept.
+        """
+        params = {
+            'dtype': spec.dtype,
+            't_label': spec.t_label,
+            'f_label': spec.f_label,
+            'content': spec.content,
+            'instruments': set(spec.instruments),
+        }
+        params.update(kwargs)
+        return cls(spec.freq_axis, length, spec.t_delt, **params)
+
+    @property
+    def shape(self):
+        return (self._buffer.shape[0], self._count)
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    @property
+    def time_axis(self):
+        return self._time_axis[:self._count]
+
+    @property
+    def start(self):
+        if self._origin is None:
+            return None
+        return self._origin + datetime.timedelta(
+            seconds=(self._total - self._count) * self.t_delt)
+
+    @property
+    def end(self):
+        if self._origin is None:
+            return None
+        return self._origin + datetime.timedelta(
+            seconds=(self._total - 1) * self.t_delt)
+
+    @property
+    def t_init(self):
+        if self._origin is None:
+            return None
+        # Relative to the day of start, which moves past midnight.
+        return ((self._origin_init + (self._total - self._count) * self.t_delt)
+                % SECONDS_PER_DAY)
+
+    @property
+    def data(self):
+        """ Columns currently held, oldest first. Only copies if the
+        buffer has wrapped around. """
+        parts = [self._buffer[:, sl] for sl in self._slices(self._oldest,
+                                                            self._count)]
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts, 1)
+
+    @property
+    def _oldest(self):
+        return (self._head - self._count) % self.length
+
+    def _slices(self, begin, num):
+        """ Return buffer slices that cover num columns from position
+        begin onwards, wrapping around at the end of the buffer. """
+        begin %= self.length
+        first = min(num, self.length - begin)
+        slices = [slice(begin, begin + first)]
+        if first < num:
+            slices.append(slice(0, num - first))
+        return slices
+
+    def append(self, data, start=None):
+        """ Append time columns to the end of the buffer, dropping the
+        oldest ones if it is full.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            Array of shape (frequency channels, new columns) or a single
+            column.
+        start : None or datetime or parse_time compatible string
+            Time of the first new column. Has to be given for the first
+            block; if None, the new columns are assumed to directly follow
+            the existing ones. Columns that overlap already appended ones are
+            discarded, gaps are filled by repeating the last column.
+        """
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        if data.shape[0] != self._buffer.shape[0]:
+            raise ValueError("Frequency channels do not match.")
+
+        if start is not None:
+            start = parse_time(start)
+            if self._origin is None:
+                self._origin = start
+                self._origin_init = (start - get_day(start)).seconds
+            else:
+                x = int(round(
+                    _total_seconds(start - self._origin) / self.t_delt
+                ))
+                diff = x - self._total
+                if diff < 0:
+                    data = data[:, -diff:]
+                elif diff > 0:
+                    if (self.maxgap is not None and
+                            diff > self.maxgap / self.t_delt):
+                        raise ValueError("Too large gap.")
+                    last = self._buffer[:, (self._head - 1) % self.length]
+                    self._write(np.repeat(last[:, np.newaxis], diff, 1))
+        elif self._origin is None:
+            raise ValueError("Start time of the first block must be given.")
+
+        if data.shape[1]:
+            self._write(data)
+        return self
+
+    def _write(self, block):
+        """ Implementation detail. """
+        num = block.shape[1]
+        self._total += num
+        if num > self.length:
+            block = block[:, -self.length:]
+            num = self.length
+
+        # Remove the columns about to be overwritten from the running sums.
+        dropped = max(0, self._count + num - self.length)
+        for sl in self._slices(self._oldest, dropped):
+            self._chan_sum -= self._buffer[:, sl].sum(1, dtype=np.float64)
+
+        offset = 0
+        for sl in self._slices(self._head, num):
+            width = sl.stop - sl.start
+            self._buffer[:, sl] = block[:, offset:offset + width]
+            new = self._buffer[:, sl].astype(np.float64)
+            self._chan_sum += new.sum(1)
+            self._col_mean[sl] = new.mean(0)
+            self._col_sqmean[sl] = (new * new).mean(0)
+            offset += width
+
+        self._head = (self._head + num) % self.length
+        self._count = min(self._count + num, self.length)
+        self._version += 1
+        self._since_sum += num
+        if self._since_sum >= self.length:
+            self._chan_sum = sum(
+                self._buffer[:, sl].sum(1, dtype=np.float64)
+                for sl in self._slices(self._oldest, self._count)
+            )
+            self._since_sum = 0
+
+    def _positions(self):
+        """ Buffer positions of the columns held, oldest first. """
+        return (self._oldest + np.arange(self._count)) % self.length
+
+    def auto_find_background(self, amount=0.05):
+        """ Return indices of the columns with the lowest standard deviation
+        after subtracting the average of every frequency channel. Equivalent
+        to Spectrogram.auto_find_background of the current contents.
+
+        Parameters
+        ----------
+        amount : float
+            Fraction of the columns to consider.
+        """
+        if not self._count:
+            raise ValueError("Buffer is empty.")
+        pos = self._positions()
+        avg = self._chan_sum / self._count
+        # var(x - avg) = E[x^2] - 2E[x * avg] + E[avg^2] - (E[x] - E[avg])^2
+        # where only the cross term depends on the whole buffer, so it is
+        # the only one computed here; a single matrix-vector product.
+        cross = np.dot(avg, self._buffer)[pos] / len(avg)
+        var = (
+            self._col_sqmean[pos] - 2 * cross + np.mean(avg * avg) -
+            (self._col_mean[pos] - np.mean(avg)) ** 2
+        )
+        cand = np.argsort(var, kind='mergesort')
+        return cand[:max(1, int(amount * len(cand)))]
+
+    def auto_const_bg(self, amount=0.05):
+        """ Automatically determine background of the current contents.
+        The result is cached until new columns are appended.
+
+        Parameters
+        ----------
+        amount : float
+            Fraction of the columns that is averaged for the background.
+        """
+        key = (self._version, amount)
+        if self._bg_cache is not None and self._bg_cache[0] == key:
+            return self._bg_cache[1]
+        realcand = self._positions()[self.auto_find_background(amount)]
+        bg = np.average(self._buffer[:, realcand], 1)
+        bg = bg.reshape(self._buffer.shape[0], 1)
+        self._bg_cache = (key, bg)
+        return bg
+
+    def subtract_bg(self, amount=0.05):
+        """ Return snapshot of the current contents with the constant
+        background subtracted. """
+        spec = self.snapshot()
+        # The snapshot is a copy already, so float data can be changed in
+        # place.
+        data = spec.data
+        if data.dtype != _float_dtype(data.dtype):
+            data = data.astype(_float_dtype(data.dtype))
+        data -= self.auto_const_bg(amount)
+        return spec._with_data(data)
+
+    def snapshot(self):
+        """ Return LinearTimeSpectrogram holding a copy of the current
+        contents. """
+        if not self._count:
+            raise ValueError("Buffer is empty.")
+        return LinearTimeSpectrogram(
+            np.array(self.data), self.time_axis.copy(), self.freq_axis.copy(),
+            self.start, self.end, self.t_init, self.t_delt, self.t_label,
+            self.f_label, self.content, set(self.instruments)
+        )
+
+
+class FileReplay(object):
+    """
+    Replay recorded spectrograms as a stream of column blocks, as a stand-in
+    for a live receiver.
+
+    Attributes
+    ----------
+    sources : list
+        Filenames or LinearTimeSpectrograms, in the order they are replayed.
+    block : int
+        Number of columns per yielded block.
+    reader : function
+        Function that is called with a filename and returns a
+        LinearTimeSpectrogram. Defaults to CallistoSpectrogram.read.
+    """
+    def __init__(self, sources, block=1, reader=None):
+        if reader is None and CallistoSpectrogram is not None:
+            reader = CallistoSpectrogram.read
+        self.sources = sources
+        self.block = block
+        self.reader = reader
+
+    def _load(self, source):
+        """ Implementation detail. """
+        if isinstance(source, LinearTimeSpectrogram):
+            return source
+        if self.reader is None:
+            raise ValueError("Need a reader to replay files.")
+        return self.reader(source)
+
+    def __iter__(self):
+        """ Yield (start, data) tuples of consecutive column blocks. """
+        for source in self.sources:
+            spec = self._load(source)
+            for x in range(0, spec.shape[1], self.block):
+                start = spec.start + datetime.timedelta(
+                    seconds=float(spec.time_axis[x]))
+                yield start, np.asarray(spec.data[:, x:x + self.block])
+
+    def feed(self, ring):
+        """ Append the stream block by block to ring, yielding it after
+        every block.
+
+        Parameters
+        ----------
+        ring : RingBufferSpectrogram
+            Buffer to append to.
+        """
+        for start, data in self:
+            ring.append(data, start)
+            yield ring
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+from numpy import ma
+from scipy import ndimage
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.align import estimate_time_offset
+
+
+def mk_spec(image, freqs, start=datetime(2010, 10, 10), t_delt=0.5):
+    time_axis = np.arange(image.shape[1]) * t_delt
+    return LinearTimeSpectrogram(
+        image, time_axis, freqs, start,
+        start + timedelta(seconds=time_axis[-1]),
+        start.hour * 3600 + start.minute * 60 + start.second, t_delt
+    )
+
+
+def mk_signal(nfreq, ncols, seed=1):
+    rnd = np.random.RandomState(seed)
+    return ndimage.gaussian_filter1d(rnd.rand(nfreq, ncols), 3, axis=1)
+
+
+def test_estimate_offset():
+    signal = mk_signal(30, 600)
+    freqs = np.linspace(100, 71, 30)
+    spec = mk_spec(signal[:20, 40:540], freqs[:20])
+    # Same features, but the clock of other is 6 columns (3 s) late and it
+    # covers different channels.
+    other = mk_spec(signal[10:, 34:534], freqs[10:])
+    assert np.allclose(estimate_time_offset(spec, other), -3, atol=0.05)
+    assert np.allclose(spec.time_offset(other), -3, atol=0.05)
+    # Other way round.
+    assert np.allclose(other.time_offset(spec), 3, atol=0.05)
+
+
+def test_estimate_offset_start():
+    signal = mk_signal(10, 600)
+    freqs = np.linspace(100, 91, 10)
+    spec = mk_spec(signal[:, :400], freqs)
+    # Starts 100 s later according to its timestamps, but is really 104 s.
+    other = mk_spec(signal[:, 208:600], freqs,
+                    start=datetime(2010, 10, 10, 0, 1, 40))
+    assert np.allclose(spec.time_offset(other), 4, atol=0.05)
+
+
+def test_estimate_offset_delt():
+    signal = mk_signal(10, 1200)
+    freqs = np.linspace(100, 91, 10)
+    spec = mk_spec(signal[:, 100:1100], freqs, t_delt=0.25)
+    other = mk_spec(signal[:, 92:1092:2], freqs, t_delt=0.5)
+    assert np.allclose(spec.time_offset(other), -2, atol=0.1)
+
+
+def test_estimate_offset_masked():
+    signal = mk_signal(10, 600)
+    freqs = np.linspace(100, 91, 10)
+    data = ma.array(signal[:, 40:540])
+    data[3] = ma.masked
+    spec = mk_spec(data, freqs)
+    other = mk_spec(signal[:, 44:544], freqs)
+    assert np.allclose(spec.time_offset(other), 2, atol=0.05)
+
+
+def test_estimate_offset_max_lag():
+    signal = mk_signal(10, 600)
+    freqs = np.linspace(100, 91, 10)
+    spec = mk_spec(signal[:, 40:540], freqs)
+    other = mk_spec(signal[:, 20:520], freqs)
+    assert np.allclose(spec.time_offset(other), -10, atol=0.05)
+    assert abs(spec.time_offset(other, max_lag=5)) <= 5
+
+
+def test_estimate_offset_no_overlap():
+    freqs = np.linspace(100, 91, 10)
+    spec = mk_spec(np.random.rand(10, 20), freqs)
+    other = mk_spec(np.random.rand(10, 20), freqs,
+                    start=datetime(2010, 10, 10, 1))
+    with pytest.raises(ValueError):
+        spec.time_offset(other)
+
+
+def test_shift_time():
+    freqs = np.linspace(100, 91, 10)
+    spec = mk_spec(np.random.rand(10, 20), freqs)
+    shifted = spec.shift_time(-2.5)
+    assert shifted.data is spec.data
+    assert shifted.start == spec.start - timedelta(seconds=2.5)
+    assert shifted.end == spec.end - timedelta(seconds=2.5)
+    assert shifted.t_init == spec.t_init - 2.5
+
+
+def test_join_many_align():
+    # Columns every 0.125 s, of which both take every fourth.
+    signal = mk_signal(10, 3200)
+    freqs = np.linspace(100, 91, 10)
+    spec = mk_spec(signal[:, 0:2000:4], freqs)
+    # Really starts 150.25 s after spec, but is stamped 2.25 s early.
+    other = mk_spec(signal[:, 1202:3202:4], freqs,
+                    start=datetime(2010, 10, 10, 0, 2, 28))
+    assert np.allclose(spec.time_offset(other), 2.25, atol=0.05)
+
+    joined = LinearTimeSpectrogram.join_many([spec, other], align=True)
+    assert joined.shape == (10, 800)
+    assert np.array_equal(joined.data[:, :300], spec.data[:, :300])
+    assert np.array_equal(joined.data[:, 300:], other.data)
+    assert np.allclose(joined.time_axis[300], 150)
+    # Without aligning, other is placed 2.25 s too early.
+    assert LinearTimeSpectrogram.join_many([spec, other]).shape == (10, 796)
+
+
+def test_combine_frequencies_align():
+    signal = mk_signal(30, 2100)
+    freqs = np.linspace(100, 71, 30)
+    spec = mk_spec(signal[:20, 0:2000:4], freqs[:20])
+    # Really starts 2.25 s later than its time stamps.
+    other = mk_spec(signal[10:, 18:2018:4], freqs[10:])
+    assert np.allclose(spec.time_offset(other), 2.25, atol=0.05)
+
+    combined = LinearTimeSpectrogram.combine_frequencies(
+        [spec, other], align=True)
+    assert combined.shape == (40, 496)
+    assert combined.start == spec.start + timedelta(seconds=2)
+    # The first column of other is half a column after the fifth of spec.
+    assert np.array_equal(combined.data[combined.freq_axis > 90],
+                          spec.data[spec.freq_axis > 90, 4:])
+    assert np.array_equal(combined.data[combined.freq_axis < 80],
+                          other.data[other.freq_axis < 80, :496])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime
+
+import pytest
+import numpy as np
+from numpy import ma
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.background import (
+    running_percentile, expand_background
+)
+
+
+def mk_spec(image):
+    return LinearTimeSpectrogram(
+        image, np.linspace(0, image.shape[1] - 1, image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 1), 0, 1
+    )
+
+
+def test_running_percentile_exact():
+    data = np.random.rand(4, 50)
+    centers, values = running_percentile(data, 7, step=1)
+    assert np.array_equal(centers, np.arange(50))
+    assert np.allclose(values[:, 10], np.median(data[:, 7:14], 1))
+    assert np.allclose(values[:, 0], np.median(data[:, :4], 1))
+    assert np.allclose(values[:, 49], np.median(data[:, 46:], 1))
+    assert np.allclose(expand_background(centers, values, 5, 9),
+                       values[:, 5:9])
+
+
+def test_running_percentile_masked():
+    data = ma.array(np.arange(20.).reshape(2, 10))
+    data[0, :5] = ma.masked
+    centers, values = running_percentile(data, 10, step=10)
+    # The first window only covers masked values of the first channel.
+    assert np.isnan(values[0, 0])
+    assert values[1, 0] == np.median(np.arange(10., 15.))
+    assert values[0, 1] == np.median(np.arange(5., 10.))
+    assert values[1, 1] == np.median(np.arange(14., 20.))
+    # The gap takes the nearest finite value rather than spreading NaN.
+    assert np.array_equal(expand_background(centers, values, 0, 10)[0],
+                          [values[0, 1]] * 10)
+
+
+def test_running_percentile_gap():
+    data = ma.array(np.ones((2, 100)))
+    data[0, 40:60] = ma.masked
+    centers, values = running_percentile(data, 10, step=5)
+    bg = expand_background(centers, values, 0, 100)
+    assert np.isnan(values[0]).any()
+    assert np.array_equal(bg, np.ones((2, 100)))
+
+
+def test_running_percentile_empty():
+    with pytest.raises(ValueError):
+        running_percentile(np.zeros((3, 0)), 5)
+
+
+def test_subtract_running_bg():
+    # Background drifting with time plus sparse bursts.
+    drift = np.linspace(0, 50, 2000)
+    image = np.arange(30.).reshape(30, 1) + drift
+    image[:, ::37] += 100
+    spec = mk_spec(image)
+
+    bg = spec.auto_running_bg(200)
+    assert bg.shape == image.shape
+    result = spec.subtract_running_bg(200)
+    assert result.dtype == image.dtype
+    quiet = [x for x in range(200, 1800) if x % 37]
+    assert np.allclose(result.data[:, quiet], 0, atol=0.1)
+    assert np.allclose(result.data[:, 370], 100, atol=0.1)
+    assert np.allclose(result.data, image - bg)
+
+    with pytest.raises(ValueError):
+        spec.subtract_running_bg(0)
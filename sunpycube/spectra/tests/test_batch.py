@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import os
+from datetime import datetime
+
+import pytest
+import numpy as np
+
+from sunpycube.spectra.batch import process_many, ArrayWriter
+from sunpycube.spectra.sources.generic import FITSSpectrogram
+
+
+def mk_spec(image):
+    return FITSSpectrogram(
+        image, np.arange(image.shape[1]),
+        np.linspace(80, 45, image.shape[0]),
+        datetime(2011, 9, 22, 10, 30), datetime(2011, 9, 22, 10, 31), 37800, 1
+    )
+
+
+def double(spec, factor=2):
+    return spec._with_data(spec.data * factor)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_process_many(tmpdir, processes):
+    images = []
+    sources = []
+    for n in range(4):
+        image = np.random.rand(10, 60)
+        name = os.path.join(str(tmpdir), "spec{0}.fits".format(n))
+        mk_spec(image).write(name)
+        images.append(image)
+        sources.append(name)
+    sources.insert(2, os.path.join(str(tmpdir), "missing.fits"))
+
+    operations = ['subtract_bg', (double, {'factor': 3}),
+                  ('clip_values', (0, 1))]
+    results = list(process_many(sources, operations,
+                                ArrayWriter(str(tmpdir)),
+                                processes=processes))
+
+    assert [r.source for r in results] == sources
+    assert [r.ok for r in results] == [True, True, False, True, True]
+    assert results[2].error.startswith("read failed")
+
+    for result, image in zip(results[:2] + results[3:], images):
+        spec = mk_spec(image)
+        expected = double(spec.subtract_bg(), 3).clip_values(0, 1).data
+        assert np.allclose(np.load(result.value), expected)
+        assert [stage for stage, _ in result.timings] == [
+            'read', 'subtract_bg', 'double', 'clip_values', 'output'
+        ]
+
+
+def test_failing_operation():
+    spec = mk_spec(np.random.rand(10, 60))
+    result, = process_many([spec], [('clip_freq', (1, 2, 3))], processes=1)
+    assert not result.ok
+    assert result.error.startswith("clip_freq failed")
+    assert [stage for stage, _ in result.timings] == ['read']
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import numpy as np
+from numpy import ma
+
+from sunpycube.spectra.buffer import ColumnBuffer, SpectrogramBuffer
+
+
+def test_column_buffer_grows():
+    buf = ColumnBuffer((3, 0), np.float32)
+    capacities = set()
+    for n in range(100):
+        buf.extend(np.zeros((3, 7)) + n)
+        capacities.add(buf.capacity)
+    assert buf.data.shape == (3, 700)
+    assert buf.data.dtype == np.float32
+    assert np.array_equal(buf.data[0, ::7], np.arange(100))
+    # Capacity is doubled, so it only changed a few times.
+    assert len(capacities) <= 5
+
+
+def test_column_buffer_memmap(tmpdir):
+    filename = str(tmpdir.join('buf.dat'))
+    data = np.random.rand(4, 100)
+    buf = ColumnBuffer.from_array(data[:, :10], filename=filename)
+    old = buf.data
+    for x in range(10, 100, 10):
+        buf.extend(data[:, x:x + 10])
+    assert isinstance(buf.data, np.memmap)
+    assert np.array_equal(buf.data, data)
+    # Views of earlier sizes stay valid.
+    assert np.array_equal(old, data[:, :10])
+
+
+def test_spectrogram_buffer_mask():
+    buf = SpectrogramBuffer(np.ones((2, 3)), np.arange(3), np.float64)
+    assert not isinstance(buf.view(), ma.MaskedArray)
+    buf.extend(np.zeros((2, 2)), [3, 4], np.ones((2, 2), dtype=bool))
+    buf.extend(ma.array(np.zeros((2, 1)), mask=[[True], [False]]), [5])
+    view = buf.view()
+    assert np.array_equal(
+        view.mask, [[0, 0, 0, 1, 1, 1], [0, 0, 0, 1, 1, 0]])
+    assert np.array_equal(buf.time.data, np.arange(6))
+    assert buf.is_tip(view)
+    assert not buf.is_tip(view.data)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+
+
+def mk_spec(image):
+    return LinearTimeSpectrogram(
+        image, np.linspace(0, image.shape[1] - 1, image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 1), 0, 1
+    )
+
+
+def mk_image():
+    np.random.seed(1)
+    image = np.random.normal(0, 1, (100, 1000))
+    # Drifting burst, one channel (frequency unit) down every two seconds.
+    for x in range(300, 400):
+        image[(x - 300) // 2:(x - 300) // 2 + 5, x] += 20
+    # Short burst of constant frequency.
+    image[70:80, 700:720] += 20
+    return image
+
+
+def test_find_bursts():
+    spec = mk_spec(mk_image())
+    found = spec.find_bursts()
+    assert len(found) == 2
+    drifting, other = found
+
+    assert drifting.start == datetime(2010, 10, 10) + timedelta(seconds=300)
+    assert drifting.end == datetime(2010, 10, 10) + timedelta(seconds=399)
+    assert drifting.fmax == 99
+    assert drifting.fmin == 99 - 53
+    assert abs(drifting.drift + 0.5) < 0.05
+
+    assert other.x_range == slice(700, 720)
+    assert (other.fmin, other.fmax) == (20, 29)
+    assert abs(other.drift) < 0.05
+
+
+def test_find_bursts_chunked():
+    spec = mk_spec(mk_image())
+    whole = spec.find_bursts(threshold=10)
+    chunked = spec.find_bursts(threshold=10, chunk=100 * 64, overlap=150)
+    assert [b.x_range for b in chunked] == [b.x_range for b in whole]
+    assert [b.size for b in chunked] == [b.size for b in whole]
+
+
+def test_find_bursts_longer_than_overlap():
+    spec = mk_spec(mk_image())
+    whole = spec.find_bursts(threshold=10)
+    # The drifting burst spans three blocks and reaches past their overlap.
+    chunked = spec.find_bursts(threshold=10, chunk=100 * 40, overlap=10)
+    assert [b.x_range for b in chunked] == [b.x_range for b in whole]
+    assert [b.size for b in chunked] == [b.size for b in whole]
+    assert [b.end for b in chunked] == [b.end for b in whole]
+    assert [b.drift for b in chunked] == [b.drift for b in whole]
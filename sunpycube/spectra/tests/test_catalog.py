@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+
+from sunpycube.spectra.catalog import SpectrogramCatalog
+from sunpycube.spectra.sources.generic import FITSSpectrogram
+
+START = datetime(2011, 9, 22, 10)
+
+
+@pytest.fixture
+def archive(tmpdir):
+    images = []
+    for n in range(6):
+        image = np.random.randint(0, 255, (20, 60)).astype(np.uint8)
+        start = START + timedelta(minutes=n)
+        freq_axis = np.linspace(80, 45, 20) + (100 if n == 2 else 0)
+        spec = FITSSpectrogram(
+            image, np.arange(60), freq_axis, start,
+            start + timedelta(seconds=59), 36000 + 60 * n, 1,
+            instruments=set(["BIR" if n % 2 else "ALASKA"])
+        )
+        spec.write(os.path.join(str(tmpdir), "spec{0}.fits".format(n)))
+        images.append(image)
+    return str(tmpdir), images
+
+
+def test_scan_query(archive):
+    directory, _ = archive
+    cat = SpectrogramCatalog.scan(directory)
+    assert len(cat) == 6
+
+    found = cat.query(START + timedelta(seconds=90),
+                      START + timedelta(seconds=150))
+    assert [os.path.basename(f) for f in found] == [
+        "spec1.fits", "spec2.fits"
+    ]
+    assert [os.path.basename(f) for f in cat.query(fmin=150)] == [
+        "spec2.fits"
+    ]
+    assert len(cat.query(instrument="BIR")) == 3
+    assert cat.query(end=START) == []
+
+    entry = cat.entry(found[0])
+    assert entry['start'] == START + timedelta(minutes=1)
+    assert entry['instruments'] == set(["BIR"])
+    assert (entry['nfreq'], entry['ncols']) == (20, 60)
+    with pytest.raises(ValueError):
+        cat.entry("missing.fits")
+
+
+def test_query_long_file():
+    # One file covering all others, which are short and consecutive.
+    starts = np.concatenate([[0], np.arange(100) * 10.])
+    ends = np.concatenate([[5000], np.arange(100) * 10. + 9])
+    n = len(starts)
+    cat = SpectrogramCatalog({
+        'filename': np.array(['long'] + ['short{0}'.format(x)
+                                         for x in range(100)]),
+        'start': starts, 'end': ends, 'fmin': np.zeros(n),
+        'fmax': np.ones(n), 'instruments': np.array([''] * n),
+        'nfreq': np.ones(n, dtype=int), 'ncols': np.ones(n, dtype=int),
+        't_delt': np.ones(n),
+    })
+    epoch = datetime(1970, 1, 1)
+    found = cat.query(epoch + timedelta(seconds=505),
+                      epoch + timedelta(seconds=520))
+    assert found == ['long', 'short50', 'short51']
+    assert cat.query(epoch + timedelta(seconds=4000)) == ['long']
+    assert cat.entry('short3')['end'] == epoch + timedelta(seconds=39)
+
+
+def test_save_load(archive):
+    directory, _ = archive
+    cat = SpectrogramCatalog.scan(directory)
+    filename = os.path.join(directory, "index.npz")
+    cat.save(filename)
+    loaded = SpectrogramCatalog.load(filename)
+    assert loaded.query() == cat.query()
+    assert np.array_equal(loaded.columns['end'], cat.columns['end'])
+
+
+def test_in_interval(archive):
+    directory, images = archive
+    cat = SpectrogramCatalog.scan(directory)
+    spec = cat.in_interval(START + timedelta(seconds=200),
+                           START + timedelta(seconds=300), fmax=100)
+    assert np.array_equal(
+        spec.data, np.concatenate(images[3:5], 1)[:, 20:120]
+    )
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+from numpy import ma
+
+from sunpycube.spectra.spectrogram import Spectrogram, LinearTimeSpectrogram
+from sunpycube.spectra.sources import chunked
+
+
+def mk_spec(image):
+    return LinearTimeSpectrogram(
+        image, 0.25 * np.arange(image.shape[1]),
+        np.linspace(80, 45, image.shape[0]),
+        datetime(2011, 9, 22, 10, 30, 0, 250000),
+        datetime(2011, 9, 22, 10, 31), 37800.25, 0.25,
+        content="Test", instruments=set(["BIR", "ALASKA"])
+    )
+
+
+def test_roundtrip(tmpdir):
+    image = np.random.randint(0, 255, (40, 250)).astype(np.uint8)
+    spec = mk_spec(image)
+    filename = os.path.join(str(tmpdir), "spec.zip")
+    chunked.write(spec, filename, chunk=32)
+
+    result = chunked.read(filename)
+    assert type(result) is LinearTimeSpectrogram
+    assert np.array_equal(result.data, image)
+    assert result.dtype == image.dtype
+    params = result._get_params()
+    for name, value in spec._get_params().items():
+        if isinstance(value, np.ndarray):
+            assert np.array_equal(params[name], value)
+        else:
+            assert params[name] == value
+
+
+def test_random_access(tmpdir):
+    image = np.random.rand(10, 250)
+    spec = mk_spec(image)
+    filename = os.path.join(str(tmpdir), "spec.zip")
+    chunked.write(spec, filename, chunk=32)
+
+    lazy = chunked.read(filename, lazy=True)
+    assert isinstance(lazy.data, chunked.ChunkedArray)
+    assert lazy.shape == (10, 250)
+    assert np.array_equal(lazy[2:5, 40:100].data, image[2:5, 40:100])
+    assert np.array_equal(lazy.data[3, ::-7], image[3, ::-7])
+    assert np.array_equal(lazy.data[:, 33], image[:, 33])
+
+    part = lazy.in_interval(spec.start + timedelta(seconds=10),
+                            spec.start + timedelta(seconds=20))
+    expected = spec.in_interval(spec.start + timedelta(seconds=10),
+                                spec.start + timedelta(seconds=20))
+    assert np.array_equal(part.data, expected.data)
+    assert part.start == expected.start
+    assert part.t_init == expected.t_init
+
+    with lazy.data as data:
+        assert not data.closed
+    assert lazy.data.closed
+    with pytest.raises(ValueError):
+        lazy.data[:, 0]
+    # Sliced data does not need the file.
+    assert np.array_equal(part.data, expected.data)
+
+
+def test_masked_and_nonlinear(tmpdir):
+    image = ma.array(np.random.rand(5, 20), mask=np.zeros((5, 20)))
+    image[:, 3:6] = ma.masked
+    spec = Spectrogram(image, np.arange(20), np.arange(5),
+                       datetime(2011, 9, 22), datetime(2011, 9, 22, 0, 1))
+    filename = os.path.join(str(tmpdir), "spec.zip")
+    chunked.write(spec, filename, chunk=4)
+    result = chunked.read(filename)
+    assert type(result) is Spectrogram
+    assert np.array_equal(result.data.mask, image.mask)
+    assert np.array_equal(result.data.filled(0), image.filled(0))
+
+
+def test_unsupported_property(tmpdir):
+    spec = mk_spec(np.zeros((2, 2)))
+    spec.content = object()
+    with pytest.raises(TypeError):
+        chunked.write(spec, os.path.join(str(tmpdir), "spec.zip"))
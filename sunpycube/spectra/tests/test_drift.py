@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.drift import drift_transform
+
+
+def mk_spec(image, t_delt=0.25):
+    return LinearTimeSpectrogram(
+        image, t_delt * np.arange(image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]) * 2,
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 1), 0, t_delt
+    )
+
+
+def test_drift_transform_finds_burst():
+    np.random.seed(2)
+    image = np.random.normal(0, 1, (50, 400))
+    # Burst drifting down 2 frequency units per column, i.e. -8 per second,
+    # passing the highest channel at column 100.
+    for y in range(50):
+        image[y, 100 + y] += 30
+    spec = mk_spec(image)
+
+    rates = np.linspace(-16, -2, 57)
+    dmap = spec.drift_transform(rates)
+    assert dmap.shape == (57, 400)
+    rate, time = dmap.best()
+    assert rate == pytest.approx(-8)
+    assert time == datetime(2010, 10, 10) + timedelta(seconds=25)
+    assert dmap.data.max() == pytest.approx(30, abs=1)
+
+
+def test_drift_transform_chunked():
+    image = np.random.rand(10, 64)
+    rates = [-3, -1.5, 1, 2.5]
+    whole = drift_transform(image, np.arange(10), 1, rates)
+    chunked = drift_transform(image, np.arange(10), 1, rates, chunk=100)
+    assert np.allclose(whole, chunked)
+    # With a rate of 1 channel y is delayed by y columns, an exact shift.
+    channels = np.arange(10)
+    assert np.allclose(whole[2, 20], image[channels, 20 + channels].mean())
+
+    with pytest.raises(ValueError):
+        drift_transform(image, np.arange(10), 1, [0, 1])
+    with pytest.raises(ValueError):
+        drift_transform(image, np.arange(10), 1, [np.inf])
+
+
+def test_drift_transform_slow_rate():
+    image = np.random.rand(10, 64)
+    channels = np.arange(10)
+    # Channels other than the first are delayed beyond the data.
+    dmap = drift_transform(image, channels, 1, [1e-12, 1e-3])
+    assert dmap.shape == (2, 64)
+    assert np.allclose(dmap, image[0] / 10)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import os
+from datetime import datetime
+
+import numpy as np
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.sources.generic import FITSSpectrogram
+
+
+def mk_spec(image, start, t_init):
+    return FITSSpectrogram(
+        image, 0.25 * np.arange(image.shape[1]),
+        np.linspace(80, 45, image.shape[0]),
+        start, start.replace(minute=start.minute + 1), t_init, 0.25,
+        content="Test", instruments=set(["BIR"])
+    )
+
+
+def test_roundtrip(tmpdir):
+    image = np.random.randint(0, 255, (40, 240)).astype(np.uint8)
+    spec = mk_spec(image, datetime(2011, 9, 22, 10, 30), 37800)
+    filename = os.path.join(str(tmpdir), "spec.fits")
+    spec.write(filename)
+
+    lazy = FITSSpectrogram.read(filename, lazy=True)
+    assert not lazy.loaded
+    assert lazy.shape == (40, 240)
+    assert lazy.dtype == np.dtype('uint8')
+    assert lazy.start == spec.start
+    assert lazy.end == spec.end
+    assert lazy.t_delt == 0.25
+    assert lazy.t_init == 37800
+    assert lazy.content == "Test"
+    assert lazy.instruments == set(["BIR"])
+    assert np.array_equal(lazy.freq_axis, spec.freq_axis)
+    assert np.array_equal(lazy.time_axis, spec.time_axis)
+    assert lazy.resample_time(0.25) is lazy
+    assert not lazy.loaded
+
+    assert np.array_equal(lazy.data, image)
+    assert lazy.loaded
+    assert np.array_equal(FITSSpectrogram.read(filename).data, image)
+
+
+def test_lazy_join(tmpdir):
+    names = []
+    images = []
+    for n in range(3):
+        image = np.random.randint(0, 255, (40, 240)).astype(np.uint8)
+        spec = mk_spec(image, datetime(2011, 9, 22, 10, 30 + n),
+                       37800 + 60 * n)
+        names.append(os.path.join(str(tmpdir), "spec{0}.fits".format(n)))
+        spec.write(names[-1])
+        images.append(image)
+
+    specs = [FITSSpectrogram.read(name, lazy=True) for name in names]
+    joined = LinearTimeSpectrogram.join_many(
+        specs, mk_arr=LinearTimeSpectrogram.memmap(
+            os.path.join(str(tmpdir), "joined"))
+    )
+    assert joined.shape == (40, 720)
+    assert np.array_equal(joined.data, np.concatenate(images, 1))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime
+
+import pytest
+import numpy as np
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.lazy import LazySpectrogram
+
+
+def mk_spec(image):
+    return LinearTimeSpectrogram(
+        image, np.linspace(0, image.shape[1] - 1, image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 0, 15), 0, 1
+    )
+
+
+def test_pipeline_matches_eager():
+    image = np.random.randint(0, 255, (50, 300)).astype(np.uint8)
+    spec = mk_spec(image)
+    lazy = spec.lazy(chunk=500).subtract_bg().clip_values(0, 100).rescale()
+    assert isinstance(lazy, LazySpectrogram)
+    eager = spec.subtract_bg().clip_values(0, 100).rescale()
+
+    assert lazy.dtype == eager.dtype
+    assert np.allclose(lazy.data, eager.data)
+    result = lazy.compute()
+    assert isinstance(result, LinearTimeSpectrogram)
+    assert result.t_delt == spec.t_delt
+
+
+def test_slicing_keeps_statistics():
+    image = np.random.rand(20, 100)
+    spec = mk_spec(image)
+    lazy = spec.lazy(chunk=64).rescale(0, 10)[5:15, 20:60]
+    eager = spec.rescale(0, 10)[5:15, 20:60]
+    assert lazy.shape == (10, 40)
+    assert np.allclose(lazy.data, eager.data)
+    assert np.array_equal(lazy.freq_axis, eager.freq_axis)
+    assert lazy.start == eager.start
+
+
+def test_clip_freq_and_bg():
+    image = np.random.rand(20, 100)
+    spec = mk_spec(image)
+    lazy = spec.lazy(chunk=64).subtract_bg().clip_freq(5, 12)
+    eager = spec.subtract_bg().clip_freq(5, 12)
+    assert np.allclose(lazy.data, eager.data)
+
+
+def test_rescale_constant():
+    spec = mk_spec(np.ones((5, 10)))
+    with pytest.raises(ValueError):
+        spec.lazy().rescale(0, 0)
+    with pytest.raises(ValueError):
+        spec.lazy().rescale().data
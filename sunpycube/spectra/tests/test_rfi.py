@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime
+
+import pytest
+import numpy as np
+from numpy import ma
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.rfi import (
+    RFIMask, spectral_kurtosis, flag_channels
+)
+
+
+def mk_spec(image):
+    return LinearTimeSpectrogram(
+        image, np.linspace(0, image.shape[1] - 1, image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 1), 0, 1
+    )
+
+
+def mk_power(shape):
+    np.random.seed(0)
+    return np.random.exponential(10, shape)
+
+
+def test_spectral_kurtosis():
+    power = mk_power((20, 640))
+    sk = spectral_kurtosis(power, 64, chunk=1000)
+    assert sk.shape == (20, 10)
+    assert abs(sk.mean() - 1) < 0.1
+    # Continuous wave interference has constant power.
+    power[3, 128:192] = 50
+    assert spectral_kurtosis(power, 64)[3, 2] == pytest.approx(0, abs=1e-9)
+
+
+def test_spectral_kurtosis_short_block():
+    power = mk_power((5, 150))
+    sk = spectral_kurtosis(power, 64, chunk=700)
+    assert sk.shape == (5, 3)
+    assert np.allclose(sk[:, :2], spectral_kurtosis(power[:, :128], 64))
+    tail = power[:, 128:]
+    m = tail.shape[1]
+    expected = (m + 1.) / (m - 1) * (m * (tail ** 2).sum(1) /
+                                     tail.sum(1) ** 2 - 1)
+    assert np.allclose(sk[:, 2], expected)
+
+
+def test_flag_channels():
+    power = mk_power((30, 500))
+    power[7] *= 20
+    flags = flag_channels(power, chunk=1000)
+    assert flags.nonzero()[0].tolist() == [7]
+
+
+def test_find_and_mask():
+    power = mk_power((30, 640))
+    power[7] *= 20
+    power[12, 64:128] = 50
+    spec = mk_spec(power)
+
+    mask = spec.find_rfi()
+    assert mask.channels.nonzero()[0].tolist() == [7]
+    assert mask.blocks[12, 1]
+    arr = mask.to_array()
+    assert arr.shape == power.shape
+    assert arr[7].all()
+    assert arr[12, 64:128].all()
+    assert arr.sum() < 2 * 640 + 64 * 3
+
+    masked = spec.mask_rfi(mask)
+    assert isinstance(masked.data, ma.MaskedArray)
+    assert masked.data.mask[7].all()
+
+    clipped = masked.clip_freq(10, 20)
+    # Channel 12 is at 17 Hz, row 3 of the clipped spectrogram.
+    assert clipped.data.mask[3, 64:128].all()
+    assert not clipped.data.mask[:, :64].any()
+    assert masked.subtract_bg().shape == power.shape
+    assert masked.subtract_running_bg(128).data.mask[7].all()
+
+    with pytest.raises(ValueError):
+        spec.mask_rfi(mask[:10])
+
+
+def test_mask_combine():
+    one = RFIMask([True, False], [[False], [False]], 4, 3)
+    other = RFIMask([False, False], [[False], [True]], 4, 3)
+    assert (one | other).to_array().tolist() == [[True] * 3, [True] * 3]
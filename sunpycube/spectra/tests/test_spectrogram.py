@@ -3,10 +3,11 @@
 
 from __future__ import absolute_import
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytest
 
 import numpy as np
+from numpy import ma
 
 from numpy.testing import assert_array_almost_equal
 
@@ -530,6 +531,174 @@ def test_rescale_error2():
     assert excinfo.value.args[0] == "Maximum and minimum must be different."
 
 
+def test_rescale_inplace():
+    image = np.random.rand(200, 300).astype(np.float32) * 43
+    spec = mk_spec(image.copy())
+    expected = spec.rescale(0, 10)
+    nspec = spec.rescale(0, 10, out=spec.data)
+    assert nspec.data is spec.data
+    assert nspec.dtype == np.dtype('float32')
+    assert_array_almost_equal(nspec.data, expected.data, 5)
+
+
+def test_rescale_int_dtype():
+    image = np.random.randint(0, 255, (20, 300)).astype(np.uint8)
+    nspec = mk_spec(image).rescale(0, 10, dtype=np.int16)
+    assert nspec.dtype == np.dtype('float32')
+    assert nspec.data.min() == 0
+    assert_array_almost_equal(nspec.data.max(), 10, 5)
+
+
+def test_subtract_bg_dtype():
+    image = np.random.randint(0, 255, (20, 300)).astype(np.uint8)
+    spec = mk_spec(image)
+    assert spec.subtract_bg().dtype == np.dtype('float32')
+    assert spec.subtract_bg(dtype=np.float64).dtype == np.dtype('float64')
+
+    out = np.empty(image.shape, dtype=np.float32)
+    assert spec.subtract_bg(out=out).data is out
+    assert np.allclose(out, image - spec.auto_const_bg())
+    # Integer data cannot hold the result.
+    with pytest.raises(TypeError):
+        spec.subtract_bg(out=spec.data)
+
+
+def test_clip_values_inplace():
+    image = np.random.rand(20, 300) * 43
+    spec = mk_spec(image)
+    nspec = spec.clip_values(5, out=spec.data)
+    assert nspec.data is image
+    assert image.min() == 5
+    assert image.max() <= 43
+
+
+def mk_day_part(start, ncols, t_delt=1, value=None):
+    image = np.random.rand(20, ncols) if value is None else (
+        np.zeros((20, ncols)) + value)
+    return LinearTimeSpectrogram(
+        image, np.arange(ncols) * t_delt, np.linspace(19, 0, 20), start,
+        start + timedelta(seconds=(ncols - 1) * t_delt),
+        start.hour * 3600 + start.minute * 60 + start.second, t_delt
+    )
+
+
+def test_append():
+    one = mk_day_part(datetime(2010, 10, 10, 10), 100)
+    two = mk_day_part(datetime(2010, 10, 10, 10, 1, 40), 100)
+    three = mk_day_part(datetime(2010, 10, 10, 10, 3, 20), 100)
+    z = one.append(two).append(three)
+    assert z.shape == (20, 300)
+    assert np.array_equal(z.data[:, :100], one.data)
+    assert np.array_equal(z.data[:, 200:], three.data)
+    assert np.array_equal(z.time_axis, np.arange(300))
+    assert z.start == one.start
+    assert z.end == three.end
+    assert isinstance(z, LinearTimeSpectrogram)
+
+
+def test_append_gap():
+    one = mk_day_part(datetime(2010, 10, 10, 10), 100)
+    other = mk_day_part(datetime(2010, 10, 10, 10, 1, 42), 100)
+    with pytest.raises(ValueError):
+        one.append(other)
+    z = one.append(other, maxgap=2)
+    assert z.shape == (20, 202)
+    assert np.array_equal(z.data.data[:, 100], one.data[:, -1])
+    assert z.data.mask[:, 100:102].all()
+    assert not z.data.mask[:, :100].any()
+    assert not z.data.mask[:, 102:].any()
+    assert np.array_equal(z.time_axis, np.arange(202))
+
+    z = one.append(other, maxgap=None, fill=-1)
+    assert (z.data.data[:, 100:102] == -1).all()
+
+
+def test_append_overlap():
+    one = mk_day_part(datetime(2010, 10, 10, 10), 100, value=1)
+    other = mk_day_part(datetime(2010, 10, 10, 10, 1, 30), 100, value=2)
+    z = one.append(other)
+    assert z.shape == (20, 190)
+    # The columns already present are kept.
+    assert (z.data[:, :100] == 1).all()
+    assert (z.data[:, 100:] == 2).all()
+
+
+def test_append_branch():
+    one = mk_day_part(datetime(2010, 10, 10, 10), 100, value=1)
+    two = mk_day_part(datetime(2010, 10, 10, 10, 1, 40), 100, value=2)
+    three = mk_day_part(datetime(2010, 10, 10, 10, 1, 40), 100, value=3)
+    with pytest.raises(ValueError):
+        one.append(mk_day_part(datetime(2010, 10, 10, 9, 58, 20), 1))
+    first = one.append(two)
+    second = one.append(three)
+    # Appending to a spectrogram twice does not change the first result.
+    assert (first.data[:, 100:] == 2).all()
+    assert (second.data[:, 100:] == 3).all()
+    assert first.append(three).shape == (20, 200)
+
+
+def test_append_memmap(tmpdir):
+    filename = str(tmpdir.join('day.dat'))
+    z = mk_day_part(datetime(2010, 10, 10, 10), 100)
+    parts = [z]
+    for n in range(1, 10):
+        part = mk_day_part(
+            datetime(2010, 10, 10, 10) + timedelta(seconds=100 * n), 100)
+        parts.append(part)
+        z = z.append(part, filename=filename)
+    assert isinstance(z.data, np.memmap)
+    assert np.array_equal(z.data, np.hstack([part.data for part in parts]))
+    # A new buffer may not truncate the file under the data of z.
+    with pytest.raises(ValueError):
+        parts[0].append(parts[1], filename=filename)
+    assert np.array_equal(z.data, np.hstack([part.data for part in parts]))
+
+
+def test_bin():
+    image = np.arange(6 * 10, dtype=np.uint8).reshape(6, 10)
+    spec = LinearTimeSpectrogram(
+        image, np.arange(10) * 0.5, np.linspace(50, 45, 6),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 0, 0, 4, 500000),
+        0, 0.5
+    )
+    binned = spec.bin(2, 3)
+    assert binned.shape == (3, 3)
+    assert binned.dtype == np.float32
+    assert np.allclose(binned.data[0, 0], image[:2, :3].mean())
+    assert np.allclose(binned.data[2, 2], image[4:, 6:9].mean())
+    assert np.allclose(binned.freq_axis, [49.5, 47.5, 45.5])
+    assert np.allclose(binned.time_axis, [0, 1.5, 3])
+    assert binned.t_delt == 1.5
+    assert binned.start == datetime(2010, 10, 10, 0, 0, 0, 500000)
+    assert binned.t_init == 0.5
+    assert isinstance(binned, LinearTimeSpectrogram)
+
+    assert np.array_equal(spec.bin(2, 3, 'sum').data[1, 1],
+                          image[2:4, 3:6].sum())
+    assert np.array_equal(spec.bin(2, 3, 'max').data, image[1::2, 2:9:3])
+    # Reading in blocks gives the same result.
+    assert np.array_equal(spec.bin(2, 3, chunk=6).data, binned.data)
+    with pytest.raises(ValueError):
+        spec.bin(2, 3, 'median')
+    with pytest.raises(ValueError):
+        spec.bin(7)
+
+
+def test_bin_masked():
+    image = ma.array(np.arange(24.).reshape(4, 6))
+    image[:2, :2] = ma.masked
+    image[0, 2] = ma.masked
+    spec = LinearTimeSpectrogram(
+        image, np.arange(6.), np.linspace(4, 1, 4),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 0, 0, 5), 0, 1
+    )
+    binned = spec.bin(2, 2)
+    assert binned.data.mask[0, 0]
+    assert np.allclose(binned.data[0, 1], np.mean([3, 8, 9]))
+    assert np.allclose(spec.bin(2, 2, 'sum').data[0, 1], 20)
+    assert not binned.data.mask[1:].any()
+
+
 def test_resample():
     image = np.array([[0, 1, 2], [0, 1, 2]])
     spec = LinearTimeSpectrogram(
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime
+
+import numpy as np
+from numpy import ma
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.stats import compute_stats
+
+
+def mk_spec(image):
+    return LinearTimeSpectrogram(
+        image, np.linspace(0, image.shape[1] - 1, image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]),
+        datetime(2010, 10, 10), datetime(2010, 10, 10, 1), 0, 1
+    )
+
+
+def test_compute_stats_exact():
+    data = np.random.rand(5, 103) * 1000 + 1e6
+    stats = compute_stats(data, chunk=35)
+    assert np.allclose(stats.mean, data.mean(1))
+    assert np.allclose(stats.var, data.var(1))
+    assert np.array_equal(stats.min, data.min(1))
+    assert np.array_equal(stats.max, data.max(1))
+    assert np.allclose(stats.col_mean, data.mean(0))
+    assert np.allclose(stats.col_std, data.std(0))
+    assert np.array_equal(stats.col_min, data.min(0))
+    assert np.array_equal(stats.col_max, data.max(0))
+    assert stats.global_min() == data.min()
+    assert stats.global_max() == data.max()
+
+
+def test_compute_stats_percentile():
+    data = np.tile(np.arange(1000.), (2, 1))
+    stats = compute_stats(data, chunk=128, sample=200)
+    # Every tenth column is sampled, starting with the first.
+    assert np.array_equal(stats.sample[0], np.arange(0, 1000, 10))
+    assert abs(stats.percentile(50) - 500) < 10
+    assert np.allclose(stats.percentile(90, axis=1), 891.)
+
+
+def test_compute_stats_masked():
+    data = ma.array(np.arange(20.).reshape(2, 10))
+    data[0, :5] = ma.masked
+    stats = compute_stats(data, chunk=6)
+    assert np.array_equal(stats.count, [5, 10])
+    assert np.allclose(stats.mean, [7, 14.5])
+    assert np.allclose(stats.var, [2, 8.25])
+    assert stats.global_min() == 5
+    assert np.allclose(stats.col_mean[:5], np.arange(10, 15))
+    assert np.allclose(stats.percentile(50, axis=1), [7, 14.5])
+
+
+def test_stats_cached():
+    spec = mk_spec(np.random.rand(10, 40))
+    stats = spec.stats()
+    assert spec.stats() is stats
+    # Results of transforms compute their own.
+    clipped = spec.clip_values(0.2, 0.8)
+    assert clipped.stats() is not stats
+    assert clipped.stats().global_max() <= 0.8
+    # Replacing the data discards them.
+    spec.data = spec.data * 2
+    assert spec.stats() is not stats
+
+
+def test_stats_invalidated_inplace():
+    spec = mk_spec(np.random.rand(10, 40))
+    stats = spec.stats()
+    result = spec.rescale(2, 3, out=spec.data)
+    assert spec.stats() is not stats
+    assert np.allclose(spec.stats().global_min(), 2)
+    assert np.allclose(result.stats().global_max(), 3)
+
+
+def test_stats_invalidate():
+    spec = mk_spec(np.random.rand(10, 40))
+    stats = spec.stats()
+    spec.data[0] = 5
+    # Direct changes are not noticed.
+    assert spec.stats() is stats
+    spec.invalidate()
+    assert spec.stats().global_max() == 5
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+
+from sunpycube.spectra.spectrogram import LinearTimeSpectrogram
+from sunpycube.spectra.streaming import RingBufferSpectrogram, FileReplay
+
+
+def mk_spec(image, start, t_delt=1):
+    return LinearTimeSpectrogram(
+        image, np.linspace(0, t_delt * (image.shape[1] - 1), image.shape[1]),
+        np.linspace(image.shape[0] - 1, 0, image.shape[0]),
+        start, start + timedelta(seconds=t_delt * (image.shape[1] - 1)),
+        t_delt=t_delt
+    )
+
+
+def test_append_wraps():
+    image = np.random.rand(10, 250)
+    ring = RingBufferSpectrogram(np.arange(10), 100, 0.5, dtype=np.float64)
+    start = datetime(2010, 10, 10, 1)
+    for x in range(0, 250, 30):
+        ring.append(image[:, x:x + 30],
+                    start + timedelta(seconds=0.5 * x))
+
+    assert ring.shape == (10, 100)
+    assert np.array_equal(ring.data, image[:, 150:])
+    assert np.array_equal(ring.time_axis, np.arange(100) * 0.5)
+    assert ring.start == start + timedelta(seconds=75)
+    assert ring.end == start + timedelta(seconds=124.5)
+    assert ring.t_init == 3600 + 75
+
+
+def test_t_init_past_midnight():
+    ring = RingBufferSpectrogram(np.arange(2), 10, 60)
+    ring.append(np.zeros((2, 10)), datetime(2010, 10, 10, 23, 55))
+    ring.append(np.zeros((2, 10)))
+    assert ring.start == datetime(2010, 10, 11, 0, 5)
+    assert ring.t_init == 300
+
+
+def test_channel_sums_exact():
+    rnd = np.random.RandomState(0)
+    ring = RingBufferSpectrogram(np.arange(4), 50, 1)
+    ring.append(np.zeros((4, 0)), datetime(2010, 10, 10))
+    for _ in range(200):
+        ring.append((rnd.rand(4, 7) * 1e4).astype(np.float32))
+    assert np.allclose(ring._chan_sum,
+                       ring.data.sum(1, dtype=np.float64), rtol=1e-12)
+
+
+def test_append_gap_and_overlap():
+    ring = RingBufferSpectrogram(np.arange(3), 20, 1, maxgap=5)
+    start = datetime(2010, 10, 10)
+    ring.append(np.ones((3, 4)), start)
+    ring.append(2 * np.ones((3, 4)), start + timedelta(seconds=6))
+    assert ring.shape == (3, 10)
+    assert np.array_equal(ring.data[:, 4:6], np.ones((3, 2)))
+    ring.append(3 * np.ones((3, 4)), start + timedelta(seconds=8))
+    assert ring.shape == (3, 12)
+    assert np.array_equal(ring.data[:, 8:], [[2, 2, 3, 3]] * 3)
+    with pytest.raises(ValueError):
+        ring.append(np.ones((3, 1)), start + timedelta(seconds=30))
+
+
+def test_auto_const_bg():
+    x = np.linspace(0, 200, 200)
+    image = x.reshape(200, 1) + np.zeros((200, 900))
+    image[:, 450:] += np.random.rand(200, 450) * 255
+
+    ring = RingBufferSpectrogram(x, 600, 1, dtype=np.float64)
+    for start, data in FileReplay([mk_spec(image, datetime(2010, 10, 10))],
+                                  block=64):
+        ring.append(data, start)
+
+    assert np.allclose(ring.auto_const_bg(), ring.snapshot().auto_const_bg())
+    assert np.allclose(ring.auto_const_bg(), x.reshape(200, 1))
+    assert np.allclose(ring.subtract_bg().data[:, :150], 0)
+
+
+def test_replay_joins():
+    one = mk_spec(np.random.rand(5, 30), datetime(2010, 10, 10))
+    other = mk_spec(np.random.rand(5, 30),
+                    datetime(2010, 10, 10, 0, 0, 30))
+    ring = RingBufferSpectrogram.from_spectrogram(one, 100)
+    for _ in FileReplay([one, other], block=7).feed(ring):
+        pass
+    assert ring.shape == (5, 60)
+    assert np.allclose(ring.data, np.concatenate([one.data, other.data], 1))
+    assert ring.end == datetime(2010, 10, 10, 0, 0, 59)
@@ -1,8 +1,202 @@
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
 from sunpy.visualization.imageanimator import ImageAnimatorWCS
 import numpy as np
 from sunpycube.cube import cube_utils as cu
 
 
+def _frame_key(item):
+    """
+    Return hashable key of a frame slice.
+    """
+    if not isinstance(item, (tuple, list)):
+        item = (item,)
+    return tuple((s.start, s.stop, s.step) if isinstance(s, slice) else int(s)
+                 for s in item)
+
+
+def _wcs_equivalent(wcs, other):
+    """
+    Return whether two WCS objects map pixels to the same world coordinates.
+    """
+    if wcs is other:
+        return True
+    if wcs is None or other is None or wcs.naxis != other.naxis:
+        return False
+    a, b = wcs.wcs, other.wcs
+    if list(a.ctype) != list(b.ctype) or list(a.cunit) != list(b.cunit):
+        return False
+    return all(np.allclose(x, y, rtol=1e-10, atol=0) for x, y in
+               [(a.crval, b.crval), (a.cdelt, b.cdelt), (a.crpix, b.crpix),
+                (a.get_pc(), b.get_pc())])
+
+
+def _decoupled(wcs, axis):
+    """
+    Return whether pixel axis of wcs is mapped independently of the other
+    axes, so the world coordinates along those do not depend on its index.
+    Celestial longitude and latitude are coupled through the projection,
+    so neither is ever decoupled.
+    """
+    pc = wcs.wcs.get_pc()
+    others = np.arange(pc.shape[0]) != axis
+    if pc[axis, others].any() or pc[others, axis].any():
+        return False
+    wcs.wcs.set()
+    return axis not in (wcs.wcs.lng, wcs.wcs.lat)
+
+
+class PrefetchedArray(object):
+    """
+    Read-only wrapper of an array whose frames are loaded ahead of time.
+
+    Every time a frame is requested, the next frames in both directions
+    along the axes it is indexed by integers are loaded on a pool of
+    background threads, those along the axis that changed last first and
+    in the direction of the change. Loaded frames are kept in a bounded
+    least recently used cache, so moving a slider is served from memory
+    even if reading a frame requires disk access or computation.
+
+    Attributes
+    ----------
+    data : array-like
+        The wrapped array, e.g. a memory mapped array or a
+        `sunpycube.cube.cube_utils.ConcatenatedArray`.
+    frames : `int`
+        Number of frames to load ahead in either direction.
+    cache_size : `int`
+        Largest number of frames kept.
+    transform : function or None
+        Called with every loaded frame in the background thread, e.g. to
+        normalize it; its result is returned instead.
+    """
+
+    def __init__(self, data, frames=4, cache_size=None, workers=2,
+                 transform=None):
+        self.data = data
+        self.frames = frames
+        if cache_size is None:
+            cache_size = 4 * frames + 1
+        self.cache_size = max(1, cache_size)
+        self.workers = workers
+        self.transform = transform
+        self.shape = tuple(data.shape)
+        self.ndim = len(self.shape)
+        self.dtype = data.dtype
+        self._cache = OrderedDict()
+        self._pool = None
+        self._last = None
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.data, dtype)
+
+    def _load(self, item):
+        """
+        Read frame item into memory. Runs in the background threads.
+        """
+        frame = np.array(self.data[item])
+        if self.transform is not None:
+            frame = self.transform(frame)
+        return frame
+
+    def _store(self, key, value):
+        """
+        Implementation detail.
+        """
+        self._cache[key] = value
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def __getitem__(self, item):
+        item = list(item) if isinstance(item, (tuple, list)) else [item]
+        key = _frame_key(item)
+        if key in self._cache:
+            value = self._cache.pop(key)
+            self._cache[key] = value
+            frame = value.get() if hasattr(value, 'get') else value
+        else:
+            frame = self._load(tuple(item))
+            self._store(key, frame)
+        self._prefetch(item, key)
+        self._last = key
+        return frame
+
+    def _neighbours(self, item, key):
+        """
+        Return the frame slices to load after item, most urgent first.
+        """
+        axes = [axis for axis, s in enumerate(item) if not isinstance(s, slice)]
+        direction = {}
+        if self._last is not None and len(self._last) == len(key):
+            for axis in axes:
+                if self._last[axis] != key[axis]:
+                    direction[axis] = 1 if key[axis] > self._last[axis] else -1
+        # The axis that changed goes first.
+        axes.sort(key=lambda axis: axis not in direction)
+        result = []
+        for axis in axes:
+            ahead = direction.get(axis, 1)
+            for distance in range(1, self.frames + 1):
+                for sign in (ahead, -ahead):
+                    index = item[axis] + sign * distance
+                    if 0 <= index < self.shape[axis]:
+                        neighbour = list(item)
+                        neighbour[axis] = index
+                        result.append(neighbour)
+        return result
+
+    def _prefetch(self, item, key):
+        """
+        Implementation detail.
+        """
+        if self.frames < 1:
+            return
+        neighbours = self._neighbours(item, key)
+        # Do not evict the frames about to be needed.
+        neighbours = neighbours[:self.cache_size - 1]
+        if self._pool is None:
+            self._pool = ThreadPool(self.workers)
+        for neighbour in neighbours:
+            neighbour_key = _frame_key(neighbour)
+            if neighbour_key in self._cache:
+                continue
+            self._store(neighbour_key,
+                        self._pool.apply_async(self._load, (tuple(neighbour),)))
+
+    def close(self):
+        """
+        Stop the background threads and drop the cached frames.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._cache.clear()
+
+
+def prefetched(data, prefetch=0, transform=None):
+    """
+    Return data wrapped in a `PrefetchedArray` loading prefetch frames ahead
+    and applying transform to them, or data itself if neither is asked for.
+    """
+    if not prefetch and transform is None:
+        return data
+    return PrefetchedArray(data, prefetch, transform=transform)
+
+
+def close_with_figure(animator):
+    """
+    Stop the background threads of the `PrefetchedArray` an animator shows,
+    if any, when its figure is closed.
+    """
+    if isinstance(animator.data, PrefetchedArray):
+        animator.fig.canvas.mpl_connect(
+            'close_event', lambda event: animator.data.close())
+
+
 class ImageAnimatorCubeSequence(ImageAnimatorWCS):
     """
     Animates N-dimensional data with the associated astropy WCS object.
@@ -57,15 +251,113 @@ class ImageAnimatorCubeSequence(ImageAnimatorWCS):
     unit_y_axis: `astropy.units.Unit`
         The unit of y axis.
 
+    prefetch: `int`
+        Number of frames to load ahead in either direction on background
+        threads, see `PrefetchedArray`. 0 disables prefetching. The threads
+        are stopped when the figure is closed.
+
+    transform: function or None
+        Called with every frame as it is loaded, e.g. to normalize it; its
+        result is shown instead. With prefetching, it runs in the
+        background threads.
+
+    blit: `bool`
+        If True and the canvas supports it, moving a slider within a cube,
+        or to a cube with an equivalent WCS, only redraws the image and the
+        sliders on top of a saved background instead of redrawing the
+        whole figure with new axes.
+
     Extra keywords are passed to imshow.
     """
 
-    def __init__(self, seq, wcs=None, **kwargs):
+    def __init__(self, seq, wcs=None, prefetch=0, transform=None, **kwargs):
+        self.blit = kwargs.pop('blit', True)
         self.sequence = seq.data
-        self.cumul_cube_lengths = np.cumsum(np.array([c.shape[0] for c in self.sequence]))
-        data_concat = np.concatenate(seq.data, axis=0)
+        # Frames are read from the cubes as they are shown, rather than
+        # concatenating the whole sequence in memory.
+        data_concat = cu.ConcatenatedArray([c.data for c in self.sequence])
+        self.cumul_cube_lengths = data_concat.offsets.cumul_cube_lengths
+        data_concat = prefetched(data_concat, prefetch, transform)
         super(ImageAnimatorCubeSequence, self).__init__(
             data_concat, wcs=self.sequence[0].axes_wcs, **kwargs)
+        close_with_figure(self)
+        # WCS the axes currently show.
+        self._axes_wcs = self.sequence[0].axes_wcs
+        self._background = None
+        self._fast = False
+        self.blit = self.blit and hasattr(self.fig.canvas, 'copy_from_bbox')
+        if self.blit:
+            self._setup_blit()
+
+    def _blit_artists(self):
+        """
+        Artists that change on every frame: the image and the slider axes.
+        """
+        return [self.im] + list(self.sliders)
+
+    def _setup_blit(self):
+        """
+        Implementation detail.
+        """
+        for artist in self._blit_artists():
+            artist.set_animated(True)
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """
+        Save the background after a full redraw of the figure.
+        """
+        canvas = self.fig.canvas
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self._blit_artists():
+            self.fig.draw_artist(artist)
+
+    def _redraw(self):
+        """
+        Show the updated plot, only drawing the changing artists if the
+        axes have not changed.
+        """
+        if not self._fast or self._background is None:
+            self._background = None
+            self.fig.canvas.draw_idle()
+            return
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        for artist in self._blit_artists():
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+
+    def _move(self, slider, step):
+        """
+        Move slider by step, wrapping around at its ends, and only redraw
+        what changed.
+        """
+        slider.drawon = False
+        val = slider.val + step
+        if val > slider.valmax:
+            val = slider.valmin
+        elif val < slider.valmin:
+            val = slider.valmax
+        slider.set_val(val)
+
+    def _step(self, slider):
+        if not self.blit:
+            return super(ImageAnimatorCubeSequence, self)._step(slider)
+        self._move(slider, 1)
+
+    def _previous(self, slider):
+        if not self.blit:
+            return super(ImageAnimatorCubeSequence, self)._previous(slider)
+        self._move(slider, -1)
+
+    def _slider_changed(self, val, slider):
+        self._fast = True
+        if self.blit:
+            # Dragging a slider redraws through _redraw from now on.
+            slider.drawon = False
+        super(ImageAnimatorCubeSequence, self)._slider_changed(val, slider)
+        if self.blit:
+            self._redraw()
 
     def update_plot(self, val, im, slider):
         val = int(val)
@@ -75,11 +367,19 @@ class ImageAnimatorCubeSequence(ImageAnimatorWCS):
         list_slices_wcsaxes = list(self.slices_wcsaxes)
         sequence_index, cube_index = cu._convert_cube_like_index_to_sequence_indices(
             val, self.cumul_cube_lengths)
-        list_slices_wcsaxes[self.wcs.naxis-ax_ind-1] = cube_index
+        pixel_axis = self.wcs.naxis-ax_ind-1
+        list_slices_wcsaxes[pixel_axis] = cube_index
         self.slices_wcsaxes = list_slices_wcsaxes
         if val != slider.cval:
-            self.axes.reset_wcs(
-                wcs=self.sequence[sequence_index].axes_wcs, slices=self.slices_wcsaxes)
-            self._set_unit_in_axis(self.axes)
+            wcs = self.sequence[sequence_index].axes_wcs
+            # The axes only need to be reset if their world coordinates
+            # change, i.e. the new cube has a different WCS or the image
+            # axes depend on the index along the slider axis.
+            if not (self.blit and _wcs_equivalent(wcs, self._axes_wcs) and
+                    _decoupled(wcs, pixel_axis)):
+                self.axes.reset_wcs(wcs=wcs, slices=self.slices_wcsaxes)
+                self._set_unit_in_axis(self.axes)
+                self._axes_wcs = wcs
+                self._fast = False
             im.set_array(self.data[self.frame_slice])
             slider.cval = val
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Headless rendering of cubes and cube sequences to numbered image files or
+a raw stream of frames, in parallel.
+"""
+
+from __future__ import absolute_import
+
+from multiprocessing import Pool
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+__all__ = ['frame_list', 'data_range', 'save_frames', 'write_frames']
+
+# Axes and WCSAxes slices of the frames along them, as plotted by
+# Cube.plot_wavelength_slice and Cube.plot_x_slice.
+_SLICES = {
+    'wavelength': lambda index: ('x', 'y', index),
+    'x': lambda index: ('x', index, 'y'),
+}
+
+# Cubes, frames and options of a worker process, see _init_worker.
+_state = {}
+
+
+def _cubes(obj):
+    """
+    Return the list of cubes of a cube or cube sequence.
+    """
+    if hasattr(obj, 'axes_wcs'):
+        return [obj]
+    return list(obj.data)
+
+
+def _frame_axis(cube, axis):
+    """
+    Return the data axis of cube the frames along axis are taken from.
+    """
+    if axis == 'x':
+        return 0
+    # Same as Cube._choose_wavelength_slice.
+    return -2 if cube.axes_wcs.wcs.ctype[0] in ['TIME', 'UTC'] else -1
+
+
+def frame_list(obj, axis='wavelength'):
+    """
+    Return the frames of a cube or cube sequence along axis as a list of
+    (cube number, index in cube) pairs, in the order they are shown.
+
+    Parameters
+    ----------
+    obj: `sunpycube.cube.datacube.Cube` or `sunpycube.cube.datacube.CubeSequence`
+    axis: 'wavelength' or 'x'
+        The axis to slice, as in plot_wavelength_slice and plot_x_slice.
+    """
+    if axis not in _SLICES:
+        raise ValueError("axis must be one of {0}".format(sorted(_SLICES)))
+    return [(n, index) for n, cube in enumerate(_cubes(obj))
+            for index in range(cube.data.shape[_frame_axis(cube, axis)])]
+
+
+def data_range(obj):
+    """
+    Return the smallest and largest finite value of a cube or cube
+    sequence, read one cube at a time.
+    """
+    vmin, vmax = np.inf, -np.inf
+    for cube in _cubes(obj):
+        data = np.ma.masked_invalid(cube.data)
+        if data.count():
+            vmin = min(vmin, float(data.min()))
+            vmax = max(vmax, float(data.max()))
+    if vmin > vmax:
+        raise ValueError("No finite values.")
+    return vmin, vmax
+
+
+def _init_worker(cubes, frames, options):
+    """
+    Implementation detail.
+    """
+    _state.clear()
+    _state.update(cubes=cubes, frames=frames, options=options)
+
+
+def _render_frame(number):
+    """
+    Draw frame number. Returns the name of the file it was saved to, or
+    its RGBA pixels if no file name pattern is set.
+    """
+    options = _state['options']
+    fig = _state.get('figure')
+    if fig is None:
+        fig = Figure(figsize=options['figsize'], dpi=options['dpi'])
+        FigureCanvasAgg(fig)
+        _state['figure'] = fig
+    fig.clf()
+    cube_number, index = _state['frames'][number]
+    cube = _state['cubes'][cube_number]
+    axis = options['axis']
+    # Same axes as ImageAnimatorWCS, set up for the slice plotting methods.
+    axes = fig.add_axes([0.1, 0.1, 0.8, 0.8], projection=cube.axes_wcs,
+                        slices=_SLICES[axis](index))
+    getattr(cube, 'plot_{0}_slice'.format(axis))(index, axes=axes,
+                                                 **options['kwargs'])
+    if options['pattern'] is not None:
+        filename = options['pattern'].format(number)
+        fig.savefig(filename, dpi=options['dpi'])
+        return filename
+    fig.canvas.draw()
+    width, height = fig.canvas.get_width_height()
+    return np.frombuffer(fig.canvas.buffer_rgba(), np.uint8).reshape(
+        height, width, 4).copy()
+
+
+def _render(obj, axis, pattern, processes, vmin, vmax, figsize, dpi,
+            chunksize, kwargs):
+    """
+    Yield the results of _render_frame for all frames, in order.
+    """
+    frames = frame_list(obj, axis)
+    if 'norm' not in kwargs and (vmin is None or vmax is None):
+        # All frames share the color scale, so it has to be known before
+        # they are distributed.
+        low, high = data_range(obj)
+        vmin = low if vmin is None else vmin
+        vmax = high if vmax is None else vmax
+    kwargs = dict(kwargs)
+    if 'norm' not in kwargs:
+        kwargs.update(vmin=vmin, vmax=vmax)
+    kwargs.setdefault('origin', 'lower')
+    kwargs.setdefault('interpolation', 'nearest')
+    options = {'axis': axis, 'pattern': pattern, 'figsize': figsize,
+               'dpi': dpi, 'kwargs': kwargs}
+    initargs = (_cubes(obj), frames, options)
+    if processes == 1:
+        _init_worker(*initargs)
+        try:
+            for number in range(len(frames)):
+                yield _render_frame(number)
+        finally:
+            _state.clear()
+        return
+    pool = Pool(processes, _init_worker, initargs)
+    try:
+        for result in pool.imap(_render_frame, range(len(frames)), chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def save_frames(obj, pattern, axis='wavelength', processes=None, vmin=None,
+                vmax=None, figsize=None, dpi=100, chunksize=4, **kwargs):
+    """
+    Render every frame of a cube or cube sequence along axis to its own
+    image file, without a display.
+
+    The frames are drawn with the Agg backend on a pool of processes. The
+    color scale is the same for all frames: unless given, vmin and vmax
+    are the smallest and largest finite value of the data.
+
+    Parameters
+    ----------
+    obj: `sunpycube.cube.datacube.Cube` or `sunpycube.cube.datacube.CubeSequence`
+        The data to render. The frames of a sequence are those of its cubes
+        one after the other.
+
+    pattern: `str`
+        File name, formatted with the frame number, e.g.
+        'frames/aia_{0:05d}.png'. The format is given by the extension.
+
+    axis: 'wavelength' or 'x'
+        The axis to slice, as in plot_wavelength_slice and plot_x_slice.
+
+    processes: `int` or None
+        Number of worker processes. None uses one per CPU, 1 renders in
+        this process.
+
+    vmin, vmax: `float` or None
+        The color scale limits.
+
+    figsize: (`float`, `float`) or None
+        Figure size in inches.
+
+    dpi: `int`
+        Resolution in dots per inch.
+
+    chunksize: `int`
+        Number of frames a worker renders at a time.
+
+    Extra keywords are passed to imshow.
+
+    Returns
+    -------
+    filenames: `list` of `str`
+        The files written, in frame order.
+    """
+    return list(_render(obj, axis, pattern, processes, vmin, vmax, figsize,
+                        dpi, chunksize, kwargs))
+
+
+def write_frames(obj, stream, axis='wavelength', processes=None, vmin=None,
+                 vmax=None, figsize=None, dpi=100, chunksize=4, **kwargs):
+    """
+    Render every frame of a cube or cube sequence along axis and write
+    their raw RGBA pixels to stream, e.g. the standard input of a video
+    encoder. The parameters are the same as those of `save_frames`.
+
+    Returns
+    -------
+    shape: (`int`, `int`, `int`)
+        Rows, columns and channels of each frame. The frames are written
+        row by row from the top, one byte per channel.
+    """
+    shape = None
+    for frame in _render(obj, axis, None, processes, vmin, vmax, figsize,
+                         dpi, chunksize, kwargs):
+        shape = frame.shape
+        stream.write(frame.data)
+    return shape
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import threading
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import CloseEvent
+from astropy.wcs import WCS
+
+from sunpycube.cube.datacube import Cube, CubeSequence
+from sunpycube import wcs_util
+from sunpycube.visualization.animation import (PrefetchedArray,
+                                               ImageAnimatorCubeSequence,
+                                               _wcs_equivalent, _decoupled)
+
+hm = {
+    'CTYPE1': 'WAVE    ', 'CUNIT1': 'Angstrom', 'CDELT1': 0.2, 'CRPIX1': 0, 'CRVAL1': 10, 'NAXIS1': 4,
+    'CTYPE2': 'HPLT-TAN', 'CUNIT2': 'deg', 'CDELT2': 0.5, 'CRPIX2': 2, 'CRVAL2': 0.5, 'NAXIS2': 3,
+    'CTYPE3': 'HPLN-TAN', 'CUNIT3': 'deg', 'CDELT3': 0.4, 'CRPIX3': 2, 'CRVAL3': 1, 'NAXIS3': 2,
+}
+
+cube_data = np.random.rand(2, 3, 4)
+
+
+class CountingArray(object):
+    """
+    Array recording which frames are read.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.shape = data.shape
+        self.dtype = data.dtype
+        self.reads = []
+        self.lock = threading.Lock()
+
+    def __getitem__(self, item):
+        with self.lock:
+            self.reads.append(item[0])
+        return self.data[item]
+
+
+def test_prefetched_frames():
+    data = CountingArray(np.arange(20 * 3 * 2).reshape(20, 3, 2))
+    arr = PrefetchedArray(data, frames=2)
+    assert arr.shape == (20, 3, 2)
+    assert arr.ndim == 3
+    try:
+        frame = [5, slice(None), slice(None)]
+        assert np.array_equal(arr[frame], data.data[5])
+        # Neighbours in both directions are loaded in the background.
+        for index in [3, 4, 6, 7]:
+            frame[0] = index
+            assert np.array_equal(arr[frame], data.data[index])
+        # Every frame was read only once, in the background.
+        for index in [3, 4, 5, 6, 7]:
+            assert data.reads.count(index) == 1
+    finally:
+        arr.close()
+
+
+def test_prefetched_direction():
+    data = CountingArray(np.arange(20 * 3 * 2).reshape(20, 3, 2))
+    arr = PrefetchedArray(data, frames=3)
+    try:
+        arr[[10, slice(None), slice(None)]]
+        # Moving backwards, the frames before are scheduled first.
+        item = [9, slice(None), slice(None)]
+        neighbours = arr._neighbours(item, (9, (None, None, None),
+                                            (None, None, None)))
+        assert [n[0] for n in neighbours] == [8, 10, 7, 11, 6, 12]
+    finally:
+        arr.close()
+
+
+def test_prefetched_cache_bounded():
+    data = CountingArray(np.arange(50 * 2 * 2).reshape(50, 2, 2))
+    arr = PrefetchedArray(data, frames=2, cache_size=6)
+    try:
+        for index in range(50):
+            assert np.array_equal(arr[[index, slice(None), slice(None)]],
+                                  data.data[index])
+            assert len(arr._cache) <= 6
+    finally:
+        arr.close()
+
+
+def test_prefetched_transform():
+    data = np.arange(8 * 2 * 2).reshape(8, 2, 2)
+    arr = PrefetchedArray(data, frames=1, transform=lambda f: f * 2.)
+    try:
+        assert np.array_equal(arr[[1, slice(None), slice(None)]], data[1] * 2.)
+        assert np.array_equal(arr[[2, slice(None), slice(None)]], data[2] * 2.)
+    finally:
+        arr.close()
+
+
+def mk_wcs(crval=1e-9):
+    wcs = WCS(naxis=3)
+    wcs.wcs.ctype = ['HPLN-TAN', 'HPLT-TAN', 'WAVE']
+    wcs.wcs.cunit = ['deg', 'deg', 'm']
+    wcs.wcs.cdelt = [1e-3, 1e-3, 1e-11]
+    wcs.wcs.crval = [0, 0, crval]
+    return wcs
+
+
+def test_wcs_equivalent():
+    wcs = mk_wcs()
+    assert _wcs_equivalent(wcs, wcs)
+    assert _wcs_equivalent(wcs, mk_wcs())
+    # Small absolute differences of small values still count.
+    assert not _wcs_equivalent(wcs, mk_wcs(1.001e-9))
+    other = mk_wcs()
+    other.wcs.ctype = ['HPLN-TAN', 'HPLT-TAN', 'FREQ']
+    assert not _wcs_equivalent(wcs, other)
+    assert not _wcs_equivalent(wcs, WCS(naxis=2))
+
+
+def test_decoupled():
+    wcs = mk_wcs()
+    # Longitude and latitude are coupled through the projection.
+    assert [_decoupled(wcs, axis) for axis in range(3)] == [False, False,
+                                                            True]
+    wcs = WCS(naxis=3)
+    wcs.wcs.ctype = ['WAVE', 'TIME', 'FREQ']
+    assert all(_decoupled(wcs, axis) for axis in range(3))
+    wcs.wcs.pc = [[1, 0, 0.5], [0, 1, 0], [0, 0, 1]]
+    assert not _decoupled(wcs, 2)
+    assert not _decoupled(wcs, 0)
+    assert _decoupled(wcs, 1)
+
+
+def test_animate_prefetched_transform():
+    wm = wcs_util.WCS(header=hm, naxis=3)
+    seq = CubeSequence([Cube(cube_data, wm), Cube(cube_data * 2, wm)])
+    animator = ImageAnimatorCubeSequence(seq, image_axes=[-1, -2],
+                                         prefetch=1,
+                                         transform=lambda frame: frame * 10)
+    try:
+        assert isinstance(animator.data, PrefetchedArray)
+        assert np.allclose(animator.im.get_array(), cube_data[0] * 10)
+        # The first frame of the second cube.
+        animator.sliders[0]._slider.set_val(2)
+        assert np.allclose(animator.im.get_array(), cube_data[0] * 20)
+        assert animator.data._pool is not None
+        canvas = animator.fig.canvas
+        canvas.callbacks.process('close_event',
+                                 CloseEvent('close_event', canvas))
+        assert animator.data._pool is None
+    finally:
+        plt.close(animator.fig)
+
+
+class WCSCube(object):
+    """
+    Cube of data and WCS as given, whose wavelength axis is the first of
+    the data.
+    """
+
+    def __init__(self, data, wcs):
+        self.data = data
+        self.shape = data.shape
+        self.axes_wcs = wcs
+
+
+def test_animate_blit():
+    last = np.random.rand(20, 3, 4)
+    seq = CubeSequence([WCSCube(cube_data, mk_wcs()),
+                        WCSCube(cube_data * 2, mk_wcs()),
+                        WCSCube(last, mk_wcs(2e-9))])
+    animator = ImageAnimatorCubeSequence(seq, image_axes=[-1, -2], blit=True)
+    try:
+        canvas = animator.fig.canvas
+        canvas.draw()
+        resets = []
+        reset_wcs = animator.axes.reset_wcs
+        animator.axes.reset_wcs = lambda *args, **kwargs: (
+            resets.append(args), reset_wcs(*args, **kwargs))
+        blits = []
+        canvas.blit = lambda bbox=None: blits.append(bbox)
+        slider = animator.sliders[0]._slider
+        # Within a cube and into one with the same WCS only the image and
+        # sliders are drawn again.
+        for frame in [1, 2, 3]:
+            animator._step(slider)
+            assert np.allclose(animator.im.get_array(),
+                               cube_data[frame % 2] * (1 + frame // 2))
+        assert len(blits) == 3
+        assert resets == []
+        # A different WCS resets the axes and redraws the whole figure.
+        animator._step(slider)
+        assert np.allclose(animator.im.get_array(), last[0])
+        assert len(resets) == 1
+        assert len(blits) == 3
+        animator._previous(slider)
+        assert np.allclose(animator.im.get_array(), cube_data[1] * 2)
+        assert len(resets) == 2
+    finally:
+        plt.close(animator.fig)
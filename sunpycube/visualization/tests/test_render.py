@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+import io
+import os
+
+import pytest
+import numpy as np
+
+from sunpycube.cube.datacube import Cube, CubeSequence
+from sunpycube.wcs_util import WCS
+from sunpycube.visualization import render
+
+data = np.random.rand(2, 3, 4)
+
+hm = {
+    'CTYPE1': 'WAVE    ', 'CUNIT1': 'Angstrom', 'CDELT1': 0.2, 'CRPIX1': 0, 'CRVAL1': 10, 'NAXIS1': 4,
+    'CTYPE2': 'HPLT-TAN', 'CUNIT2': 'deg', 'CDELT2': 0.5, 'CRPIX2': 2, 'CRVAL2': 0.5, 'NAXIS2': 3,
+    'CTYPE3': 'HPLN-TAN', 'CUNIT3': 'deg', 'CDELT3': 0.4, 'CRPIX3': 2, 'CRVAL3': 1, 'NAXIS3': 2,
+}
+
+wm = WCS(header=hm, naxis=3)
+
+cube = Cube(data, wm)
+seq = CubeSequence([cube, Cube(data * 2, wm)])
+
+
+def test_frame_list():
+    assert render.frame_list(cube) == [(0, 0), (0, 1), (0, 2), (0, 3)]
+    assert render.frame_list(seq, 'x') == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    assert len(render.frame_list(seq)) == 8
+    with pytest.raises(ValueError):
+        render.frame_list(cube, 'y')
+
+
+def test_data_range():
+    assert render.data_range(seq) == (data.min(), 2 * data.max())
+    nans = np.array(data)
+    nans[0] = np.nan
+    assert render.data_range(Cube(nans, wm)) == (data[1].min(), data[1].max())
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_save_frames(tmpdir, processes):
+    pattern = os.path.join(str(tmpdir), 'frame_{0:03d}.png')
+    filenames = render.save_frames(seq, pattern, processes=processes,
+                                   figsize=(2, 2))
+    assert filenames == [pattern.format(n) for n in range(8)]
+    assert all(os.path.getsize(filename) for filename in filenames)
+
+
+def test_write_frames():
+    stream = io.BytesIO()
+    shape = render.write_frames(seq, stream, axis='x', processes=2,
+                                figsize=(2, 2), dpi=50)
+    assert shape == (100, 100, 4)
+    assert len(stream.getvalue()) == 4 * 100 * 100 * 4
+    # Frames rendered in this process are the same.
+    other = io.BytesIO()
+    render.write_frames(seq, other, axis='x', processes=1, figsize=(2, 2),
+                        dpi=50)
+    assert other.getvalue() == stream.getvalue()
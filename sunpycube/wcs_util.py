@@ -150,3 +150,28 @@ def add_celestial_axis(wcs):
         outwcs.wcs.ctype[-1] = projection
 
     return outwcs
+
+
+def set_pixel_length(wcs, axis, length):
+    '''
+    Sets the number of pixels along an axis of the given wcs, if the wcs
+    records the lengths of its axes.
+
+    Parameters
+    ----------
+    wcs: sunpy.wcs.wcs.WCS object
+        The world coordinate system to change in place.
+    axis: int
+        The pixel axis, in WCS order.
+    length: int
+        The number of pixels along it.
+    '''
+    if hasattr(type(wcs), 'pixel_shape'):
+        shape = wcs.pixel_shape
+        if shape is not None and len(shape) > axis:
+            shape = list(shape)
+            shape[axis] = length
+            wcs.pixel_shape = shape
+    elif hasattr(wcs, '_naxis{0}'.format(axis + 1)):
+        # Versions of astropy before pixel_shape only expose these.
+        setattr(wcs, '_naxis{0}'.format(axis + 1), length)